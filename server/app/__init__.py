@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# 환경 변수(.env) 로드: app 하위 모듈이 import 시점에 os.getenv 로 설정을 읽기 전에 한 번만 실행
+load_dotenv()
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import render_metrics
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    학습 파이프라인 지표(단계별 소요 시간, 대기열 대기 시간, epoch 수, 작업 결과 수)를
+    Prometheus text exposition 형식으로 반환합니다.
+    """
+    body = await run_in_threadpool(render_metrics)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
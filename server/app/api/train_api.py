@@ -1,16 +1,30 @@
-from fastapi import APIRouter
+import os
+import zlib
+from urllib.parse import unquote
 
-from app.services.training_service import start_new_training_job, get_job_status
-from app.schemas.train_schemas import TaskRequest, TaskResponse, StatusResponse
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.services.training_service import start_new_training_job, start_new_batch_training_job, get_job_status, get_job_statuses
+from app.schemas.train_schemas import TaskRequest, BatchTaskRequest, TaskResponse, StatusResponse, BulkStatusRequest, JobRecord
+from app.services import progress_service, job_store_service
+from app.utils.utils import decode_landmark_body
 router = APIRouter()
 
+MAX_BINARY_UPLOAD_BYTES = int(os.getenv("MAX_BINARY_UPLOAD_BYTES", str(16 * 1024 * 1024)))
+MAX_BULK_STATUS_IDS = int(os.getenv("MAX_BULK_STATUS_IDS", "200"))
+
 @router.post("/train", response_model=TaskResponse)
-def train(request: TaskRequest):
+def train(request: TaskRequest, x_device_id: Optional[str] = Header(None)):
     """
     새로운 모델 학습 Task를 시작합니다.
 
     Args:
         request(TaskRequest): model code, landmark, gesture name
+        x_device_id(str): 요청 기기/사용자 식별자 (선택, 작업 이력 조회용)
 
     Returns:
           TaskResponse: 생성된 Celery 작업의 ID
@@ -19,13 +33,82 @@ def train(request: TaskRequest):
     task_id = start_new_training_job(
         model_code=request.model_code,
         landmarks=request.landmarks,
-        gesture = request.gesture
+        gesture = request.gesture,
+        device_id=x_device_id,
+    )
+
+    return TaskResponse(task_id=task_id)
+
+@router.post("/train/binary", response_model=TaskResponse)
+async def train_binary(
+    request: Request,
+    x_model_code: str = Header(...),
+    x_gesture: str = Header(...),
+    content_encoding: str = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
+    """
+    바이너리 랜드마크 본문으로 새로운 모델 학습 Task를 시작합니다.
+
+    본문은 little-endian float32 (application/octet-stream), NPY (application/x-npy)
+    또는 NPZ (application/x-npz) 이며 gzip Content-Encoding 을 지원합니다.
+    model code 와 제스처 이름(URL 인코딩)은 X-Model-Code, X-Gesture 헤더로 전달합니다.
+
+    Returns:
+          TaskResponse: 생성된 Celery 작업의 ID
+    """
+    content_length = request.headers.get("content-length")
+    if content_length:
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Content-Length 헤더가 올바르지 않습니다")
+        if content_length > MAX_BINARY_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="업로드 크기가 너무 큽니다")
+
+    body = await request.body()
+    if len(body) > MAX_BINARY_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="업로드 크기가 너무 큽니다")
+
+    try:
+        landmarks = decode_landmark_body(
+            body, request.headers.get("content-type"), content_encoding, max_bytes=MAX_BINARY_UPLOAD_BYTES
+        )
+    except (ValueError, OSError, EOFError, zlib.error) as e:
+        raise HTTPException(status_code=400, detail=f"랜드마크 본문을 해석할 수 없습니다: {e}")
+
+    task_id = await run_in_threadpool(
+        start_new_training_job,
+        model_code=unquote(x_model_code),
+        landmarks=landmarks,
+        gesture=unquote(x_gesture),
+        device_id=x_device_id,
+    )
+
+    return TaskResponse(task_id=task_id)
+
+@router.post("/train/batch", response_model=TaskResponse)
+def train_batch(request: BatchTaskRequest, x_device_id: Optional[str] = Header(None)):
+    """
+    같은 모델에 여러 제스처를 한 번의 학습으로 추가하는 Task를 시작합니다.
+
+    Args:
+        request(BatchTaskRequest): model code, (gesture name, landmark) 목록
+
+    Returns:
+          TaskResponse: 생성된 Celery 작업의 ID
+    """
+
+    task_id = start_new_batch_training_job(
+        model_code=request.model_code,
+        gestures=[sample.model_dump() for sample in request.gestures],
+        device_id=x_device_id,
     )
 
     return TaskResponse(task_id=task_id)
 
 @router.get("/status/{task_id}", response_model=StatusResponse)
-def get_task_status(task_id: str):
+async def get_task_status(task_id: str):
     """
     지덩된 작업 ID의 현재 상태를 조회합니다.
 
@@ -36,6 +119,59 @@ def get_task_status(task_id: str):
         StatusResponse: 작업의 현재상태, 결과 또는 에러 정보를 포함하는 응답 모델
 
     """
-    status_info = get_job_status(task_id)
+    status_info = await run_in_threadpool(get_job_status, task_id)
 
     return status_info
+
+@router.post("/status", response_model=List[StatusResponse])
+async def get_task_statuses(request: BulkStatusRequest):
+    """
+    여러 작업 ID의 상태를 한 번에 조회합니다. (작업 기록을 한 번의 Redis pipeline 으로 조회)
+
+    Args:
+        request(BulkStatusRequest): 조회할 Celery Task ID 목록 (최대 MAX_BULK_STATUS_IDS 개)
+
+    Returns:
+        List[StatusResponse]: 요청 순서와 같은 순서의 상태 목록
+    """
+    if len(request.task_ids) > MAX_BULK_STATUS_IDS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BULK_STATUS_IDS}개까지 조회할 수 있습니다")
+    return await run_in_threadpool(get_job_statuses, request.task_ids)
+
+@router.get("/jobs", response_model=List[JobRecord])
+async def list_jobs(
+    model_code: Optional[str] = None,
+    device_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    모델 또는 기기별 최근 작업 이력(상태, 단계, 소요 시간, 결과 URL)을 최신순으로 조회합니다.
+
+    Args:
+        model_code(str): 기반 모델 코드
+        device_id(str): 요청 기기/사용자 식별자 (model_code 와 함께 주면 둘 다 만족하는 작업만)
+        limit(int): 최대 개수
+    """
+    if not model_code and not device_id:
+        raise HTTPException(status_code=400, detail="model_code 또는 device_id 가 필요합니다")
+    return await run_in_threadpool(job_store_service.list_jobs, model_code, device_id, limit)
+
+@router.get("/status/{task_id}/stream")
+async def stream_task_status(task_id: str):
+    """
+    작업 상태를 Server-Sent Events 로 전달합니다.
+
+    연결 직후 현재 상태를 한 번 보내고, 이후 단계(current_step)가 바뀔 때마다와
+    최종 결과(SUCCESS/DUPLICATE/INVALID/FAILURE)를 push 한 뒤 연결을 종료합니다.
+
+    Args:
+        task_id(str): 상태를 구독할 Celery Task ID
+    """
+    async def current_status(tid):
+        return await run_in_threadpool(get_job_status, tid)
+
+    return StreamingResponse(
+        progress_service.stream(task_id, current_status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1 @@
+# 학습 파이프라인 성능 회귀 측정용 벤치마크 (python -m app.benchmarks --help)
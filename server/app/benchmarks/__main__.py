@@ -0,0 +1,82 @@
+"""
+사용 예:
+    python -m app.benchmarks --classes 10 --samples-per-class 300 --output bench.json
+    python -m app.benchmarks --stages duplicate_check combine --compare bench.json --max-regression 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks", description="학습 파이프라인 단계별 벤치마크")
+    parser.add_argument("--classes", type=int, default=10, help="기반 데이터셋 클래스 수")
+    parser.add_argument("--samples-per-class", type=int, default=300, help="클래스당 기반 데이터 행 수")
+    parser.add_argument("--new-samples", type=int, default=300, help="새 제스처 요청의 행 수")
+    parser.add_argument("--repeats", type=int, default=5, help="빠른 단계 반복 측정 횟수")
+    parser.add_argument("--train-repeats", type=int, default=1, help="학습 포함 단계 반복 측정 횟수")
+    parser.add_argument("--epochs", type=int, default=20, help="학습 최대 epoch 수")
+    parser.add_argument("--training-mode", choices=("head_only", "full"), default="head_only")
+    parser.add_argument("--base-model", default=None, help="합성 모델 대신 사용할 기반 Keras 모델 경로")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", default=None, help="측정할 단계 (기본: 전체)")
+    parser.add_argument("--micro-only", action="store_true", help="학습이 포함되지 않은 단계만 측정")
+    parser.add_argument("--work-dir", default=None, help="작업 디렉토리 (기본: 임시 디렉토리, 종료 시 삭제)")
+    parser.add_argument("--output", default=None, help="JSON 보고서 저장 경로")
+    parser.add_argument("--compare", default=None, help="비교할 기준 JSON 보고서")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용하는 median 증가 비율 (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    # 앱 모듈이 설정을 읽기 전에 외부 서비스 의존성을 끔 (Firebase -> 로컬 저장소, Redis 지표 기록 안 함)
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["METRICS_ENABLED"] = "0"
+    if args.work_dir:
+        os.environ.setdefault("LOCAL_STORAGE_DIR", os.path.join(os.path.abspath(args.work_dir), "storage"))
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from app.benchmarks.runner import (
+        ALL_STAGES, MICRO_STAGES, BenchmarkConfig, PipelineBenchmark, compare_reports, print_report,
+    )
+
+    stages = args.stages or (MICRO_STAGES if args.micro_only else ALL_STAGES)
+    config = BenchmarkConfig(
+        num_classes=args.classes,
+        samples_per_class=args.samples_per_class,
+        new_samples=args.new_samples,
+        repeats=args.repeats,
+        train_repeats=args.train_repeats,
+        epochs=args.epochs,
+        training_mode=args.training_mode,
+        base_model_path=args.base_model,
+        seed=args.seed,
+        stages=stages,
+        work_dir=args.work_dir,
+    )
+    report = PipelineBenchmark(config).run()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    comparison, regressed = None, []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison, regressed = compare_reports(report, baseline, args.max_regression)
+
+    print_report(report, comparison)
+    if regressed:
+        print(f"\n성능 회귀 감지 (허용 {args.max_regression:.0%} 초과): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
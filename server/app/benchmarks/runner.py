@@ -0,0 +1,372 @@
+"""
+학습 파이프라인 단계별 벤치마크.
+
+Celery/Redis/Firebase 없이 임시 작업 디렉토리에서 워커와 같은 구성 요소를 직접 호출합니다.
+업로드는 Firebase 대신 LocalStorage(+ 내용 해시 저장소)로 대체하여 측정합니다.
+"""
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.benchmarks.synthetic import SyntheticLandmarkGenerator, NUM_FEATURES
+from app.core import HparamsConfig, PathConfig
+from app.services.artifact_storage import ContentAddressedStorage, LocalStorage
+from app.worker.ml.data_preprocessor import DataPreprocessor
+from app.worker.ml.dataset_cache import DatasetCache
+from app.worker.ml.dataset_combiner import DatasetCombiner
+from app.worker.ml.duplicate_chacker import DuplicateChecker
+from app.worker.ml.label_manager import LabelManager, save_label_order
+from app.worker.ml.lineage_store import LineageStore
+from app.worker.ml.model_trainer import ModelTrainer
+from app.worker.ml.update_model_builder import UpdateModelBuilder
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+BASE_MODEL_CODE = "bench_base"
+
+# 빠른 단계(반복 측정)와 학습이 포함된 느린 단계
+MICRO_STAGES = ("ingest", "csv_parse", "cache_load_cold", "cache_load_warm", "lineage_materialize", "duplicate_check", "combine")
+TRAINING_STAGES = ("train", "tflite_convert", "upload", "end_to_end")
+ALL_STAGES = MICRO_STAGES + TRAINING_STAGES
+
+
+class BenchmarkConfig:
+    def __init__(self, num_classes=10, samples_per_class=300, new_samples=300, repeats=5, train_repeats=1,
+                 epochs=20, training_mode="head_only", base_model_path=None, seed=0, stages=ALL_STAGES, work_dir=None):
+        self.num_classes = num_classes
+        self.samples_per_class = samples_per_class
+        self.new_samples = new_samples
+        self.repeats = repeats
+        self.train_repeats = train_repeats
+        self.epochs = epochs
+        self.training_mode = training_mode
+        self.base_model_path = base_model_path
+        self.seed = seed
+        self.stages = tuple(stages)
+        self.work_dir = work_dir
+
+    def to_dict(self):
+        return {k: (list(v) if isinstance(v, tuple) else v) for k, v in vars(self).items() if k != "work_dir"}
+
+
+def _summary(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def _measure(fn, repeats, setup=None):
+    """setup(선택)을 측정에서 제외하고 fn 을 repeats 번 실행한 소요 시간(초) 목록과 마지막 반환값"""
+    samples, result = [], None
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import tensorflow as tf
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "tensorflow": tf.__version__,
+    }
+
+
+def _build_synthetic_base_model(path, num_classes):
+    """기존 기반 모델과 같은 구조(Conv1D 특징 추출기 + Dense 헤드 2층)의 무작위 가중치 모델 저장"""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout, Input, Conv1D, MaxPooling1D, Flatten
+
+    model = Sequential([
+        Input(shape=(NUM_FEATURES, 1)),
+        Conv1D(32, 3, activation='relu'),
+        MaxPooling1D(2),
+        Conv1D(64, 3, activation='relu'),
+        MaxPooling1D(2),
+        Flatten(),
+        Dense(128, activation='relu'),
+        Dropout(0.3),
+        Dense(num_classes, activation='softmax'),
+    ])
+    model.save(path)
+
+
+class PipelineBenchmark:
+    def __init__(self, config: BenchmarkConfig):
+        self.config = config
+        self.generator = SyntheticLandmarkGenerator(seed=config.seed)
+        self.root = config.work_dir or tempfile.mkdtemp(prefix="ghostouch_bench_")
+        self._owns_root = config.work_dir is None
+        self._model_seq = 0
+        self.results = {}
+
+    # ---- 작업 디렉토리 준비 ----
+    def setup(self):
+        c = self.config
+        logger.info(f"벤치마크 작업 디렉토리: {self.root}")
+        self.base = self.generator.dataset(c.num_classes, c.samples_per_class)
+        self.new_landmarks = self.generator.gesture(c.new_samples)
+
+        base_paths = PathConfig(BASE_MODEL_CODE, BASE_MODEL_CODE, base_dir=self.root)
+        self.models_dir = base_paths.MODELS_DIR
+        self.base_csv_path = base_paths.base_csv_path
+        self.base_keras_model_path = base_paths.base_keras_model_path
+        self.base_labels_path = base_paths.base_labels_path
+        self.base.to_frame().to_csv(self.base_csv_path, index=False)
+        if c.base_model_path:
+            shutil.copyfile(c.base_model_path, self.base_keras_model_path)
+        else:
+            _build_synthetic_base_model(self.base_keras_model_path, c.num_classes)
+            # 무작위 가중치 모델이므로 출력 열 순서는 기반 데이터의 라벨 순서로 기록 (헤드 warm start 측정용)
+            save_label_order(self.base_labels_path, self.base.present_labels())
+
+        self.incremental = DataPreprocessor.landmarks_to_dataset(self.new_landmarks, "bench_new_gesture")
+
+    def cleanup(self):
+        if self._owns_root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def _next_path_configs(self):
+        self._model_seq += 1
+        return PathConfig(BASE_MODEL_CODE, f"bench_{self._model_seq:04d}", base_dir=self.root)
+
+    def _hparams(self):
+        hparams = HparamsConfig()
+        hparams.EPOCHS = self.config.epochs
+        hparams.TRAINING_MODE = self.config.training_mode
+        return hparams
+
+    def _clear_dataset_cache(self):
+        cache = DatasetCache(self.base_csv_path)
+        for path in (cache.features_path, cache.labels_path, cache.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _record(self, stage, samples, **extra):
+        self.results[stage] = {"repeats": len(samples), "seconds": _summary(samples), "samples": samples, **extra}
+        logger.info(f"[BENCH] {stage}: median {self.results[stage]['seconds']['median']:.4f}s ({len(samples)}회)")
+
+    # ---- 단계별 측정 ----
+    def bench_ingest(self):
+        samples, _ = _measure(lambda: DataPreprocessor.landmarks_to_dataset(self.new_landmarks, "bench_new_gesture"), self.config.repeats)
+        self._record("ingest", samples, rows=len(self.new_landmarks))
+
+    def bench_csv_parse(self):
+        samples, _ = _measure(lambda: DataPreprocessor.csv_to_dataset(self.base_csv_path), self.config.repeats)
+        self._record("csv_parse", samples, rows=len(self.base))
+
+    def bench_cache_load_cold(self):
+        samples, _ = _measure(lambda: DataPreprocessor.load_cached(self.base_csv_path), self.config.repeats, setup=self._clear_dataset_cache)
+        self._record("cache_load_cold", samples, rows=len(self.base))
+
+    def bench_cache_load_warm(self):
+        DataPreprocessor.load_cached(self.base_csv_path)
+        samples, _ = _measure(lambda: DataPreprocessor.load_cached(self.base_csv_path), self.config.repeats)
+        self._record("cache_load_warm", samples, rows=len(self.base))
+
+    def bench_lineage_materialize(self):
+        # 부모 -> 자식 2단계 계보를 만든 뒤 프로세스 캐시 없이 구성하는 시간 측정
+        store = LineageStore(self.models_dir)
+        parent = self._next_path_configs().new_model_code
+        store.write_delta(parent, BASE_MODEL_CODE, self.incremental)
+        child = self._next_path_configs().new_model_code
+        store.write_delta(child, parent, self.incremental)
+
+        samples, dataset = _measure(lambda: store.materialize(child), self.config.repeats, setup=LineageStore._materialized.clear)
+        self._record("lineage_materialize", samples, rows=len(dataset), depth=3)
+
+    def bench_duplicate_check(self):
+        hparams = self._hparams()
+        checker = DuplicateChecker(hparams.DUP_CHUNK_SIZE, hparams.DUP_WORKERS)
+        base_grouped = self.base.group_by_label()
+        inc_grouped = self.incremental.group_by_label()
+        samples, is_dup = _measure(
+            lambda: checker.check_incremental_vs_all(inc_grouped, base_grouped, hparams.DUP_THRESHOLD, hparams.TOLERANCE_THRESHOLD),
+            self.config.repeats,
+        )
+        self._record("duplicate_check", samples, base_rows=len(self.base), incremental_rows=len(self.incremental), is_duplicate=bool(is_dup))
+
+    def bench_combine(self):
+        def combine():
+            return DatasetCombiner(self._next_path_configs()).combine_and_save_data(self.base, self.incremental)
+        samples, combined = _measure(combine, self.config.repeats)
+        self._record("combine", samples, rows=len(combined))
+
+    def _trainer(self):
+        path_configs = self._next_path_configs()
+        combined = self.base.append(self.incremental)
+        label_map, _ = LabelManager(self.base, combined).build_label_map()
+        hparams = self._hparams()
+        model_builder = UpdateModelBuilder(self.base_keras_model_path, hparams.WARM_START_HEAD, label_map, self.base_labels_path)
+        return ModelTrainer(model_builder, path_configs, hparams, label_map, combined, base_data=self.base)
+
+    def bench_train(self):
+        # train() 은 평가/저장/TFLite 변환까지 포함 (워커의 '모델 학습' 단계와 동일)
+        trainers = []
+
+        def train():
+            trainer = self._trainer()
+            trainers.append(trainer)
+            return trainer.train()
+
+        samples, _ = _measure(train, self.config.train_repeats)
+        self._trained = trainers[-1]
+        self._record("train", samples, epochs_run=[t.epochs_run for t in trainers],
+                     stop_reason=[t.stop_reason for t in trainers], training_mode=trainers[-1].training_mode,
+                     warm_start=trainers[-1].model_builder.warm_started)
+
+    def bench_tflite_convert(self):
+        trainer = getattr(self, "_trained", None)
+        if trainer is None:
+            trainer = self._trainer()
+            trainer.train()
+        from app.worker.ml.model_cache import get_model_cache
+        model = get_model_cache().get_shared(trainer.path_configs.combined_keras_model_path)
+        x_train = trainer._load_and_prepare_data()[0]
+        samples, _ = _measure(lambda: trainer._convert_to_tflite(model, x_train), self.config.train_repeats)
+        self._record("tflite_convert", samples, tflite_bytes=os.path.getsize(trainer.path_configs.tflite_model_path))
+
+    def bench_upload(self):
+        trainer = getattr(self, "_trained", None)
+        if trainer is None:
+            self.bench_train()
+            trainer = self._trained
+        path_configs = trainer.path_configs
+        store = LineageStore(self.models_dir)
+        store.write_delta(path_configs.new_model_code, BASE_MODEL_CODE, self.incremental)
+        files = [path_configs.tflite_model_path, path_configs.combined_keras_model_path, *store.artifact_paths(path_configs.new_model_code)]
+
+        def upload():
+            # 반복마다 빈 저장소를 사용하여 중복 제거 없이 실제 업로드 비용 측정
+            storage_dir = tempfile.mkdtemp(prefix="storage_", dir=self.root)
+            storage = ContentAddressedStorage(LocalStorage(storage_dir, "http://localhost/artifacts"))
+            storage.put(files[0], f"models/{os.path.basename(files[0])}", public=True)
+            for path in files[1:]:
+                storage.put(path, f"models/bench/{os.path.basename(path)}")
+
+        samples, _ = _measure(upload, self.config.repeats)
+        self._record("upload", samples, files=len(files), bytes=sum(os.path.getsize(p) for p in files))
+
+    def bench_end_to_end(self):
+        """_run_training_pipeline 과 같은 순서로 한 작업 전체를 실행 (Celery 진행률 보고/원격 업로드 제외)"""
+        hparams = self._hparams()
+        storage = ContentAddressedStorage(LocalStorage(os.path.join(self.root, "storage_e2e"), "http://localhost/artifacts"))
+        stage_samples = {}
+
+        def run():
+            path_configs = self._next_path_configs()
+            timings = {}
+
+            def timed(name, fn):
+                start = time.perf_counter()
+                result = fn()
+                timings[name] = time.perf_counter() - start
+                return result
+
+            LineageStore._materialized.clear()
+            incremental = timed("ingest", lambda: DataPreprocessor.landmarks_to_dataset(self.new_landmarks, "bench_new_gesture"))
+            store = LineageStore(path_configs.MODELS_DIR)
+            base = timed("load_base", lambda: store.materialize(BASE_MODEL_CODE))
+            checker = DuplicateChecker(hparams.DUP_CHUNK_SIZE, hparams.DUP_WORKERS)
+            timed("duplicate_check", lambda: checker.check_incremental_vs_all(
+                incremental.group_by_label(), base.group_by_label(), hparams.DUP_THRESHOLD, hparams.TOLERANCE_THRESHOLD))
+            combiner = DatasetCombiner(path_configs)
+            combined = timed("combine", lambda: combiner.combine_and_save_data(base, incremental, background=True))
+            label_map, _ = LabelManager(base, combined).build_label_map()
+            model_builder = UpdateModelBuilder(path_configs.base_keras_model_path, hparams.WARM_START_HEAD, label_map, path_configs.base_labels_path)
+            trainer = ModelTrainer(model_builder, path_configs, hparams, label_map, combined, base_data=base)
+            timed("train", trainer.train)
+
+            def upload():
+                combiner.wait_saved()
+                storage.put(path_configs.tflite_model_path, f"models/{os.path.basename(path_configs.tflite_model_path)}", public=True)
+                for path in [path_configs.combined_keras_model_path, *store.artifact_paths(path_configs.new_model_code)]:
+                    storage.put(path, f"models/bench/{os.path.basename(path)}")
+            timed("upload", upload)
+
+            for name, elapsed in timings.items():
+                stage_samples.setdefault(name, []).append(elapsed)
+
+        samples, _ = _measure(run, self.config.train_repeats)
+        self._record("end_to_end", samples, stages={name: _summary(s) for name, s in stage_samples.items()})
+
+    def run(self):
+        self.setup()
+        try:
+            for stage in self.config.stages:
+                if stage not in ALL_STAGES:
+                    raise ValueError(f"알 수 없는 벤치마크 단계입니다: {stage}")
+                getattr(self, f"bench_{stage}")()
+        finally:
+            self.cleanup()
+        return self.report()
+
+    def report(self):
+        return {
+            "version": REPORT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "environment": _environment(),
+            "config": self.config.to_dict(),
+            "stages": self.results,
+        }
+
+
+def compare_reports(current: dict, baseline: dict, max_regression: float):
+    """
+    단계별 median 소요 시간을 기준 보고서와 비교.
+
+    Returns:
+        (rows, regressed): rows 는 (stage, baseline_median, current_median, ratio), regressed 는 허용치를 넘은 단계 목록
+    """
+    if current.get("config") != baseline.get("config"):
+        logger.warning("기준 보고서와 벤치마크 설정이 달라 비교 결과가 정확하지 않을 수 있습니다.")
+
+    rows, regressed = [], []
+    for stage, result in current["stages"].items():
+        base_result = baseline.get("stages", {}).get(stage)
+        if base_result is None:
+            continue
+        before, after = base_result["seconds"]["median"], result["seconds"]["median"]
+        ratio = after / before if before > 0 else float("inf")
+        rows.append((stage, before, after, ratio))
+        if ratio > 1.0 + max_regression:
+            regressed.append(stage)
+    return rows, regressed
+
+
+def print_report(report: dict, comparison=None, out=sys.stdout):
+    print(f"{'stage':<22}{'median(s)':>12}{'min(s)':>12}{'max(s)':>12}{'n':>4}", file=out)
+    for stage, result in report["stages"].items():
+        s = result["seconds"]
+        print(f"{stage:<22}{s['median']:>12.4f}{s['min']:>12.4f}{s['max']:>12.4f}{result['repeats']:>4}", file=out)
+    if comparison:
+        print(f"\n{'stage':<22}{'baseline':>12}{'current':>12}{'ratio':>8}", file=out)
+        for stage, before, after, ratio in comparison:
+            print(f"{stage:<22}{before:>12.4f}{after:>12.4f}{ratio:>8.2f}", file=out)
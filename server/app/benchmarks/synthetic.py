@@ -0,0 +1,118 @@
+"""
+벤치마크용 합성 손 랜드마크 생성기.
+
+MediaPipe Hands 와 같은 21개 관절(손목 1 + 손가락 5개 x 4관절)의 (x, y, z) 좌표를 만들고,
+손목 기준 평행 이동 + 크기 정규화 후 handedness 를 붙여 64차원 특징 벡터로 변환합니다.
+클래스(제스처)마다 손가락 굽힘 정도가 다른 기준 자세를 두고, 샘플마다 회전/크기/관절 잡음을 더합니다.
+"""
+import numpy as np
+
+from app.worker.ml.dataset import Dataset
+
+NUM_LANDMARKS = 21
+NUM_FEATURES = NUM_LANDMARKS * 3 + 1  # 21 x (x, y, z) + handedness
+
+# 손가락별 손목 기준 방향(라디안)과 마디 길이 (엄지, 검지, 중지, 약지, 소지)
+_FINGER_ANGLES = np.array([-0.9, -0.3, 0.0, 0.25, 0.5], dtype=np.float32)
+_BONE_LENGTHS = np.array([
+    [0.35, 0.30, 0.25, 0.20],
+    [0.90, 0.40, 0.25, 0.20],
+    [0.90, 0.45, 0.28, 0.22],
+    [0.85, 0.40, 0.26, 0.20],
+    [0.80, 0.30, 0.20, 0.18],
+], dtype=np.float32)
+
+
+def _poses(curls: np.ndarray, spread: np.ndarray) -> np.ndarray:
+    """
+    손가락 굽힘(curls: (N, 5), 0=펴짐 ~ 1=완전히 굽힘)과 벌어짐(spread: (N,))으로 (N, 21, 3) 관절 좌표 생성
+    """
+    n = curls.shape[0]
+    points = np.zeros((n, NUM_LANDMARKS, 3), dtype=np.float32)
+    for finger in range(5):
+        direction = _FINGER_ANGLES[finger] * (1.0 + spread)            # (N,)
+        position = np.zeros((n, 3), dtype=np.float32)
+        pitch = np.zeros(n, dtype=np.float32)
+        for joint in range(4):
+            # 첫 마디(손바닥 뼈)는 거의 굽지 않고, 끝 마디로 갈수록 굽힘이 커짐
+            pitch = pitch + curls[:, finger] * (0.15 if joint == 0 else 0.55)
+            length = _BONE_LENGTHS[finger, joint]
+            step = np.stack([
+                np.sin(direction) * np.cos(pitch),
+                -np.cos(direction) * np.cos(pitch),
+                -np.sin(pitch),
+            ], axis=1) * length
+            position = position + step
+            points[:, 1 + finger * 4 + joint] = position
+    return points
+
+
+def _axis_rotation(angle: np.ndarray, axis: int) -> np.ndarray:
+    """angle (N,) 만큼 axis 축으로 회전하는 (N, 3, 3) 행렬"""
+    i, j = [k for k in range(3) if k != axis]
+    rotation = np.zeros((angle.shape[0], 3, 3), dtype=np.float32)
+    rotation[:, axis, axis] = 1.0
+    rotation[:, i, i] = np.cos(angle)
+    rotation[:, j, j] = np.cos(angle)
+    rotation[:, i, j] = -np.sin(angle)
+    rotation[:, j, i] = np.sin(angle)
+    return rotation
+
+
+def _random_rotation(rng: np.random.Generator, n: int, max_angle: float) -> np.ndarray:
+    """화면 평면(z축) 회전 위주의 작은 3차원 회전 행렬 (N, 3, 3)"""
+    roll = rng.uniform(-max_angle, max_angle, n)
+    yaw = rng.uniform(-max_angle, max_angle, n) * 0.5
+    pitch = rng.uniform(-max_angle, max_angle, n) * 0.5
+    return _axis_rotation(roll, 2) @ _axis_rotation(yaw, 1) @ _axis_rotation(pitch, 0)
+
+
+class SyntheticLandmarkGenerator:
+    """
+    재현 가능한(seed 고정) 합성 제스처 데이터셋 생성기.
+
+    Args:
+        seed: 난수 시드
+        noise: 관절 좌표 잡음 표준편차 (정규화 전 손 크기 기준)
+        max_rotation: 샘플별 최대 회전 각(라디안)
+    """
+
+    def __init__(self, seed: int = 0, noise: float = 0.02, max_rotation: float = 0.35):
+        self.rng = np.random.default_rng(seed)
+        self.noise = noise
+        self.max_rotation = max_rotation
+
+    def class_templates(self, num_classes: int) -> np.ndarray:
+        """클래스별 기준 손가락 굽힘 (num_classes, 5)"""
+        return self.rng.uniform(0.0, 1.0, size=(num_classes, 5)).astype(np.float32)
+
+    def sample(self, template: np.ndarray, count: int) -> np.ndarray:
+        """하나의 기준 자세에서 count 개의 (count, 64) float32 특징 벡터 생성"""
+        rng = self.rng
+        curls = np.clip(template[None, :] + rng.normal(0, 0.05, size=(count, 5)), 0.0, 1.0).astype(np.float32)
+        spread = rng.normal(0, 0.1, size=count).astype(np.float32)
+        points = _poses(curls, spread)
+
+        points = points @ _random_rotation(rng, count, self.max_rotation).transpose(0, 2, 1)
+        points *= rng.uniform(0.7, 1.3, size=(count, 1, 1)).astype(np.float32)
+        points += rng.normal(0, self.noise, size=points.shape).astype(np.float32)
+
+        # 손목 기준 평행 이동 + 손 크기 정규화 (학습 데이터와 같은 좌표 범위)
+        points -= points[:, :1, :]
+        scale = np.linalg.norm(points, axis=2).max(axis=1, keepdims=True)[..., None]
+        points /= np.maximum(scale, 1e-6) * 10.0
+
+        handedness = rng.integers(0, 2, size=(count, 1)).astype(np.float32)
+        return np.concatenate([points.reshape(count, -1), handedness], axis=1).astype(np.float32)
+
+    def dataset(self, num_classes: int, samples_per_class: int, label_prefix: str = "gesture") -> Dataset:
+        """num_classes 개 클래스 x samples_per_class 행의 Dataset"""
+        templates = self.class_templates(num_classes)
+        features = np.concatenate([self.sample(t, samples_per_class) for t in templates], axis=0)
+        codes = np.repeat(np.arange(num_classes, dtype=np.int32), samples_per_class)
+        vocab = [f"{label_prefix}_{i}" for i in range(num_classes)]
+        return Dataset(features, codes, vocab)
+
+    def gesture(self, count: int) -> np.ndarray:
+        """새 제스처 한 개의 요청 landmarks ((count, 64) 배열)"""
+        return self.sample(self.class_templates(1)[0], count)
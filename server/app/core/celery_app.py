@@ -1,5 +1,8 @@
+import os
+import time
+
 from celery import Celery
-from app.utils import firebase_util
+from celery.signals import before_task_publish
 
 
 # run in local
@@ -18,6 +21,27 @@ celery_app = Celery(
     include=['app.worker.training_tasks']
 )
 
+# 예상 비용별 학습 대기열과 TFLite 변환/업로드 단계 대기열 (대기열마다 별도 워커/동시성으로 실행)
+INTERACTIVE_QUEUE = os.getenv("INTERACTIVE_QUEUE", "train_interactive")
+BULK_QUEUE = os.getenv("BULK_QUEUE", "train_bulk")
+FINALIZE_QUEUE = os.getenv("FINALIZE_QUEUE", "train_finalize")
+# 학습/변환 단계 하나의 실행 시간 상한 (초과하면 워커가 작업을 강제 종료)
+TRAINING_TIME_LIMIT_SEC = int(os.getenv("TRAINING_TIME_LIMIT_SEC", "3600"))
+
 celery_app.conf.update(
     result_expires = 300,
+    task_time_limit = TRAINING_TIME_LIMIT_SEC,
+    # 같은 대기열 안에서 priority(0이 가장 높음) 순으로 꺼내도록 Redis 대기열을 우선순위별로 나눔
+    broker_transport_options = {"priority_steps": list(range(10)), "sep": ":", "queue_order_strategy": "priority"},
+    # 긴 작업이 짧은 작업을 미리 가져가 붙잡고 있지 않도록 자식 프로세스당 하나씩만 예약
+    worker_prefetch_multiplier = 1,
+    # 워커 자식 프로세스 수 (자식별 TensorFlow 스레드/코어 분배 계산에도 사용)
+    worker_concurrency = int(os.getenv("WORKER_CONCURRENCY", str(os.cpu_count() or 1))),
 )
+
+
+@before_task_publish.connect
+def _stamp_enqueued_at(headers=None, **kwargs):
+    # 워커에서 대기열 대기 시간을 계산할 수 있도록 등록 시각을 메시지 헤더에 기록
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
@@ -8,4 +8,23 @@ class HparamsConfig:
         self.BATCH_SIZE = 32
         self.INCREMENTAL_LEARNING_RATE = 0.001
         self.DUP_THRESHOLD = 10.0 # 중복 허용 임계값 (%)
-        self.TOLERANCE_THRESHOLD = 0.00005
\ No newline at end of file
+        self.TOLERANCE_THRESHOLD = 0.00005
+        self.DUP_CHUNK_SIZE = 256 # 중복 검사 시 한 번에 비교할 증분 벡터 수
+        self.DUP_WORKERS = int(os.getenv("DUP_WORKERS", "1")) # 중복 검사 병렬 스레드 수
+        # 학습 모드: "head_only"(고정 특징 추출기 + 헤드만 학습, 기본) 또는 "full"(전체 미세조정)
+        self.TRAINING_MODE = os.getenv("TRAINING_MODE", "head_only")
+        # 학습 예산: "fixed"(기존과 같이 EPOCHS/BATCH_SIZE + EarlyStopping, 기본) 또는
+        # "deadline"(데이터 크기 기반 epoch/batch + 시간 예산/목표 정확도 중단, 선택)
+        self.BUDGET_MODE = os.getenv("BUDGET_MODE", "fixed")
+        self.TRAIN_BUDGET_SEC = float(os.getenv("TRAIN_BUDGET_SEC", "60")) # deadline 모드의 작업당 학습(fit) 시간 상한 (0이면 무제한)
+        self.TARGET_ACCURACY = float(os.getenv("TARGET_ACCURACY", "0.995")) # deadline 모드에서 검증 정확도가 이 값에 도달하면 중단 (0이면 사용 안 함)
+        self.MIN_EPOCHS = 10
+        self.MAX_TRAIN_STEPS = 5000 # 전체 학습 step 수 상한 (최대 epoch 계산용)
+        self.TARGET_STEPS_PER_EPOCH = 50 # batch 크기 조정 기준
+        self.MAX_BATCH_SIZE = 512
+        # 새 분류 헤드를 기반 모델의 헤드(dense/output) 가중치로 초기화 (기존 클래스는 이어서 학습, 새 라벨 열만 새로 초기화)
+        # 기본 꺼짐, 켜도 기반 모델의 출력 라벨 순서 기록({model_code}_labels.json)이 있을 때만 적용
+        self.WARM_START_HEAD = os.getenv("WARM_START_HEAD", "0") == "1"
+        # 새 계보(루트 모델 기반)에 적용할 랜드마크 정규화 버전: "none"(기본, 클라이언트 값 그대로) 또는 "wrist_mcp_v1"
+        # 기존 계보는 manifest 에 기록된 버전을 계속 사용합니다.
+        self.NORMALIZATION = None if os.getenv("LANDMARK_NORMALIZATION", "none") in ("", "none") else os.getenv("LANDMARK_NORMALIZATION")
@@ -0,0 +1,167 @@
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+
+import redis
+
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 0 이면 지표를 기록하지 않음 (Redis 없이 실행하는 벤치마크/로컬 실행용)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+_PREFIX = "metrics:"
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, math.inf)
+
+
+def _label_str(labels: dict) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+
+
+def _fmt(value: float) -> str:
+    return "+Inf" if value == math.inf else repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.key = f"{_PREFIX}{name}"
+        _registry.append(self)
+
+    def _safe(self, fn):
+        # 지표 기록 실패가 학습/요청 처리에 영향을 주지 않도록 함
+        if not METRICS_ENABLED:
+            return
+        try:
+            fn()
+        except redis.RedisError as e:
+            logger.debug(f"지표 기록 실패({self.name}): {e}")
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        self._safe(lambda: get_redis().hincrbyfloat(self.key, _label_str(labels), amount))
+
+    def render(self, raw: dict):
+        lines = []
+        for label, value in sorted(raw.items()):
+            lines.append(f"{self.name}{{{label}}} {float(value)}" if label else f"{self.name} {float(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    버킷별 개수(누적 아님), 합계, 개수를 Redis 해시에 저장하고 렌더링 시 누적 버킷으로 변환합니다.
+    여러 워커 프로세스/호스트의 관측값이 같은 키에 모입니다.
+    """
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets) if buckets[-1] == math.inf else tuple(buckets) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        if value is None or math.isnan(value):
+            # NaN 은 어느 버킷에도 속하지 않고 합계를 망가뜨리므로 기록하지 않음
+            logger.debug(f"지표 기록 건너뜀({self.name}): 값이 NaN 입니다")
+            return
+        label = _label_str(labels)
+
+        def write():
+            bucket = next((b for b in self.buckets if value <= b), math.inf)
+            pipe = get_redis().pipeline()
+            pipe.hincrby(self.key, f"{label}|bucket|{_fmt(bucket)}", 1)
+            pipe.hincrbyfloat(self.key, f"{label}|sum", value)
+            pipe.hincrby(self.key, f"{label}|count", 1)
+            pipe.execute()
+
+        self._safe(write)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self, raw: dict):
+        series = {}
+        for field, value in raw.items():
+            label, kind, *rest = field.split("|")
+            entry = series.setdefault(label, {"buckets": {}, "sum": 0.0, "count": 0})
+            if kind == "bucket":
+                entry["buckets"][rest[0]] = int(float(value))
+            elif kind == "sum":
+                entry["sum"] = float(value)
+            elif kind == "count":
+                entry["count"] = int(float(value))
+
+        lines = []
+        for label, entry in sorted(series.items()):
+            cumulative = 0
+            for bucket in self.buckets:
+                cumulative += entry["buckets"].get(_fmt(bucket), 0)
+                le = f'le="{_fmt(bucket)}"'
+                lines.append(f"{self.name}_bucket{{{label + ',' if label else ''}{le}}} {cumulative}")
+            suffix = f"{{{label}}}" if label else ""
+            lines.append(f"{self.name}_sum{suffix} {entry['sum']}")
+            lines.append(f"{self.name}_count{suffix} {entry['count']}")
+        return lines
+
+
+_registry = []
+
+
+def render_metrics() -> str:
+    """등록된 모든 지표를 Prometheus text exposition 형식으로 변환"""
+    pipe = get_redis().pipeline()
+    for metric in _registry:
+        pipe.hgetall(metric.key)
+    results = pipe.execute()
+
+    lines = []
+    for metric, raw in zip(_registry, results):
+        raw = {k.decode() if isinstance(k, bytes) else k: v.decode() if isinstance(v, bytes) else v for k, v in raw.items()}
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        lines.extend(metric.render(raw))
+    return "\n".join(lines) + "\n"
+
+
+# ---- 학습 파이프라인 지표 ----
+STAGE_SECONDS = Histogram("ghostouch_training_stage_seconds", "학습 파이프라인 단계별 소요 시간(초)")
+JOB_SECONDS = Histogram("ghostouch_training_job_seconds", "학습 작업 전체 소요 시간(초)")
+QUEUE_WAIT_SECONDS = Histogram("ghostouch_training_queue_wait_seconds", "작업 등록부터 워커 시작까지 대기 시간(초)")
+EPOCHS_RUN = Histogram(
+    "ghostouch_training_epochs_run", "실제로 수행된 학습 epoch 수",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, math.inf),
+)
+DATASET_ROWS = Histogram(
+    "ghostouch_training_dataset_rows", "학습에 사용된 데이터 행 수",
+    buckets=(10, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, math.inf),
+)
+JOBS_TOTAL = Counter("ghostouch_training_jobs_total", "종료된 학습 작업 수 (status 별)")
+MODEL_ARTIFACT_EVENTS = Counter("ghostouch_model_artifact_events_total", "models/ 디렉토리 LRU 정리와 재다운로드 횟수 (event 별)")
+
+
+@contextmanager
+def stage_timer(stage: str, timings: dict = None):
+    """파이프라인 단계 소요 시간을 로그로 남기고 STAGE_SECONDS 에 기록 (timings 가 주어지면 단계별 시간도 저장)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[stage] = round(elapsed, 4)
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        logger.info(f"[STAGE] {stage}: {elapsed:.3f}s")
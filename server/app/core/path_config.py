@@ -28,8 +28,18 @@ class PathConfig:
         self.combined_csv_path = os.path.join(self.new_model_dir, self.new_model_code + '.csv')
 
         self.base_keras_model_path = os.path.join(self.base_model_dir, f"{model_code}_model.keras")
+        # 모델 출력 열 순서대로의 라벨 목록
+        self.base_labels_path = os.path.join(self.base_model_dir, f"{model_code}_labels.json")
+        self.combined_labels_path = os.path.join(self.new_model_dir, f"{new_model_code}_labels.json")
         self.combined_keras_model_path = os.path.join(self.new_model_dir, f"{new_model_code}_model.keras")
         self.tflite_model_path = os.path.join(self.new_model_dir, f"{new_model_code}_model.tflite")
+        # TFLite 양자화 대표 데이터 표본 (학습 단계에서 저장, 변환 단계에서 사용)
+        self.representative_path = os.path.join(self.new_model_dir, f"{new_model_code}_representative.npy")
+
+        # 계보 기반 데이터셋: 새 모델은 부모(model_code) 정보와 자신이 추가한 행(delta)만 저장
+        self.lineage_manifest_path = os.path.join(self.new_model_dir, f"{new_model_code}_lineage.json")
+        self.delta_features_path = os.path.join(self.new_model_dir, f"{new_model_code}_delta_features.npy")
+        self.delta_labels_path = os.path.join(self.new_model_dir, f"{new_model_code}_delta_labels.npy")
 
 
         # self.base_model_dir = os.path.join(self.MODELS_DIR, self.model_code)
@@ -0,0 +1,25 @@
+import redis
+
+from app.core.celery_app import celery_app
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Celery 결과 저장소와 같은 Redis에 대한 프로세스 공용 클라이언트 (커넥션 풀 재사용)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(celery_app.conf.result_backend)
+    return _client
+
+
+_async_client = None
+
+
+def get_async_redis():
+    """API(이벤트 루프)에서 쓰는 비동기 Redis 클라이언트. pub/sub 구독 연결을 많이 유지해도 스레드를 점유하지 않습니다."""
+    global _async_client
+    if _async_client is None:
+        import redis.asyncio as aioredis
+        _async_client = aioredis.Redis.from_url(celery_app.conf.result_backend)
+    return _async_client
@@ -1,12 +1,23 @@
+import os
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.train_api import router as training_router
+from app.api.metrics_api import router as metrics_router
+from app.services import artifact_storage
 
 import uvicorn
 
 app = FastAPI()
 app.include_router(training_router)
+app.include_router(metrics_router)
+
+# 로컬 저장소 사용 시 업로드된 아티팩트를 HTTP로 제공 (개발/부하 테스트용)
+if artifact_storage.STORAGE_BACKEND == "local":
+    from fastapi.staticfiles import StaticFiles
+    os.makedirs(artifact_storage.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount("/artifacts", StaticFiles(directory=artifact_storage.LOCAL_STORAGE_DIR), name="artifacts")
 
 app.add_middleware(
     CORSMiddleware,
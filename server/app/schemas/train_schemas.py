@@ -1,11 +1,19 @@
 from pydantic import BaseModel
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Dict
 
 class TaskRequest(BaseModel):
     model_code: str
     landmarks: List[Any]
     gesture: str
 
+class GestureSample(BaseModel):
+    gesture: str
+    landmarks: List[Any]
+
+class BatchTaskRequest(BaseModel):
+    model_code: str
+    gestures: List[GestureSample]
+
 class TaskResponse(BaseModel):
     task_id: str
 
@@ -16,3 +24,24 @@ class StatusResponse(BaseModel):
     result: Optional[Any] = None # 'result' 대신 'data'
     error_info: Optional[str] = None # 'error_info' 대신 'error'
 
+class BulkStatusRequest(BaseModel):
+    task_ids: List[str]
+
+class JobRecord(BaseModel):
+    task_id: str
+    status: str
+    stage: Optional[str] = None # 마지막으로 진행한 단계
+    model_code: Optional[str] = None
+    device_id: Optional[str] = None
+    queue: Optional[str] = None
+    submitted_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_wait_sec: Optional[float] = None
+    duration_sec: Optional[float] = None
+    stage_timings: Optional[Dict[str, float]] = None
+    tflite_url: Optional[str] = None
+    new_model_code: Optional[str] = None
+    gestures: Optional[List[str]] = None
+    result: Optional[Any] = None
+    error_info: Optional[str] = None
@@ -0,0 +1,254 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+# 저장소 선택: "firebase"(기본) 또는 "local"(개발/부하 테스트용, API 서버가 /artifacts 로 제공)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firebase")
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", os.path.join(os.path.abspath("."), "storage"))
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000/artifacts")
+
+# 내용 해시 기반 중복 제거/압축 저장 사용 여부
+ARTIFACT_DEDUP = os.getenv("ARTIFACT_DEDUP", "1") == "1"
+
+# 이 크기(256KB 배수)보다 큰 파일은 청크 단위 resumable 업로드로 전송
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_MB", "8")) * 1024 * 1024
+
+
+class ArtifactStorage:
+    """모델/데이터셋 아티팩트 저장소 인터페이스"""
+
+    def put(self, local_path: str, key: str, public: bool = False, content_encoding: str = None) -> str:
+        """local_path 파일을 key 로 저장하고 URL을 반환 (content_encoding: 저장된 바이트의 압축 방식, 예: gzip)"""
+        raise NotImplementedError("서브클래스에서 put()을 구현해야 합니다.")
+
+    def get(self, key: str, local_path: str) -> str:
+        """key 를 local_path 로 내려받고 local_path 를 반환"""
+        raise NotImplementedError("서브클래스에서 get()을 구현해야 합니다.")
+
+    def put_bytes(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> None:
+        raise NotImplementedError("서브클래스에서 put_bytes()를 구현해야 합니다.")
+
+    def get_bytes(self, key: str) -> bytes:
+        raise NotImplementedError("서브클래스에서 get_bytes()를 구현해야 합니다.")
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError("서브클래스에서 exists()를 구현해야 합니다.")
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError("서브클래스에서 url()을 구현해야 합니다.")
+
+
+class FirebaseStorage(ArtifactStorage):
+    """
+    Firebase Storage 구현. 인증된 버킷(과 그 클라이언트의 HTTP 세션)을 프로세스당 한 번만 만들고 재사용합니다.
+    """
+
+    def __init__(self):
+        self._bucket = None
+        self._lock = threading.Lock()
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            with self._lock:
+                if self._bucket is None:
+                    from app.utils.firebase_util import init_firebase
+                    self._bucket = init_firebase()
+        return self._bucket
+
+    def put(self, local_path: str, key: str, public: bool = False, content_encoding: str = None) -> str:
+        blob = self.bucket.blob(key, chunk_size=UPLOAD_CHUNK_SIZE)
+        if content_encoding:
+            # Content-Encoding 을 기록하면 Accept-Encoding 이 없는 클라이언트에는 GCS가 압축을 풀어 전송
+            blob.content_encoding = content_encoding
+        # 업로드와 공개 설정을 한 번의 요청으로 처리 (make_public 추가 왕복 제거)
+        blob.upload_from_filename(local_path, predefined_acl="publicRead" if public else None)
+        return blob.public_url
+
+    def get(self, key: str, local_path: str) -> str:
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        tmp_path = f"{local_path}.{os.getpid()}.download"
+        # raw_download: 저장된(압축된) 바이트 그대로 받음, 압축 해제는 호출자가 담당
+        self.bucket.blob(key, chunk_size=UPLOAD_CHUNK_SIZE).download_to_filename(tmp_path, raw_download=True)
+        os.replace(tmp_path, local_path)
+        return local_path
+
+    def put_bytes(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> None:
+        self.bucket.blob(key).upload_from_string(data, content_type=content_type)
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.bucket.blob(key).download_as_bytes()
+
+    def exists(self, key: str) -> bool:
+        return self.bucket.blob(key).exists()
+
+    def url(self, key: str) -> str:
+        return self.bucket.blob(key).public_url
+
+
+class LocalStorage(ArtifactStorage):
+    """로컬 디스크 구현. API 서버가 root_dir 을 base_url 로 정적 제공합니다."""
+
+    def __init__(self, root_dir: str = LOCAL_STORAGE_DIR, base_url: str = LOCAL_STORAGE_BASE_URL):
+        self.root_dir = os.path.abspath(root_dir)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root_dir, key))
+        if not path.startswith(self.root_dir + os.sep):
+            raise ValueError(f"잘못된 저장소 키입니다: {key}")
+        return path
+
+    def put(self, local_path: str, key: str, public: bool = False, content_encoding: str = None) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(local_path, tmp_path)
+        os.replace(tmp_path, path)
+        return self.url(key)
+
+    def get(self, key: str, local_path: str) -> str:
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        shutil.copyfile(self._path(key), local_path)
+        return local_path
+
+    def put_bytes(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_bytes(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{quote(key)}"
+
+
+class ContentAddressedStorage(ArtifactStorage):
+    """
+    내용 해시 기반 중복 제거 + 압축 저장소 (다른 저장소를 감쌈).
+
+    - 실제 바이트는 blobs[/public]/sha256/<hash>[.gz] 에 한 번만 저장 (같은 내용은 다시 업로드하지 않음)
+    - 기존 이름(key)은 manifests/<key>.json 에 {sha256, blob, encoding, size} 로 기록
+    - 데이터셋류(.csv/.npy/.json)는 gzip 으로 압축하여 저장 (Content-Encoding: gzip)
+    """
+
+    COMPRESS_EXTENSIONS = (".csv", ".npy", ".json")
+
+    def __init__(self, backend: ArtifactStorage):
+        self.backend = backend
+
+    @staticmethod
+    def _manifest_key(key: str) -> str:
+        return f"manifests/{key}.json"
+
+    def _should_compress(self, key: str) -> bool:
+        return key.lower().endswith(self.COMPRESS_EXTENSIONS)
+
+    @staticmethod
+    def _sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def put(self, local_path: str, key: str, public: bool = False, content_encoding: str = None) -> str:
+        sha = self._sha256(local_path)
+        compress = self._should_compress(key)
+        ext = os.path.splitext(key)[1]
+        # 공개 blob은 별도 경로에 두어 비공개로 먼저 올라간 같은 내용과 섞이지 않게 함
+        prefix = "blobs/public" if public else "blobs"
+        blob_key = f"{prefix}/sha256/{sha[:2]}/{sha}{ext}{'.gz' if compress else ''}"
+
+        # 저장소에서 blob 이 지워졌을 수 있으므로 프로세스 안에 캐시하지 않고 매번 확인 (manifest 가 없는 blob 을 가리키지 않도록)
+        if self.backend.exists(blob_key):
+            logger.info(f"동일 내용 아티팩트가 이미 있어 업로드 생략: {key} -> {blob_key}")
+        else:
+            if compress:
+                # mtime=0 으로 압축하여 같은 입력이면 항상 같은 바이트가 되도록 함
+                tmp_path = f"{local_path}.{os.getpid()}.gz"
+                with open(local_path, "rb") as src, open(tmp_path, "wb") as raw:
+                    with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as dst:
+                        shutil.copyfileobj(src, dst)
+                try:
+                    self.backend.put(tmp_path, blob_key, public=public, content_encoding="gzip")
+                finally:
+                    os.remove(tmp_path)
+            else:
+                self.backend.put(local_path, blob_key, public=public)
+
+        manifest = {
+            "sha256": sha,
+            "blob": blob_key,
+            "encoding": "gzip" if compress else None,
+            "size": os.path.getsize(local_path),
+        }
+        self.backend.put_bytes(json.dumps(manifest).encode("utf-8"), self._manifest_key(key), "application/json")
+        return self.backend.url(blob_key)
+
+    def _read_manifest(self, key: str) -> dict:
+        return json.loads(self.backend.get_bytes(self._manifest_key(key)))
+
+    def get(self, key: str, local_path: str) -> str:
+        manifest = self._read_manifest(key)
+        if manifest["encoding"] != "gzip":
+            return self.backend.get(manifest["blob"], local_path)
+
+        tmp_path = f"{local_path}.{os.getpid()}.gz"
+        self.backend.get(manifest["blob"], tmp_path)
+        try:
+            with gzip.open(tmp_path, "rb") as src, open(local_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        finally:
+            os.remove(tmp_path)
+        return local_path
+
+    def put_bytes(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> None:
+        self.backend.put_bytes(data, key, content_type)
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.backend.get_bytes(key)
+
+    def exists(self, key: str) -> bool:
+        return self.backend.exists(self._manifest_key(key))
+
+    def url(self, key: str) -> str:
+        return self.backend.url(self._read_manifest(key)["blob"])
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> ArtifactStorage:
+    """설정(STORAGE_BACKEND)에 따른 프로세스 공용 저장소"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if STORAGE_BACKEND == "local":
+                    _storage = LocalStorage()
+                elif STORAGE_BACKEND == "firebase":
+                    _storage = FirebaseStorage()
+                else:
+                    raise ValueError(f"지원하지 않는 STORAGE_BACKEND 입니다: {STORAGE_BACKEND}")
+                if ARTIFACT_DEDUP:
+                    _storage = ContentAddressedStorage(_storage)
+                logger.info(f"아티팩트 저장소: {type(_storage).__name__}")
+    return _storage
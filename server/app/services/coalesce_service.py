@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 같은 기기에서 같은 base model 에 대한 단일 제스처 요청을 묶어 한 번에 학습할 대기 시간 (0이면 비활성화)
+COALESCE_WINDOW_SEC = float(os.getenv("COALESCE_WINDOW_SEC", "0"))
+
+# 모인 항목 보관 기간: batch task 가 대기열에서 오래 기다려도 꺼내기 전에 만료되지 않도록 길게 잡음 (합류 때마다 갱신)
+COALESCE_ITEMS_TTL_SEC = int(os.getenv("COALESCE_ITEMS_TTL_SEC", str(24 * 60 * 60)))
+
+_OPEN_KEY = "train_coalesce:open:{}:{}"   # (model_code, device_id) -> 현재 모집 중인 batch task id
+_ITEMS_KEY = "train_coalesce:items:{}"    # batch task id -> 대기 중인 항목 목록
+_HASHES_KEY = "train_coalesce:hashes:{}"  # batch task id -> 합류한 요청의 job_hash 목록 (꺼낸 뒤에도 유지, 실패 시 해제용)
+
+# 모집 중인 batch 가 있으면 항목을 추가하고, 없으면 새 batch 를 연다 (원자적으로 처리)
+_JOIN_OR_OPEN = """
+local batch_id = redis.call('GET', KEYS[1])
+local is_new = 0
+if not batch_id then
+    batch_id = ARGV[1]
+    is_new = 1
+    redis.call('SET', KEYS[1], batch_id, 'PX', ARGV[3])
+end
+local items_key = ARGV[4] .. batch_id
+local hashes_key = ARGV[5] .. batch_id
+redis.call('RPUSH', items_key, ARGV[2])
+redis.call('EXPIRE', items_key, ARGV[6])
+if ARGV[7] ~= '' then
+    redis.call('RPUSH', hashes_key, ARGV[7])
+    redis.call('EXPIRE', hashes_key, ARGV[6])
+end
+return {is_new, batch_id}
+"""
+
+# batch 모집을 닫고 모인 항목을 꺼낸다 (원자적으로 처리하여 닫힌 뒤 추가되는 항목이 없도록 함)
+_CLOSE_AND_DRAIN = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+local items = redis.call('LRANGE', KEYS[2], 0, -1)
+redis.call('DEL', KEYS[2])
+return items
+"""
+
+
+def enabled() -> bool:
+    return COALESCE_WINDOW_SEC > 0
+
+
+def _open_key(model_code: str, device_id: str = None) -> str:
+    # 다른 기기의 요청을 한 모델로 합치면 각 기기가 받은 결과가 자신이 요청하지 않은 라벨을 포함하므로 기기별로 모집
+    return _OPEN_KEY.format(model_code, device_id or "")
+
+
+def join_or_open(model_code: str, task_id: str, item: dict, device_id: str = None):
+    """
+    Returns:
+        (batch_task_id, is_new): is_new 가 True 면 호출자가 batch task 를 countdown 과 함께 예약해야 합니다.
+    """
+    window_ms = int(COALESCE_WINDOW_SEC * 1000)
+    is_new, batch_id = get_redis().eval(
+        _JOIN_OR_OPEN, 1, _open_key(model_code, device_id),
+        task_id, json.dumps(item), window_ms, _ITEMS_KEY.format(""), _HASHES_KEY.format(""),
+        COALESCE_ITEMS_TTL_SEC, item.get("job_hash") or "",
+    )
+    batch_id = batch_id.decode() if isinstance(batch_id, bytes) else batch_id
+    if not is_new:
+        logger.info(f"[COALESCE] model '{model_code}' 의 batch {batch_id} 에 요청 합류")
+    return batch_id, bool(is_new)
+
+
+def close_and_drain(model_code: str, batch_id: str, device_id: str = None) -> list:
+    """batch 모집을 닫고 모인 항목 목록을 반환"""
+    raw_items = get_redis().eval(
+        _CLOSE_AND_DRAIN, 2, _open_key(model_code, device_id), _ITEMS_KEY.format(batch_id), batch_id,
+    )
+    items = [json.loads(raw) for raw in raw_items]
+    logger.info(f"[COALESCE] model '{model_code}' batch {batch_id}: {len(items)}개 요청 병합")
+    return items
+
+
+def batch_job_hashes(batch_id: str) -> list:
+    """batch 에 합류한 요청들의 job_hash (항목을 꺼내지 못했을 때 결과 캐시 등록 해제용)"""
+    return [h.decode() if isinstance(h, bytes) else h for h in get_redis().lrange(_HASHES_KEY.format(batch_id), 0, -1)]
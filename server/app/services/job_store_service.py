@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import time
+
+import redis
+
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 작업 기록 보관 기간과 인덱스(모델/기기별)당 최대 보관 개수
+JOB_STORE_TTL = int(os.getenv("JOB_STORE_TTL", str(30 * 24 * 60 * 60)))  # 초
+JOB_INDEX_MAX = int(os.getenv("JOB_INDEX_MAX", "1000"))
+# 진행 중 기록이 이 시간 동안 갱신되지 않으면 워커가 기록하지 못하고 끝났을 수 있으므로 Celery 상태를 확인
+# (Celery 결과 만료 시간 result_expires 보다 짧아야 실패 결과를 놓치지 않음)
+JOB_STALE_SEC = float(os.getenv("JOB_STALE_SEC", "60"))
+
+_JOB_KEY = "job:{}"                      # task_id -> 작업 기록 (hash)
+_MODEL_INDEX_KEY = "jobs:by_model:{}"    # model_code -> task_id (score: 등록 시각)
+_DEVICE_INDEX_KEY = "jobs:by_device:{}"  # device_id -> task_id (score: 등록 시각)
+_DEVICE_MODEL_INDEX_KEY = "jobs:by_device_model:{}:{}"  # (device_id, model_code) -> task_id (두 조건 동시 조회용)
+
+# JSON 으로 저장하는 필드
+_JSON_FIELDS = ("result", "stage_timings", "gestures")
+_FLOAT_FIELDS = ("submitted_at", "started_at", "finished_at", "updated_at", "queue_wait_sec", "duration_sec")
+
+
+def _write(task_id: str, mapping: dict):
+    """워커/API 에서 작업 기록 갱신 (실패해도 학습/요청 처리에는 영향 없음)"""
+    mapping = {k: (json.dumps(v, ensure_ascii=False) if k in _JSON_FIELDS else v) for k, v in mapping.items() if v is not None}
+    mapping["task_id"] = task_id
+    mapping["updated_at"] = time.time()
+    try:
+        key = _JOB_KEY.format(task_id)
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, JOB_STORE_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"작업 기록 저장 실패({task_id}): {e}")
+
+
+def _index(pipe, key: str, task_id: str, score: float):
+    pipe.zadd(key, {task_id: score})
+    pipe.zremrangebyrank(key, 0, -JOB_INDEX_MAX - 1)
+    pipe.expire(key, JOB_STORE_TTL)
+
+
+def record_submission(task_id: str, model_code: str, device_id: str = None, queue: str = None):
+    """API 에서 작업 등록(또는 기존/병합 작업에 합류) 시 기록하고 model_code/device_id(/둘 다) 인덱스에 추가"""
+    now = time.time()
+    try:
+        key = _JOB_KEY.format(task_id)
+        pipe = get_redis().pipeline()
+        # 이미 있는 기록(합류한 작업)의 상태는 덮어쓰지 않음
+        pipe.hsetnx(key, "task_id", task_id)
+        pipe.hsetnx(key, "status", "PENDING")
+        pipe.hsetnx(key, "model_code", model_code)
+        pipe.hsetnx(key, "submitted_at", now)
+        if queue:
+            pipe.hsetnx(key, "queue", queue)
+        pipe.expire(key, JOB_STORE_TTL)
+        _index(pipe, _MODEL_INDEX_KEY.format(model_code), task_id, now)
+        if device_id:
+            pipe.hsetnx(key, "device_id", device_id)
+            _index(pipe, _DEVICE_INDEX_KEY.format(device_id), task_id, now)
+            _index(pipe, _DEVICE_MODEL_INDEX_KEY.format(device_id, model_code), task_id, now)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"작업 등록 기록 실패({task_id}): {e}")
+
+
+def mark_started(task_id: str, queue_wait_sec: float = None):
+    _write(task_id, {"status": "PROGRESS", "started_at": time.time(), "queue_wait_sec": queue_wait_sec})
+
+
+def update_stage(task_id: str, stage: str):
+    _write(task_id, {"status": "PROGRESS", "stage": stage})
+
+
+def mark_finished(task_id: str, status: str, result: dict = None, error_info: str = None,
+                  duration_sec: float = None, stage_timings: dict = None):
+    mapping = {
+        "status": status,
+        "finished_at": time.time(),
+        "duration_sec": duration_sec,
+        "stage_timings": stage_timings,
+        "error_info": error_info,
+    }
+    if isinstance(result, dict):
+        mapping.update({
+            "result": result,
+            "tflite_url": result.get("tflite_url"),
+            "new_model_code": result.get("model_code"),
+            "gestures": result.get("gestures"),
+        })
+    _write(task_id, mapping)
+
+
+def _decode(raw: dict):
+    if not raw:
+        return None
+    record = {}
+    for k, v in raw.items():
+        k = k.decode() if isinstance(k, bytes) else k
+        v = v.decode() if isinstance(v, bytes) else v
+        if k in _JSON_FIELDS:
+            v = json.loads(v)
+        elif k in _FLOAT_FIELDS:
+            v = float(v)
+        record[k] = v
+    return record
+
+
+def get_jobs(task_ids):
+    """여러 task_id 의 기록을 한 번의 pipeline 으로 조회 (없는 id 는 None)"""
+    pipe = get_redis().pipeline()
+    for task_id in task_ids:
+        pipe.hgetall(_JOB_KEY.format(task_id))
+    return [_decode(raw) for raw in pipe.execute()]
+
+
+def get_job(task_id: str):
+    return get_jobs([task_id])[0]
+
+
+def list_jobs(model_code: str = None, device_id: str = None, limit: int = 50):
+    """model_code 또는 device_id 의 최근 작업 기록 (최신순)"""
+    if device_id and model_code:
+        index_key = _DEVICE_MODEL_INDEX_KEY.format(device_id, model_code)
+    elif device_id:
+        index_key = _DEVICE_INDEX_KEY.format(device_id)
+    elif model_code:
+        index_key = _MODEL_INDEX_KEY.format(model_code)
+    else:
+        raise ValueError("model_code 또는 device_id 가 필요합니다")
+
+    task_ids = [t.decode() if isinstance(t, bytes) else t for t in get_redis().zrevrange(index_key, 0, limit - 1)]
+    # 만료된 기록은 제외
+    return [r for r in get_jobs(task_ids) if r is not None]
+
+
+def is_stale(record: dict, now: float = None) -> bool:
+    """진행 중 기록이 JOB_STALE_SEC 이상 갱신되지 않았는지 여부"""
+    updated_at = record.get("updated_at") or record.get("submitted_at") or 0.0
+    return (now or time.time()) - updated_at >= JOB_STALE_SEC
+
+
+def to_status(record: dict) -> dict:
+    """작업 기록을 StatusResponse 형태로 변환"""
+    status = record.get("status", "PENDING")
+    return {
+        "task_id": record["task_id"],
+        "status": status,
+        "progress": {"current_step": record.get("stage")} if status == "PROGRESS" else None,
+        "result": record.get("result"),
+        "error_info": record.get("error_info"),
+    }
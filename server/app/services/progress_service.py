@@ -0,0 +1,71 @@
+import asyncio
+import json
+import logging
+
+import redis
+
+from app.core.redis_client import get_redis, get_async_redis
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL = "train_progress:{}"
+FINAL_STATUSES = ("SUCCESS", "FAILURE", "DUPLICATE", "INVALID", "REVOKED")
+HEARTBEAT_SEC = 15
+
+
+def failure_status(error_text: str):
+    """실패 원인(traceback 또는 예외 이름)을 (status, error_info) 로 변환"""
+    error_text = error_text or ""
+    # DuplicateDataError인 경우 특별 처리
+    if "DuplicateDataError" in error_text:
+        return "DUPLICATE", "제스처 중복"
+    if "InvalidLandmarkError" in error_text:
+        return "INVALID", "랜드마크 형식 오류"
+    # 일반적인 실패
+    return "FAILURE", "알 수 없는 오류 발생"
+
+
+def publish(task_id: str, payload: dict):
+    """워커에서 작업 상태 변화를 구독자에게 전파합니다. (실패해도 학습에는 영향 없음)"""
+    try:
+        get_redis().publish(_CHANNEL.format(task_id), json.dumps(payload, ensure_ascii=False))
+    except redis.RedisError as e:
+        logger.warning(f"진행 상황 발행 실패: {e}")
+
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def stream(task_id: str, initial_status_fn):
+    """
+    SSE 이벤트 스트림. 먼저 구독한 뒤 현재 상태를 보내 그 사이의 변화를 놓치지 않고,
+    최종 상태를 받으면 종료합니다.
+
+    Args:
+        initial_status_fn: task_id -> 상태 dict 를 반환하는 async 함수
+    """
+    pubsub = get_async_redis().pubsub()
+    await pubsub.subscribe(_CHANNEL.format(task_id))
+    try:
+        current = await initial_status_fn(task_id)
+        yield _sse(current)
+        if current.get("status") in FINAL_STATUSES:
+            return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_SEC)
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            payload = json.loads(message["data"])
+            payload.setdefault("task_id", task_id)
+            yield _sse(payload)
+            if payload.get("status") in FINAL_STATUSES:
+                return
+    except asyncio.CancelledError:
+        # 클라이언트 연결 종료
+        raise
+    finally:
+        await pubsub.unsubscribe(_CHANNEL.format(task_id))
+        await pubsub.aclose()
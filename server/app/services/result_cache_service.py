@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import redis
+
+from app.core.celery_app import TRAINING_TIME_LIMIT_SEC
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(24 * 60 * 60)))  # 초
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+# 진행 중 등록의 유효 시간 (대기열 대기 여유 + 단계 실행 시간 상한). 워커가 강제 종료되어 해제하지 못해도
+# 이 시간이 지나면 같은 요청을 다시 학습할 수 있으며, 결과가 기록되면 RESULT_CACHE_TTL 로 연장됩니다.
+RESULT_CLAIM_TTL = int(os.getenv("RESULT_CLAIM_TTL", str(TRAINING_TIME_LIMIT_SEC + 30 * 60)))
+
+_JOB_KEY = "train_cache:job:{}"        # job_hash -> {"task_id", "result"}
+_RESULT_KEY = "train_cache:result:{}"  # task_id -> 최종 결과 (Celery result_expires 이후에도 유지)
+_INDEX_KEY = "train_cache:index"       # job_hash 등록 시각 (개수 제한용 sorted set)
+
+
+def compute_job_hash(model_code, gesture, landmarks) -> str:
+    """(model_code, gesture, 랜드마크) 의 정규화된 내용 해시"""
+    digest = hashlib.sha256()
+    digest.update(str(model_code).encode("utf-8") + b"\0" + str(gesture).encode("utf-8") + b"\0")
+    try:
+        # 숫자 표현 차이(1 vs 1.0, JSON 포맷)를 없애기 위해 float32 little-endian 바이트로 정규화
+        array = np.ascontiguousarray(np.asarray(landmarks, dtype="<f4"))
+        digest.update(str(array.shape).encode("utf-8") + b"\0")
+        digest.update(array.tobytes())
+    except (TypeError, ValueError):
+        digest.update(json.dumps(landmarks, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def compute_batch_hash(model_code, items) -> str:
+    """여러 (gesture, landmarks) 를 한 번에 학습하는 배치 요청의 내용 해시 (항목 순서 포함)"""
+    digest = hashlib.sha256(str(model_code).encode("utf-8") + b"\0batch\0")
+    for item in items:
+        digest.update(compute_job_hash(model_code, item["gesture"], item["landmarks"]).encode("ascii"))
+    return digest.hexdigest()
+
+
+def claim_job(job_hash: str, task_id: str, replace: bool = False):
+    """
+    job_hash 에 task_id 를 등록합니다. replace=True 면 기존 등록을 덮어씁니다(병합된 batch id 로 교체).
+
+    Returns:
+        이미 같은 내용의 작업이 진행 중이거나 완료되었다면 그 작업의 task_id, 새로 등록했다면 None
+    """
+    try:
+        client = get_redis()
+        key = _JOB_KEY.format(job_hash)
+        if client.set(key, json.dumps({"task_id": task_id}), nx=not replace, ex=RESULT_CLAIM_TTL):
+            pipe = client.pipeline()
+            pipe.zadd(_INDEX_KEY, {job_hash: time.time()})
+            pipe.zcard(_INDEX_KEY)
+            _, size = pipe.execute()
+            if size > RESULT_CACHE_MAX_ENTRIES:
+                _evict_oldest(client, size - RESULT_CACHE_MAX_ENTRIES)
+            return None
+
+        existing = client.get(key)
+        if existing is None:  # 그 사이 만료/해제된 경우 다시 시도
+            return claim_job(job_hash, task_id)
+        return json.loads(existing)["task_id"]
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 사용 불가, 캐시 없이 진행합니다: {e}")
+        return None
+
+
+def refresh_claims(job_hashes):
+    """워커가 단계를 시작할 때 진행 중 등록의 유효 시간을 다시 RESULT_CLAIM_TTL 로 연장"""
+    job_hashes = [job_hash for job_hash in job_hashes if job_hash]
+    if not job_hashes:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for job_hash in job_hashes:
+            pipe.expire(_JOB_KEY.format(job_hash), RESULT_CLAIM_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 등록 연장 실패: {e}")
+
+
+def _evict_oldest(client, count: int):
+    oldest = client.zrange(_INDEX_KEY, 0, count - 1)
+    if not oldest:
+        return
+    pipe = client.pipeline()
+    for job_hash in oldest:
+        job_hash = job_hash.decode() if isinstance(job_hash, bytes) else job_hash
+        pipe.delete(_JOB_KEY.format(job_hash))
+    pipe.zrem(_INDEX_KEY, *oldest)
+    pipe.execute()
+
+
+def record_result(job_hash: str, task_id: str, result: dict):
+    """작업 성공 시 결과를 job_hash 와 task_id 양쪽에 TTL과 함께 저장"""
+    try:
+        payload = json.dumps(result)
+        pipe = get_redis().pipeline()
+        pipe.set(_RESULT_KEY.format(task_id), payload, ex=RESULT_CACHE_TTL)
+        if job_hash:
+            pipe.set(_JOB_KEY.format(job_hash), json.dumps({"task_id": task_id, "result": result}), ex=RESULT_CACHE_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 저장 실패: {e}")
+
+
+def release_job(job_hash: str):
+    """작업 실패 시 등록을 해제하여 같은 요청이 다시 학습될 수 있게 합니다."""
+    if not job_hash:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        pipe.delete(_JOB_KEY.format(job_hash))
+        pipe.zrem(_INDEX_KEY, job_hash)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 해제 실패: {e}")
+
+
+def get_cached_result(task_id: str):
+    """Celery 결과가 만료된 뒤에도 완료된 작업의 결과를 반환 (없으면 None)"""
+    try:
+        payload = get_redis().get(_RESULT_KEY.format(task_id))
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 조회 실패: {e}")
+        return None
+    return json.loads(payload) if payload else None
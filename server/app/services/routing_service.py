@@ -0,0 +1,83 @@
+import logging
+import os
+
+import redis
+
+from app.core import HparamsConfig
+from app.core.celery_app import INTERACTIVE_QUEUE, BULK_QUEUE, FINALIZE_QUEUE
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 예상 비용 기반 대기열 분리 사용 여부 (기본 0: 모든 학습을 Celery 기본 대기열 한 곳에서 처리,
+# 1로 켜면 interactive/bulk/finalize 대기열을 처리하는 워커가 모두 떠 있어야 함)
+ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "0") == "1"
+# 이 비용(행 단위) 이하의 작업은 interactive 대기열로 보냄
+INTERACTIVE_MAX_COST = float(os.getenv("INTERACTIVE_MAX_COST", "20000"))
+FULL_MODE_COST_FACTOR = 8.0   # 전체 미세조정은 헤드 전용 학습보다 행당 비용이 큼
+DEPTH_COST_ROWS = 500.0       # 계보 한 단계당 추가 비용 (delta 로드/이어붙이기)
+
+_STATS_KEY = "train_model_stats:{}"  # model_code -> {rows, depth} (워커가 학습 후 기록)
+_STATS_TTL = 30 * 24 * 60 * 60
+
+
+def record_model_stats(model_code: str, rows: int, depth: int):
+    """새 모델의 데이터 행 수와 계보 깊이를 기록 (이 모델을 기반으로 하는 다음 요청의 비용 추정용)"""
+    try:
+        key = _STATS_KEY.format(model_code)
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping={"rows": int(rows), "depth": int(depth)})
+        pipe.expire(key, _STATS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"모델 통계 기록 실패({model_code}): {e}")
+
+
+def _model_stats(model_code: str):
+    try:
+        raw = get_redis().hgetall(_STATS_KEY.format(model_code))
+    except redis.RedisError as e:
+        logger.warning(f"모델 통계 조회 실패({model_code}): {e}")
+        raw = {}
+    raw = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()}
+    # 기록이 없는 모델(예: 기본 모델)은 계보 루트로 간주
+    return raw.get("rows", 0), raw.get("depth", 1)
+
+
+def estimate_cost(model_code: str, new_rows: int) -> float:
+    """(기반 데이터 행 + 새 행) x 학습 모드 계수 + 계보 깊이 비용"""
+    base_rows, depth = _model_stats(model_code)
+    mode_factor = FULL_MODE_COST_FACTOR if HparamsConfig().TRAINING_MODE == "full" else 1.0
+    return (base_rows + new_rows) * mode_factor + depth * DEPTH_COST_ROWS
+
+
+def _priority(cost: float) -> int:
+    # Redis 브로커는 0이 가장 높은 우선순위: 비용이 작을수록 먼저 실행
+    return min(9, int(9 * cost / (cost + INTERACTIVE_MAX_COST)))
+
+
+def route_training(model_code: str, new_rows: int) -> dict:
+    """
+    학습 작업의 apply_async 옵션(queue, priority)을 결정합니다.
+    분리가 꺼져 있으면 빈 dict (Celery 기본 대기열)를 반환합니다.
+    """
+    if not ROUTING_ENABLED:
+        return {}
+    cost = estimate_cost(model_code, new_rows)
+    queue = INTERACTIVE_QUEUE if cost <= INTERACTIVE_MAX_COST else BULK_QUEUE
+    options = {"queue": queue, "priority": _priority(cost)}
+    logger.info(f"[ROUTE] model '{model_code}' 신규 {new_rows}행, 예상 비용 {cost:.0f} -> {options}")
+    return options
+
+
+def split_finalize_stage() -> bool:
+    """TFLite 변환/업로드를 별도 단계 대기열에서 실행할지 여부 (대기열 분리를 켰을 때만)"""
+    return ROUTING_ENABLED
+
+
+def route_finalize(priority: int = None) -> dict:
+    """TFLite 변환/업로드 단계의 apply_async 옵션 (학습 단계의 우선순위를 이어받음)"""
+    options = {"queue": FINALIZE_QUEUE}
+    if priority is not None:
+        options["priority"] = priority
+    return options
@@ -0,0 +1,22 @@
+from celery.result import AsyncResult
+
+from app.core.celery_app import celery_app
+
+# API 프로세스는 워커 모듈(TensorFlow/sklearn/Firebase)을 import 하지 않고 task 이름으로만 작업을 등록/조회합니다.
+# 이름은 app.worker.training_tasks 의 task 정의와 같아야 합니다.
+TRAINING_TASK = "app.worker.training_tasks.training_task"
+BATCH_TRAINING_TASK = "app.worker.training_tasks.batch_training_task"
+
+
+def send_training(args, kwargs=None, task_id=None, **options) -> AsyncResult:
+    """단일 제스처 학습 작업 등록 (options: queue, priority, countdown 등 apply_async 옵션)"""
+    return celery_app.send_task(TRAINING_TASK, args=args, kwargs=kwargs or {}, task_id=task_id, **options)
+
+
+def send_batch_training(args, kwargs=None, task_id=None, **options) -> AsyncResult:
+    """여러 제스처(또는 병합 대기열) 학습 작업 등록"""
+    return celery_app.send_task(BATCH_TRAINING_TASK, args=args, kwargs=kwargs or {}, task_id=task_id, **options)
+
+
+def get_result(task_id: str) -> AsyncResult:
+    return AsyncResult(task_id, app=celery_app)
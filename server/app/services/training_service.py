@@ -1,24 +1,141 @@
-from app.core import celery_app
-from app.worker import training_tasks
-from celery.result import AsyncResult
+import logging
+import uuid
 
-def start_new_training_job(model_code, landmarks, gesture) -> str:
+import redis
 
+from app.services import result_cache_service, coalesce_service, progress_service, routing_service, task_client, job_store_service
+from app.utils.utils import pack_landmarks
+
+logger = logging.getLogger(__name__)
+
+def _claim_or_attach(job_hash: str, task_id: str):
     """
+    같은 내용의 작업이 이미 있으면 그 task id 를, 새로 등록했다면 None 을 반환합니다.
+    결과 없이 실패/취소된 작업이면 해제 후 새로 등록합니다.
+    """
+    existing_task_id = result_cache_service.claim_job(job_hash, task_id)
+    if existing_task_id is not None:
+        if task_client.get_result(existing_task_id).status in ("FAILURE", "REVOKED") \
+                and result_cache_service.get_cached_result(existing_task_id) is None:
+            result_cache_service.release_job(job_hash)
+            existing_task_id = result_cache_service.claim_job(job_hash, task_id)
+    return existing_task_id
+
+def start_new_training_job(model_code, landmarks, gesture, device_id=None) -> str:
+
+    """
+    동일한 (model_code, gesture, landmarks) 요청이 진행 중이면 그 작업에 합류하고,
+    이미 완료되었다면 이전 작업의 task id 를 돌려주어 결과를 재사용합니다.
+    병합 대기(COALESCE_WINDOW_SEC)가 켜져 있으면 같은 model_code 의 요청을 모아 한 번에 학습합니다.
+
     :param model_code: 사용자 지정 모델 코드`
-    :param landmarks: 수집한 렌드마크
+    :param landmarks: 수집한 렌드마크 (리스트 또는 (N, 64) float32 ndarray)
     :param gesture: 학습할 제스처 이름
+    :param device_id: 요청한 기기/사용자 식별자 (작업 이력 조회용, 선택)
     :return: celery task id
     """
-    task = training_tasks.training_task.delay(model_code, landmarks, gesture)
+    job_hash = result_cache_service.compute_job_hash(model_code, gesture, landmarks)
+    task_id = str(uuid.uuid4())
+    new_rows = len(landmarks)
+    # ndarray(바이너리 업로드)는 float 리스트로 풀지 않고 압축 표현으로 전달
+    landmarks = pack_landmarks(landmarks)
+
+    existing_task_id = _claim_or_attach(job_hash, task_id)
+    if existing_task_id is not None:
+        job_store_service.record_submission(existing_task_id, model_code, device_id)
+        return existing_task_id
+
+    route = routing_service.route_training(model_code, new_rows)
+    if coalesce_service.enabled():
+        item = {"gesture": gesture, "landmarks": landmarks, "job_hash": job_hash}
+        batch_id, is_new = coalesce_service.join_or_open(model_code, task_id, item, device_id)
+        job_store_service.record_submission(batch_id, model_code, device_id, route.get("queue"))
+        if is_new:
+            task_client.send_batch_training(
+                args=(model_code,),
+                kwargs={"coalesce_id": batch_id, "device_id": device_id},
+                task_id=batch_id,
+                countdown=coalesce_service.COALESCE_WINDOW_SEC,
+                **route,
+            )
+        else:
+            result_cache_service.claim_job(job_hash, batch_id, replace=True)
+        return batch_id
+
+    job_store_service.record_submission(task_id, model_code, device_id, route.get("queue"))
+    task = task_client.send_training(
+        args=(model_code, landmarks, gesture),
+        kwargs={"job_hash": job_hash},
+        task_id=task_id,
+        **route,
+    )
 
     return task.id
 
+def start_new_batch_training_job(model_code, gestures, device_id=None) -> str:
+    """
+    여러 제스처를 같은 base model 에 한 번의 학습으로 추가합니다.
+
+    :param model_code: 사용자 지정 모델 코드
+    :param gestures: [{"gesture": str, "landmarks": list}, ...]
+    :param device_id: 요청한 기기/사용자 식별자 (작업 이력 조회용, 선택)
+    :return: celery task id
+    """
+    job_hash = result_cache_service.compute_batch_hash(model_code, gestures)
+    task_id = str(uuid.uuid4())
 
+    existing_task_id = _claim_or_attach(job_hash, task_id)
+    if existing_task_id is not None:
+        job_store_service.record_submission(existing_task_id, model_code, device_id)
+        return existing_task_id
+
+    route = routing_service.route_training(model_code, sum(len(g["landmarks"]) for g in gestures))
+    job_store_service.record_submission(task_id, model_code, device_id, route.get("queue"))
+    task = task_client.send_batch_training(
+        args=(model_code,),
+        kwargs={"items": gestures, "job_hash": job_hash},
+        task_id=task_id,
+        **route,
+    )
+
+    return task.id
 
 
 def get_job_status(task_id: str) -> dict:
-    task_result = AsyncResult(task_id, app = celery_app)
+    """작업 기록(job store)을 우선 사용하고, 기록이 없는 작업만 Celery 결과 저장소에서 조회합니다."""
+    return get_job_statuses([task_id])[0]
+
+
+def get_job_statuses(task_ids) -> list:
+    """여러 작업의 상태를 한 번의 pipeline 조회로 반환 (입력 순서 유지)"""
+    try:
+        records = job_store_service.get_jobs(task_ids)
+    except redis.RedisError as e:
+        logger.warning(f"작업 기록 조회 실패, 결과 저장소에서 조회합니다: {e}")
+        records = [None] * len(task_ids)
+    return [_status_from_record(task_id, record) for task_id, record in zip(task_ids, records)]
+
+
+def _status_from_record(task_id: str, record) -> dict:
+    if record is None:
+        return _celery_job_status(task_id)
+    status = job_store_service.to_status(record)
+    if status["status"] in progress_service.FINAL_STATUSES or not job_store_service.is_stale(record):
+        return status
+
+    # 한동안 갱신되지 않은 진행 중 기록만 Celery 상태를 확인:
+    # 워커가 기록하지 못하고 끝난 작업(워커 강제 종료, 시간 제한, 취소, 파이프라인 밖 예외)은 Celery 상태를 사용하고 기록에 반영
+    celery_status = _celery_job_status(task_id)
+    if celery_status["status"] not in progress_service.FINAL_STATUSES:
+        return status
+    job_store_service.mark_finished(
+        task_id, celery_status["status"], result=celery_status["result"], error_info=celery_status["error_info"]
+    )
+    return celery_status
+
+
+def _celery_job_status(task_id: str) -> dict:
+    task_result = task_client.get_result(task_id)
     status = task_result.status
     
     # 반환될 필드들을 초기화합니다.
@@ -26,6 +143,18 @@ def get_job_status(task_id: str) -> dict:
     result = None # 이전의 'result' 필드에 해당
     error = None # 이전의 'error_info' 필드에 해당
 
+    # Celery 결과가 만료(result_expires)되었더라도 결과 캐시에 남아 있으면 완료로 응답
+    if status == "PENDING":
+        cached_result = result_cache_service.get_cached_result(task_id)
+        if cached_result is not None:
+            return {
+                "task_id": task_id,
+                "status": "SUCCESS",
+                "progress": None,
+                "result": cached_result,
+                "error_info": None
+            }
+
     if status == "PROGRESS":
         meta = task_result.info or {}
         progress = {
@@ -42,15 +171,7 @@ def get_job_status(task_id: str) -> dict:
                 status = "DUPLICATE" # 상태를 DUPLICATE로 오버라이드
 
         else: # 태스크가 FAILURE 상태일 때
-            error_traceback = task_result.traceback
-            
-            # DuplicateDataError인 경우 특별 처리
-            if "DuplicateDataError" in error_traceback:
-                status = "DUPLICATE" # 상태를 DUPLICATE로 오버라이드
-                error = "제스처 중복"
-            else:
-                # 일반적인 실패
-                error = "알 수 없는 오류 발생"
+            status, error = progress_service.failure_status(task_result.traceback)
 
     return {
         "task_id": task_id,
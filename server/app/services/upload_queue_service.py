@@ -0,0 +1,239 @@
+import fcntl
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+# models/ 는 용량 정리 대상이므로 대기열 DB 는 그 밖에 둠
+UPLOAD_QUEUE_PATH = os.getenv("UPLOAD_QUEUE_PATH", os.path.join(os.path.abspath("."), "upload_queue", "upload_queue.sqlite3"))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+UPLOAD_MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "8"))
+UPLOAD_BACKOFF_BASE_SEC = float(os.getenv("UPLOAD_BACKOFF_BASE_SEC", "2"))
+UPLOAD_BACKOFF_MAX_SEC = float(os.getenv("UPLOAD_BACKOFF_MAX_SEC", "300"))
+UPLOAD_LEASE_SEC = float(os.getenv("UPLOAD_LEASE_SEC", "600"))
+UPLOAD_POLL_SEC = 1.0
+# 다른 프로세스가 대기열을 처리 중일 때 처리 권한(flock)을 다시 확인하는 주기
+UPLOAD_DRAINER_RETRY_SEC = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    local_path TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending / uploading / done / failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_ready ON uploads (status, next_attempt_at);
+"""
+
+
+class UploadQueue:
+    """
+    로컬 SQLite 파일에 저장되는 영속 업로드 대기열.
+
+    프로세스가 재시작되어도 대기 중인 업로드가 남아 있고, 같은 호스트의 여러 워커 프로세스가
+    lease(임대 만료 시각) 기반으로 안전하게 나누어 처리합니다.
+    """
+
+    def __init__(self, db_path: str = UPLOAD_QUEUE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # autocommit 모드 연결: 호출자가 closing() 으로 감싸거나 직접 close() 해야 함
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, local_path: str, destination: str):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO uploads (local_path, destination, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (local_path, destination, now, now),
+            )
+        logger.info(f"업로드 대기열 등록: {local_path} -> {destination}")
+
+    def claim(self, limit: int):
+        """실행 가능한 항목을 최대 limit 개 임대하여 반환"""
+        now = time.time()
+        claimed = []
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, local_path, destination, attempts FROM uploads "
+                "WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'uploading' AND lease_until < ?) "
+                "ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            for row in rows:
+                conn.execute(
+                    "UPDATE uploads SET status = 'uploading', lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + UPLOAD_LEASE_SEC, now, row[0]),
+                )
+                claimed.append({"id": row[0], "local_path": row[1], "destination": row[2], "attempts": row[3]})
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return claimed
+
+    def mark_done(self, item_id: int):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE uploads SET status = 'done', updated_at = ? WHERE id = ?", (time.time(), item_id))
+
+    def mark_failed(self, item_id: int, attempts: int, error: str, permanent: bool = False):
+        """재시도 가능하면 지수 백오프 후 pending 으로, 한도를 넘거나 재시도 의미가 없으면 failed 로 기록"""
+        now = time.time()
+        attempts += 1
+        if permanent or attempts >= UPLOAD_MAX_ATTEMPTS:
+            status, next_attempt_at = "failed", 0
+        else:
+            status = "pending"
+            next_attempt_at = now + min(UPLOAD_BACKOFF_MAX_SEC, UPLOAD_BACKOFF_BASE_SEC * (2 ** (attempts - 1)))
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE uploads SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, attempts, next_attempt_at, error[:1000], now, item_id),
+            )
+        return status
+
+    def not_uploaded_paths(self):
+        """아직 업로드가 끝나지 않은(대기/진행/실패) 로컬 파일 경로 집합"""
+        with closing(self._connect()) as conn:
+            return {row[0] for row in conn.execute("SELECT DISTINCT local_path FROM uploads WHERE status != 'done'")}
+
+    def pending_count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM uploads WHERE status IN ('pending', 'uploading')").fetchone()[0]
+
+
+class UploadManager:
+    """
+    대기열을 주기적으로 확인하여 제한된 수의 스레드로 동시에 업로드하는 백그라운드 관리자.
+
+    lock_path 가 주어지면 그 파일의 flock 을 잡은 프로세스 하나만 대기열을 처리하고(호스트당 하나),
+    나머지 프로세스는 처리 중인 프로세스가 종료되어 lock 이 풀릴 때까지 주기적으로 확인만 합니다.
+    """
+
+    def __init__(self, queue: UploadQueue, upload_fn, concurrency: int = UPLOAD_CONCURRENCY, lock_path: str = None):
+        self.queue = queue
+        self.upload_fn = upload_fn  # (local_path, destination) -> None, 실패 시 예외
+        self.concurrency = max(1, concurrency)
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="artifact-upload")
+        self._in_flight = threading.Semaphore(self.concurrency)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="upload-manager", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"업로드 관리자 시작 (동시 업로드 {self.concurrency}개, 대기열: {self.queue.db_path})")
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        if self._lock_file is not None:
+            self._lock_file.close()  # flock 해제
+            self._lock_file = None
+
+    def _acquire_drainer_lock(self):
+        """대기열 처리 권한 획득 (lock_path 가 없으면 항상 처리)"""
+        if self.lock_path is None or self._lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        # 프로세스가 끝날 때까지 파일을 열어 두어 lock 유지
+        self._lock_file = lock_file
+        logger.info(f"업로드 대기열 처리 시작 (pid {os.getpid()})")
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._acquire_drainer_lock():
+                self._stop.wait(UPLOAD_DRAINER_RETRY_SEC)
+                continue
+            free = 0
+            while self._in_flight.acquire(blocking=False):
+                free += 1
+            try:
+                items = self.queue.claim(free) if free else []
+            except sqlite3.Error as e:
+                logger.error(f"업로드 대기열 조회 실패: {e}")
+                items = []
+            for _ in range(free - len(items)):
+                self._in_flight.release()
+            for item in items:
+                self._executor.submit(self._upload, item)
+            self._stop.wait(UPLOAD_POLL_SEC)
+
+    def _upload(self, item):
+        try:
+            if not os.path.exists(item["local_path"]):
+                raise FileNotFoundError(f"업로드할 파일이 존재하지 않습니다: {item['local_path']}")
+            self.upload_fn(item["local_path"], item["destination"])
+            self.queue.mark_done(item["id"])
+            logger.info(f"업로드 완료: {item['local_path']} -> {item['destination']}")
+        except Exception as e:
+            status = self.queue.mark_failed(item["id"], item["attempts"], repr(e), permanent=isinstance(e, FileNotFoundError))
+            log = logger.error if status == "failed" else logger.warning
+            log(f"업로드 실패({status}, 시도 {item['attempts'] + 1}회): {item['destination']} - {e}")
+        finally:
+            self._in_flight.release()
+
+
+_manager = None
+_queue = None
+_manager_lock = threading.Lock()
+
+
+def get_upload_queue() -> UploadQueue:
+    """프로세스당 하나의 대기열 핸들 (등록만 하고 업로드 관리자는 시작하지 않음)"""
+    global _queue
+    if _queue is None:
+        with _manager_lock:
+            if _queue is None:
+                _queue = UploadQueue()
+    return _queue
+
+
+def get_upload_manager() -> UploadManager:
+    """
+    프로세스당 하나의 업로드 관리자를 시작하여 반환 (남아 있던 대기 항목도 이어서 처리).
+    워커 자식 프로세스마다 호출되지만 대기열은 flock 을 잡은 한 프로세스만 처리합니다.
+    """
+    global _manager
+    queue = get_upload_queue()
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                from app.services import firebase_service
+                manager = UploadManager(queue, firebase_service.upload_file, lock_path=f"{queue.db_path}.drainer.lock")
+                manager.start()
+                _manager = manager
+    return _manager
+
+
+def enqueue_upload(local_path: str, destination: str):
+    get_upload_queue().enqueue(local_path, destination)
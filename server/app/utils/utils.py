@@ -1,8 +1,9 @@
 import io
+import base64
+import zlib
 import time, uuid
 
 import numpy as np
-import pandas as pd
 
 def generate_model_id():
     timestamp = int(time.time())
@@ -11,43 +12,79 @@ def generate_model_id():
 
 def preprocess_landmarks(feature_vector):
     """
-    # 1. 64개 데이터에서 좌표 데이터(앞 63개)와 손(left, right) 분리
+    단일 64차원 벡터 정규화 (손목 기준 평행 이동 + 손목-중지 MCP 거리로 크기 정규화).
+    여러 행은 LandmarkNormalizer 로 한 번에 처리합니다.
     """
+    from app.worker.ml.landmark_normalizer import LandmarkNormalizer
 
-    feature_vector_np = np.array(feature_vector)
+    normalized, valid = LandmarkNormalizer().normalize(np.asarray(feature_vector, dtype=np.float32)[None, :])
+    if not valid[0]:
+        raise ValueError("정규화할 수 없는 랜드마크입니다 (NaN/이상치 또는 손 크기 0)")
+    return normalized[0]
 
-    coords_flat = feature_vector_np[:-1]
-    handedness_val = feature_vector_np[-1]
+NUM_FEATURES = 64  # 21개 랜드마크 x (x, y, z) + handedness
+PACKED_ENCODING = "f32le-b64"
 
-    # 2. 63개의 1차원 좌표 데이터를 (21, 3) 형태의 2차원 배열로 변환합니다.
-    landmarks = np.array(coords_flat).reshape(21, 3)
-
-    # 3. 중앙 정렬(0번 기준)
-    base_x, base_y, base_z = landmarks[0]
-    landmarks[:, 0] -= base_x
-    landmarks[:, 1] -= base_y
-    landmarks[:, 2] -= base_z
-
-    scale_factor = np.linalg.norm(landmarks[0] - landmarks[9])
-    if scale_factor > 0:
-        landmarks /= scale_factor
+def decode_landmark_body(body: bytes, content_type: str, content_encoding: str = None, max_bytes: int = None) -> np.ndarray:
+    """
+    바이너리 업로드 본문을 (N, 64) float32 배열로 변환합니다. (원소별 파이썬 객체 생성 없음)
 
-    # 5. 정규화된 좌표를 다시 1차원으로 펴고, 원래의 손 정보를 뒤에 붙입니다.
-    normalized_vector = np.concatenate([landmarks.flatten(), [handedness_val]])
-    return normalized_vector
+    - application/octet-stream : little-endian float32 를 빽빽하게 이어붙인 값
+    - application/x-npy        : np.save 형식
+    - application/x-npz        : np.savez(_compressed) 형식, 첫 번째 배열 사용
+    - Content-Encoding: gzip   : 위 형식을 gzip 으로 압축한 경우
+    """
+    if content_encoding and content_encoding.lower() == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = decompressor.decompress(body, max_bytes or 0)
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"압축 해제 크기가 제한({max_bytes} bytes)을 초과합니다")
+        if not decompressor.eof:
+            raise ValueError("gzip 스트림이 중간에 끊겼습니다")
 
-def convert_landmarks_to_csv(landmarks: list, incremental_csv_path: str, gesture: str):
+    media_type = (content_type or "application/octet-stream").split(";")[0].strip().lower()
+    if media_type == "application/octet-stream":
+        if len(body) % 4 != 0:
+            raise ValueError(f"float32 바이트 길이가 4의 배수가 아닙니다: {len(body)}")
+        # 행 구분이 없는 형식이므로 값 개수만 확인하여 (N, 64) 로 나눔
+        array = np.frombuffer(body, dtype="<f4")
+        if array.size == 0 or array.size % NUM_FEATURES != 0:
+            raise ValueError(f"랜드마크 값 개수가 {NUM_FEATURES}의 배수가 아닙니다: {array.size}")
+        array = array.reshape(-1, NUM_FEATURES)
+    elif media_type == "application/x-npy":
+        array = np.load(io.BytesIO(body), allow_pickle=False)
+    elif media_type == "application/x-npz":
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            if not archive.files:
+                raise ValueError("npz 파일에 배열이 없습니다")
+            array = archive[archive.files[0]]
+    else:
+        raise ValueError(f"지원하지 않는 Content-Type 입니다: {media_type}")
 
-    # normalized_landmarks_data = []
-    # for feature_vector in landmarks:
-    #     normalized_vector = preprocess_landmarks(feature_vector)
-    #     normalized_landmarks_data.append(normalized_vector)
+    if array.dtype.kind not in ("f", "i", "u"):
+        raise ValueError(f"숫자형 배열이 아닙니다: dtype={array.dtype}")
+    # npy/npz 는 형태를 그대로 사용 ((64, N), (N, 32), 3차원 배열 등을 다른 모양으로 재해석하지 않음)
+    if array.ndim != 2 or array.shape[0] == 0 or array.shape[1] != NUM_FEATURES:
+        raise ValueError(f"랜드마크 배열 형태가 (N, {NUM_FEATURES}) 가 아닙니다: {array.shape}")
+    return array.astype("<f4", copy=False)
 
-    #df = pd.DataFrame(normalized_landmarks_data)
-    df = pd.DataFrame(landmarks)
-    # 'gesture' 값을 첫 번째 'label' 열에 추가합니다.
-    df.insert(0, "label", [gesture] * len(df))
+def pack_landmarks(landmarks):
+    """
+    ndarray 랜드마크를 Celery(JSON) 전송용 압축 표현으로 변환합니다.
+    리스트는 그대로 반환합니다.
+    """
+    if not isinstance(landmarks, np.ndarray):
+        return landmarks
+    array = np.ascontiguousarray(landmarks, dtype="<f4")
+    return {
+        "encoding": PACKED_ENCODING,
+        "shape": list(array.shape),
+        "data": base64.b64encode(array.tobytes()).decode("ascii"),
+    }
 
-    # CSV 파일로 저장합니다.
-    df.to_csv(incremental_csv_path, index=False)
-    print(f" CSV 데이터 저장 완료! -> {incremental_csv_path}")
\ No newline at end of file
+def unpack_landmarks(landmarks):
+    """pack_landmarks 의 역변환. 압축 표현이 아니면 그대로 반환합니다."""
+    if isinstance(landmarks, dict) and landmarks.get("encoding") == PACKED_ENCODING:
+        array = np.frombuffer(base64.b64decode(landmarks["data"]), dtype="<f4")
+        return array.reshape(landmarks["shape"])
+    return landmarks
@@ -0,0 +1,260 @@
+import fcntl
+import logging
+import os
+import shutil
+import threading
+import time
+
+from app.core import metrics
+from app.services.artifact_storage import get_storage
+from app.services.upload_queue_service import UploadQueue
+from app.worker.ml.lineage_store import LineageStore
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.abspath("."), "models")
+# models/ 디렉토리 용량 한도 (0이면 정리하지 않음), 한도를 넘으면 LOW_WATERMARK 비율까지 줄임
+MODELS_DIR_MAX_MB = int(os.getenv("MODELS_DIR_MAX_MB", "10240"))
+ARTIFACT_GC_LOW_WATERMARK = float(os.getenv("ARTIFACT_GC_LOW_WATERMARK", "0.8"))
+ARTIFACT_GC_INTERVAL_SEC = float(os.getenv("ARTIFACT_GC_INTERVAL_SEC", "300"))
+# 이 시간 안에 사용된 모델은 정리하지 않음 (진행 중인 작업의 기반/신규 모델 보호)
+ARTIFACT_MIN_IDLE_SEC = float(os.getenv("ARTIFACT_MIN_IDLE_SEC", "3600"))
+# 업로드까지 가지 못한(실패한) 모델 디렉토리 보관 기간
+ARTIFACT_ORPHAN_SEC = float(os.getenv("ARTIFACT_ORPHAN_SEC", str(24 * 60 * 60)))
+
+_LAST_ACCESS_MARKER = ".last_access"
+_PUBLISHED_MARKER = ".published"
+_GC_LOCK_FILE = ".artifact_gc.lock"
+
+
+def keras_storage_key(model_code: str) -> str:
+    return f"models/keras/{model_code}_model.keras"
+
+
+def labels_storage_key(model_code: str) -> str:
+    return f"models/keras/{model_code}_labels.json"
+
+
+def dataset_storage_key(model_code: str, local_path: str) -> str:
+    return f"models/datasets/{model_code}/{os.path.basename(local_path)}"
+
+
+class ArtifactNotFoundError(Exception):
+    """로컬에도 저장소에도 모델 아티팩트가 없음"""
+    pass
+
+
+class ModelArtifactManager:
+    """
+    models/<model_code> 디렉토리의 용량 한도와 LRU 정리, 정리된 모델의 재다운로드를 담당합니다.
+
+    - 마지막 사용 시각은 디렉토리의 .last_access 파일 mtime 으로 기록 (같은 호스트의 워커 프로세스가 공유)
+    - 업로드 대기열 등록까지 끝난 모델에는 .published 를 남기고, 업로드가 끝나지 않은 파일이 있는 디렉토리,
+      루트 모델(계보 manifest 없이 CSV 로 시작하는 base_v1 등), 최근 사용된 디렉토리는 정리하지 않음
+    - 정리된 모델이 작업에서 참조되면 ensure_local() 이 계보를 따라 저장소에서 manifest/delta/keras 를 다시 받음
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, max_bytes: int = MODELS_DIR_MAX_MB * 1024 * 1024,
+                 upload_queue: UploadQueue = None):
+        self.models_dir = models_dir
+        self.max_bytes = max_bytes
+        self.upload_queue = upload_queue
+        self.lineage_store = LineageStore(models_dir)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _model_dir(self, model_code):
+        return os.path.join(self.models_dir, model_code)
+
+    def keras_path(self, model_code):
+        return os.path.join(self._model_dir(model_code), f"{model_code}_model.keras")
+
+    def labels_path(self, model_code):
+        return os.path.join(self._model_dir(model_code), f"{model_code}_labels.json")
+
+    def touch(self, model_code):
+        """model_code 디렉토리의 마지막 사용 시각 갱신"""
+        model_dir = self._model_dir(model_code)
+        os.makedirs(model_dir, exist_ok=True)
+        marker = os.path.join(model_dir, _LAST_ACCESS_MARKER)
+        with open(marker, "a"):
+            os.utime(marker)
+
+    def mark_published(self, model_code):
+        """업로드 대기열 등록까지 끝난 모델 (이후 업로드가 완료되면 정리 대상)"""
+        with open(os.path.join(self._model_dir(model_code), _PUBLISHED_MARKER), "w"):
+            pass
+
+    def _last_access(self, model_dir):
+        try:
+            return os.path.getmtime(os.path.join(model_dir, _LAST_ACCESS_MARKER))
+        except FileNotFoundError:
+            return os.path.getmtime(model_dir)
+
+    def _fetch(self, key, local_path):
+        tmp_path = f"{local_path}.{os.getpid()}.fetch"
+        model_dir = os.path.dirname(local_path)
+        created_dir = not os.path.isdir(model_dir)
+        try:
+            get_storage().get(key, tmp_path)
+            os.replace(tmp_path, local_path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if created_dir:
+                # 저장소에 없는 model_code 로 빈 디렉토리가 남지 않도록 함 (비어 있지 않으면 다른 프로세스가 사용 중)
+                try:
+                    os.rmdir(model_dir)
+                except OSError:
+                    pass
+            raise ArtifactNotFoundError(f"저장소에서 모델 아티팩트를 받지 못했습니다: {key} ({e})") from e
+        metrics.MODEL_ARTIFACT_EVENTS.inc(event="fetched")
+        logger.info(f"정리된 모델 아티팩트 재다운로드: {key} -> {local_path}")
+
+    def ensure_local(self, model_code, with_model: bool = True):
+        """
+        model_code 와 그 조상의 데이터셋(및 model_code 의 keras 모델)이 로컬에 있도록 보장하고 사용 시각을 갱신합니다.
+        manifest 는 delta 를 모두 받은 뒤 마지막에 받으므로 manifest 가 있으면 그 모델의 데이터는 완전합니다.
+        사용 시각은 로컬에 있거나 받기에 성공한 모델만 갱신합니다 (없는 model_code 로 디렉토리를 만들지 않음).
+        """
+        if with_model:
+            if not os.path.exists(self.keras_path(model_code)):
+                self._fetch(keras_storage_key(model_code), self.keras_path(model_code))
+                try:
+                    self._fetch(labels_storage_key(model_code), self.labels_path(model_code))
+                except ArtifactNotFoundError:
+                    pass  # 라벨 순서 기록 이전에 만든 모델 (헤드 warm start 만 건너뜀)
+            self.touch(model_code)
+
+        code, visited = model_code, set()
+        while code is not None and code not in visited:
+            visited.add(code)
+            store = self.lineage_store
+            if not os.path.exists(store.manifest_path(code)):
+                if os.path.exists(store.root_csv_path(code)):
+                    self.touch(code)
+                    break  # 루트 모델 (정리 대상이 아님)
+                for path in store.delta_paths(code):
+                    self._fetch(dataset_storage_key(code, path), path)
+                self._fetch(dataset_storage_key(code, store.manifest_path(code)), store.manifest_path(code))
+            self.touch(code)
+            code = store.read_manifest(code)["parent"]
+
+    def _scan(self):
+        entries = []
+        for entry in os.scandir(self.models_dir):
+            if not entry.is_dir(follow_symlinks=False) or entry.name.startswith("."):
+                continue
+            size = 0
+            for root, _, files in os.walk(entry.path):
+                for name in files:
+                    try:
+                        size += os.path.getsize(os.path.join(root, name))
+                    except FileNotFoundError:
+                        pass
+            entries.append({"code": entry.name, "path": entry.path, "size": size, "last_access": self._last_access(entry.path)})
+        return entries
+
+    def _evictable(self, entry, not_uploaded_dirs, now):
+        idle = now - entry["last_access"]
+        if idle < ARTIFACT_MIN_IDLE_SEC or entry["path"] in not_uploaded_dirs:
+            return False
+        code = entry["code"]
+        if not os.path.exists(self.lineage_store.manifest_path(code)):
+            # 루트 모델은 저장소에 데이터셋이 없으므로 보호, 그 외(manifest 전에 실패한 빈 디렉토리 등)는 오래되면 정리
+            return not os.path.exists(self.lineage_store.root_csv_path(code)) and idle >= ARTIFACT_ORPHAN_SEC
+        if os.path.exists(os.path.join(entry["path"], _PUBLISHED_MARKER)):
+            return True
+        # 업로드 단계까지 가지 못한 모델은 결과로 반환된 적이 없으므로 보관 기간 후 정리
+        return idle >= ARTIFACT_ORPHAN_SEC
+
+    def _evict(self, entry):
+        # 이름을 먼저 바꿔 다른 프로세스가 반쯤 지워진 디렉토리를 보지 않도록 함
+        trash = os.path.join(self.models_dir, f".evicted-{entry['code']}-{os.getpid()}")
+        os.rename(entry["path"], trash)
+        shutil.rmtree(trash, ignore_errors=True)
+        metrics.MODEL_ARTIFACT_EVENTS.inc(event="evicted")
+        logger.info(f"모델 디렉토리 정리(LRU): {entry['code']} ({entry['size'] / 1024 / 1024:.1f}MB)")
+
+    def collect(self):
+        """용량 한도를 넘으면 오래 사용하지 않은 정리 가능 디렉토리부터 삭제 (호스트당 한 프로세스만 실행)"""
+        if self.max_bytes <= 0 or not os.path.isdir(self.models_dir):
+            return []
+        with open(os.path.join(self.models_dir, _GC_LOCK_FILE), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return []  # 다른 프로세스가 정리 중
+            # 이전 정리 중 중단되어 남은 임시 디렉토리 삭제
+            for name in os.listdir(self.models_dir):
+                if name.startswith(".evicted-"):
+                    shutil.rmtree(os.path.join(self.models_dir, name), ignore_errors=True)
+            entries = self._scan()
+            total = sum(entry["size"] for entry in entries)
+            if total <= self.max_bytes:
+                return []
+
+            queue = self.upload_queue or UploadQueue()
+            not_uploaded_dirs = {os.path.dirname(path) for path in queue.not_uploaded_paths()}
+            target = self.max_bytes * ARTIFACT_GC_LOW_WATERMARK
+            evicted = []
+            for entry in sorted(entries, key=lambda e: e["last_access"]):
+                if total <= target:
+                    break
+                # 스캔(os.walk)에 시간이 걸리므로 그 사이 작업이 사용하기 시작한 디렉토리를 지우지 않도록 삭제 직전에 다시 확인
+                try:
+                    entry["last_access"] = self._last_access(entry["path"])
+                except FileNotFoundError:
+                    continue
+                if not self._evictable(entry, not_uploaded_dirs, time.time()):
+                    continue
+                try:
+                    self._evict(entry)
+                except OSError as e:
+                    logger.warning(f"모델 디렉토리 정리 실패({entry['code']}): {e}")
+                    continue
+                total -= entry["size"]
+                evicted.append(entry["code"])
+
+            if total > self.max_bytes:
+                logger.warning(
+                    f"models/ 사용량 {total / 1024 / 1024:.0f}MB 가 한도 {self.max_bytes / 1024 / 1024:.0f}MB 를 넘지만 "
+                    f"나머지는 최근 사용/미업로드/루트 모델이라 정리하지 않았습니다."
+                )
+            return evicted
+
+    def start(self):
+        if self.max_bytes <= 0:
+            logger.info("models/ 용량 한도가 설정되지 않아 정리 스레드를 시작하지 않습니다.")
+            return
+        self._thread = threading.Thread(target=self._run, name="artifact-gc", daemon=True)
+        self._thread.start()
+        logger.info(f"모델 아티팩트 정리 시작 (한도 {self.max_bytes // 1024 // 1024}MB, 주기 {ARTIFACT_GC_INTERVAL_SEC:.0f}s)")
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(ARTIFACT_GC_INTERVAL_SEC):
+            try:
+                self.collect()
+            except Exception as e:
+                logger.error(f"모델 아티팩트 정리 중 에러 발생: {e}", exc_info=True)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_artifact_manager() -> ModelArtifactManager:
+    """프로세스당 하나의 아티팩트 관리자를 시작하여 반환"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                manager = ModelArtifactManager()
+                manager.start()
+                _manager = manager
+    return _manager
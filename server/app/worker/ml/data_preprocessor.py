@@ -5,32 +5,86 @@ import pandas as pd
 import numpy as np
 import logging
 
+from app.worker.ml.dataset import Dataset
+from app.worker.ml.dataset_cache import DatasetCache
+from app.worker.ml.landmark_normalizer import LandmarkNormalizer
+
 logger = logging.getLogger(__name__)
 
+NUM_FEATURES = 64  # 21개 랜드마크 x (x, y, z) + handedness
+MIN_VALID_FRACTION = 0.5  # 정규화 시 유효한 행이 이 비율보다 적으면 요청 전체를 거부
+
 class DataPreprocessor:
     @staticmethod
-    def csv_to_npy_mem(csv_path):
+    def landmarks_to_dataset(landmarks, gesture: str, num_features: int = NUM_FEATURES, normalization: str = None) -> Dataset:
+        """
+        요청의 landmarks 리스트를 CSV 왕복 없이 바로 Dataset으로 변환합니다.
+        형태(N, num_features)와 수치형/유한값 여부를 한 번의 벡터 연산으로 검증합니다.
+        normalization 이 지정되면 배치 정규화 후 NaN/이상치 행을 제외합니다.
+        """
+        try:
+            x = np.asarray(landmarks, dtype=np.float32)
+        except (TypeError, ValueError) as e:
+            raise InvalidLandmarkError(f"랜드마크를 float 배열로 변환할 수 없습니다: {e}") from e
+
+        if x.ndim != 2 or x.shape[0] == 0 or x.shape[1] != num_features:
+            raise InvalidLandmarkError(f"랜드마크 형태가 올바르지 않습니다: shape={x.shape}, 기대값=(N, {num_features})")
+        if normalization is not None:
+            x, valid = LandmarkNormalizer(normalization).normalize_valid(x)
+            if len(x) == 0 or valid.mean() < MIN_VALID_FRACTION:
+                raise InvalidLandmarkError(f"유효한 랜드마크가 너무 적습니다: {int(valid.sum())}/{len(valid)}행")
+            if not valid.all():
+                logger.warning(f"NaN/이상치 랜드마크 {int((~valid).sum())}행 제외 (제스처: {gesture})")
+        elif not np.isfinite(x).all():
+            raise InvalidLandmarkError("랜드마크에 NaN 또는 무한대 값이 포함되어 있습니다")
+
+        return Dataset(x, np.zeros(x.shape[0], dtype=np.int32), [str(gesture)])
+
+    @staticmethod
+    def csv_to_dataset(csv_path) -> Dataset:
         if not os.path.exists(csv_path):
             error_msg = f"CSV 파일이 존재하지 않습니다: {csv_path}"
             logger.error(error_msg)
             raise FileNotFoundError(error_msg)
         df = pd.read_csv(csv_path)
-        x = df.drop('label', axis=1).values
-        y = df['label'].values
+        x = df.drop('label', axis=1).to_numpy(dtype=np.float32)
+        return Dataset.from_arrays(x, df['label'].values)
+
+    @staticmethod
+    def load_cached(csv_path) -> Dataset:
+        """
+        바이너리 캐시(DatasetCache)를 우선 사용하여 Dataset을 반환합니다.
+        캐시가 없거나 CSV 내용이 바뀌었다면 CSV를 한 번 파싱한 뒤 캐시를 새로 저장합니다.
+        """
+        if not os.path.exists(csv_path):
+            error_msg = f"CSV 파일이 존재하지 않습니다: {csv_path}"
+            logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+
+        cache = DatasetCache(csv_path)
+        cached = cache.load()
+        if cached is not None:
+            return Dataset(*cached)
 
-        data = np.hstack((x, y.reshape(-1, 1)))
-        return data
+        dataset = DataPreprocessor.csv_to_dataset(csv_path)
+        cache.save(dataset.features, dataset.label_codes, dataset.vocab)
+        return dataset
 
+    @staticmethod
+    def normalize_dataset(dataset: Dataset, normalization: str) -> Dataset:
+        """저장된 원본 데이터셋을 계보의 정규화 버전으로 변환 (유효하지 않은 행은 제외)"""
+        if normalization is None:
+            return dataset
+        features, valid = LandmarkNormalizer(normalization).normalize_valid(dataset.features)
+        if not valid.all():
+            logger.warning(f"데이터셋 정규화 중 NaN/이상치 {int((~valid).sum())}행 제외")
+        return Dataset(features, dataset.label_codes[valid], dataset.vocab)
 
     @staticmethod
-    def group_by_label(np_array):
-        x = np_array[:, :-1]
-        y = np_array[:, -1].astype(str)
+    def group_by_label(dataset: Dataset):
+        return dataset.group_by_label()
 
-        # 비교(중복검사)용으로 X만 float 변경
-        if x.dtype.kind in ('U', 'S', 'O'):
-            x = x.astype(np.float32, copy=False)
 
-        unique_labels = np.unique(y)
-        grouped_data = {label: x[y == label] for label in unique_labels}
-        return grouped_data
+class InvalidLandmarkError(Exception):
+    """랜드마크 형식 오류 예외"""
+    pass
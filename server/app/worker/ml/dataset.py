@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+
+class Dataset:
+    """
+    학습 파이프라인 전체에서 사용하는 데이터셋 구조.
+
+    - features    : (N, D) float32 연속 배열 (캐시에서 읽은 경우 mmap)
+    - label_codes : (N,) int32 라벨 코드
+    - vocab       : 라벨 코드 -> 라벨 문자열 목록 (view/append 간 공유)
+
+    기존 np.hstack((x, y)) object 배열을 대체하여 단계마다 반복되던 astype 복사를 없앱니다.
+    """
+
+    def __init__(self, features, label_codes, vocab):
+        features = np.asarray(features)
+        if features.ndim != 2:
+            raise ValueError(f"features는 2차원이어야 합니다: shape={features.shape}")
+        if features.dtype != np.float32:
+            features = features.astype(np.float32)
+        label_codes = np.asarray(label_codes)
+        if label_codes.dtype != np.int32:
+            label_codes = label_codes.astype(np.int32)
+        if label_codes.shape != (features.shape[0],):
+            raise ValueError(f"라벨 수와 데이터 수가 다릅니다: {label_codes.shape} vs {features.shape[0]}")
+
+        self.features = features
+        self.label_codes = label_codes
+        self.vocab = list(vocab)
+
+    @classmethod
+    def from_arrays(cls, features, labels):
+        """문자열 라벨 배열로부터 생성 (라벨 코드는 등장 순서 기준)"""
+        codes, vocab = pd.factorize(np.asarray(labels).astype(str))
+        return cls(features, codes, [str(label) for label in vocab])
+
+    @classmethod
+    def empty(cls, num_features, vocab=()):
+        return cls(np.empty((0, num_features), dtype=np.float32), np.empty(0, dtype=np.int32), vocab)
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    @property
+    def num_features(self):
+        return self.features.shape[1]
+
+    @property
+    def labels(self):
+        """라벨 문자열 배열 (필요할 때만 디코딩)"""
+        return np.asarray(self.vocab, dtype=object)[self.label_codes]
+
+    def view(self, index):
+        """슬라이스는 복사 없는 view, 인덱스 배열/마스크는 선택된 행만 복사. vocab은 공유합니다."""
+        return Dataset(self.features[index], self.label_codes[index], self.vocab)
+
+    def present_labels(self):
+        """실제 데이터에 존재하는 라벨을 첫 등장 순서대로 반환 (pd.unique 와 동일한 순서)"""
+        if len(self) == 0:
+            return []
+        codes, first_index = np.unique(self.label_codes, return_index=True)
+        return [self.vocab[c] for c in codes[np.argsort(first_index, kind='stable')]]
+
+    def code_of(self, label):
+        try:
+            return self.vocab.index(label)
+        except ValueError:
+            return None
+
+    def append(self, other):
+        """
+        other의 행을 뒤에 이어붙인 새 Dataset 반환.
+        vocab은 self의 순서를 유지하고 other에만 있는 라벨을 뒤에 추가합니다.
+        """
+        if len(self) and len(other) and self.num_features != other.num_features:
+            raise ValueError(f"특징 수가 다릅니다: {self.num_features} vs {other.num_features}")
+
+        vocab = list(self.vocab)
+        index = {label: i for i, label in enumerate(vocab)}
+        for label in other.vocab:
+            if label not in index:
+                index[label] = len(vocab)
+                vocab.append(label)
+        remap = np.array([index[label] for label in other.vocab], dtype=np.int32)
+        other_codes = remap[other.label_codes] if len(other) else other.label_codes
+
+        features = np.concatenate((self.features, other.features), axis=0)
+        label_codes = np.concatenate((self.label_codes, other_codes))
+        return Dataset(features, label_codes, vocab)
+
+    def group_by_label(self):
+        """라벨(정렬 순) -> 해당 라벨의 float32 특징 행렬"""
+        if len(self) == 0:
+            return {}
+        order = np.argsort(self.label_codes, kind='stable')
+        sorted_codes = self.label_codes[order]
+        codes, starts = np.unique(sorted_codes, return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+        grouped = {self.vocab[c]: self.features[order[s:e]] for c, s, e in zip(codes, starts, bounds)}
+        return {label: grouped[label] for label in sorted(grouped)}
+
+    def encode(self, label_map: dict):
+        """label_map(라벨 -> 클래스 인덱스)에 맞춘 int 클래스 배열"""
+        lookup = np.array([label_map.get(label, -1) for label in self.vocab], dtype=np.int64)
+        return lookup[self.label_codes]
+
+    def to_frame(self):
+        """CSV 저장용 DataFrame (label 컬럼 + 0..D-1 특징 컬럼)"""
+        df = pd.DataFrame(self.features, columns=[str(i) for i in range(self.num_features)])
+        df.insert(0, 'label', self.labels.astype(str))
+        return df
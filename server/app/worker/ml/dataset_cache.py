@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+class DatasetCache:
+    """
+    모델 CSV 옆에 저장되는 바이너리 캐시.
+
+    - {model_code}_features.npy : float32 특징 행렬 (mmap 로드)
+    - {model_code}_labels.npy   : int32 라벨 코드
+    - {model_code}_cache.json   : 라벨 어휘, CSV 내용 해시, 메타 정보
+
+    CSV 내용 해시가 달라지면 캐시는 무효화됩니다.
+    """
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        stem = os.path.splitext(csv_path)[0]
+        self.features_path = f"{stem}_features.npy"
+        self.labels_path = f"{stem}_labels.npy"
+        self.meta_path = f"{stem}_cache.json"
+
+    @staticmethod
+    def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _csv_stat(self):
+        st = os.stat(self.csv_path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self, meta):
+        tmp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def is_valid(self):
+        """캐시가 현재 CSV 내용과 일치하는지 확인 (stat이 같으면 해시 계산 생략)"""
+        meta = self._read_meta()
+        if meta is None or not os.path.exists(self.csv_path):
+            return None
+        if not (os.path.exists(self.features_path) and os.path.exists(self.labels_path)):
+            return None
+
+        stat = self._csv_stat()
+        if meta.get("csv_stat") == stat:
+            return meta
+
+        if self.file_hash(self.csv_path) != meta.get("csv_hash"):
+            logger.info(f"CSV 내용 변경으로 데이터셋 캐시 무효화: {self.csv_path}")
+            return None
+
+        # 내용은 동일하고 stat만 바뀐 경우(복사/touch) 메타만 갱신
+        meta["csv_stat"] = stat
+        self._write_meta(meta)
+        return meta
+
+    def load(self):
+        """
+        Returns:
+            (features, label_codes, vocab) 또는 캐시가 유효하지 않으면 None
+        """
+        meta = self.is_valid()
+        if meta is None:
+            return None
+        features = np.load(self.features_path, mmap_mode="r")
+        label_codes = np.load(self.labels_path, mmap_mode="r")
+        logger.info(f"데이터셋 캐시 로드: {self.features_path} ({features.shape[0]}행)")
+        return features, label_codes, list(meta["vocab"])
+
+    def save(self, features, label_codes, vocab, csv_hash: str = None):
+        """CSV가 이미 저장된 뒤 호출합니다. 임시 파일에 쓴 뒤 교체하여 동시 접근에도 안전합니다."""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        label_codes = np.ascontiguousarray(label_codes, dtype=np.int32)
+
+        for path, array in ((self.features_path, features), (self.labels_path, label_codes)):
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+
+        self._write_meta({
+            "version": CACHE_VERSION,
+            "csv_hash": csv_hash or self.file_hash(self.csv_path),
+            "csv_stat": self._csv_stat(),
+            "vocab": list(vocab),
+            "num_rows": int(features.shape[0]),
+            "num_features": int(features.shape[1]) if features.ndim == 2 else 0,
+        })
+        logger.info(f"데이터셋 캐시 저장 완료: {self.features_path}")
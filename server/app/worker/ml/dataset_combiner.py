@@ -1,32 +1,51 @@
 import logging
-import numpy as np
-import pandas as pd
+import threading
+
+from app.core import PathConfig
+from app.worker.ml.dataset import Dataset
+from app.worker.ml.lineage_store import LineageStore
 
 logger = logging.getLogger(__name__)
 
 class DatasetCombiner:
-    def __init__(self, combine_csv_path: str):
-        self.combine_csv_path = combine_csv_path
-
-    # basic + incremental NPY 파일 통합
-    def combine_and_save_data(self, basic_data, inc_data):
-        # 메모리 병합
-        combined_data = np.vstack((basic_data, inc_data))
-
-        # X(float32), y(str)로 명확히 분리/캐스팅
-        X = combined_data[:, :-1].astype(np.float32, copy=False)  # 랜드마크
-        y = combined_data[:, -1].astype(str)                      # 라벨
-        num_features = X.shape[1]
-
-        # BASIC/INCREMENTAL과 동일한 컬럼 구성
-        feature_cols = [str(i) for i in range(num_features)]
-
-        # 랜드마크 float / 라벨 str
-        df = pd.DataFrame(X, columns=feature_cols)
-        df.insert(0, 'label', y)
-
-        # 5) 저장
-        df.to_csv(self.combine_csv_path, index=False)
-        logger.info(f"통합 데이터 저장 완료(컬럼 호환): {self.combine_csv_path}")
-
-        return combined_data
\ No newline at end of file
+    def __init__(self, path_configs: PathConfig, normalization: str = None):
+        self.path_configs = path_configs
+        self.normalization = normalization  # 계보의 정규화 버전 (basic/inc 모두 이 버전으로 정규화된 데이터)
+        self.lineage_store = LineageStore(path_configs.MODELS_DIR)
+        self._save_thread = None
+        self._save_error = None
+
+    # basic + incremental 데이터셋 통합
+    def combine_and_save_data(self, basic_data: Dataset, inc_data: Dataset, background: bool = False) -> Dataset:
+        # 메모리 병합 (라벨 어휘는 basic 순서 유지)
+        combined_data = basic_data.append(inc_data)
+        self.lineage_store.register(self.path_configs.new_model_code, combined_data, self.normalization)
+
+        if background:
+            # 학습과 겹쳐서 저장하고, 업로드 직전에 wait_saved()로 완료를 확인
+            self._save_thread = threading.Thread(target=self._save_in_background, args=(inc_data,), name="dataset-save")
+            self._save_thread.start()
+        else:
+            self._save(inc_data)
+
+        return combined_data
+
+    def _save_in_background(self, inc_data: Dataset):
+        try:
+            self._save(inc_data)
+        except Exception as e:
+            logger.error(f"통합 데이터 백그라운드 저장 중 에러 발생: {e}", exc_info=True)
+            self._save_error = e
+
+    def wait_saved(self):
+        """백그라운드 저장이 끝날 때까지 대기하고, 실패했다면 예외를 다시 발생시킵니다."""
+        if self._save_thread is not None:
+            self._save_thread.join()
+            self._save_thread = None
+        if self._save_error is not None:
+            raise self._save_error
+
+    def _save(self, inc_data: Dataset):
+        # 전체 복사본 대신 부모 model_code 와 이번에 추가된 행만 저장
+        self.lineage_store.write_delta(self.path_configs.new_model_code, self.path_configs.model_code, inc_data, self.normalization)
+        logger.info(f"통합 데이터 저장 완료(계보 delta): {self.path_configs.lineage_manifest_path}")
@@ -2,15 +2,35 @@ import logging
 logger = logging.getLogger(__name__)
 import numpy as np
 
+from app.worker.ml.duplicate_index import DuplicateIndex
+
 class DuplicateChecker:
+    def __init__(self, chunk_size=256, workers=1):
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    @staticmethod
+    def _report(total_count, duplicate_count):
+        rate = (duplicate_count / total_count) * 100 if total_count > 0 else 0.0
+        return {'total_count': total_count, 'duplicate_count': duplicate_count, 'duplicate_rate': rate}
 
     @staticmethod
-    def check(vectors1, vectors2, tolerance):
+    def check(vectors1, vectors2, tolerance, chunk_size=256, workers=1):
         if vectors1.shape[0] == 0 or vectors2.shape[0] == 0:
             return {'total_count': vectors1.shape[0], 'duplicate_count': 0, 'duplicate_rate': 0.0}
-        duplicate_count = sum(1 for v1 in vectors1 if np.any(np.all(np.isclose(v1, vectors2, atol=tolerance), axis=1)))
-        rate = (duplicate_count / vectors1.shape[0]) * 100 if vectors1.shape[0] > 0 else 0.0
-        return {'total_count': vectors1.shape[0], 'duplicate_count': duplicate_count, 'duplicate_rate': rate}
+        index = DuplicateIndex(vectors2, tolerance, chunk_size=chunk_size, workers=workers)
+        duplicate_count, _ = index.count(vectors1)
+        return DuplicateChecker._report(vectors1.shape[0], duplicate_count)
+
+    @staticmethod
+    def _stop_count(total_count, threshold):
+        # duplicate_rate > threshold 가 되는 최소 중복 개수 (_report 와 동일한 식으로 보정)
+        count = max(0, int(np.floor(threshold * total_count / 100)))
+        while count > 0 and (count / total_count) * 100 > threshold:
+            count -= 1
+        while count <= total_count and not ((count / total_count) * 100 > threshold):
+            count += 1
+        return count
 
     # 신규: inc의 각 라벨/데이터을 basic의 모든 라벨/데이터를 순차적으로 비교하고, 임계치 초과 시 즉시 종료
     def check_incremental_vs_all(self, inc_grouped, base_grouped, threshold, tolerance):
@@ -20,13 +40,33 @@ class DuplicateChecker:
         D vs B -> ...
         D vs C -> ...
         다른 inc 라벨이 존재하면 동일 로직 반복
+
+        base 라벨별 인덱스는 한 번만 만들어 모든 inc 라벨 비교에 재사용합니다.
+        base_grouped 의 값은 특징 행렬 또는 미리 구성된 DuplicateIndex (계보 인덱스) 입니다.
         """
+        base_indexes = {}
         for inc_label, inc_vectors in inc_grouped.items():
+            total_count = inc_vectors.shape[0]
+            stop_count = self._stop_count(total_count, threshold)
             for basic_label, basic_vectors in base_grouped.items():
-                report = self.check(inc_vectors, basic_vectors, tolerance=tolerance)
+                if isinstance(basic_vectors, DuplicateIndex):
+                    base_indexes[basic_label] = basic_vectors
+                    basic_count = basic_vectors.size
+                else:
+                    basic_count = basic_vectors.shape[0]
+                if total_count == 0 or basic_count == 0:
+                    report = self._report(total_count, 0)
+                    early_stopped = False
+                else:
+                    if basic_label not in base_indexes:
+                        base_indexes[basic_label] = DuplicateIndex(
+                            basic_vectors, tolerance, chunk_size=self.chunk_size, workers=self.workers
+                        )
+                    duplicate_count, early_stopped = base_indexes[basic_label].count(inc_vectors, stop_count=stop_count)
+                    report = self._report(total_count, duplicate_count)
                 logger.info(
                     f"[교차비교] inc '{inc_label}' vs basic '{basic_label}': "
-                    f"{report['duplicate_count']}/{report['total_count']} "
+                    f"{'>=' if early_stopped else ''}{report['duplicate_count']}/{report['total_count']} "
                     f"({report['duplicate_rate']:.2f}%)"
                 )
                 # 요구사항: "임계치를 넘는다면" → '>' 비교 유지
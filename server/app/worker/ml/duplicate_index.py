@@ -0,0 +1,186 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# np.isclose 기본 rtol (기존 check와 동일한 판정을 위해 그대로 사용)
+_RTOL = 1e-05
+
+
+class DuplicateIndex:
+    """
+    기준(base) 벡터 집합에 대한 중복 검사용 인덱스.
+
+    기존 DuplicateChecker.check 와 동일한 판정(np.isclose(atol=tolerance) 의 전 차원 일치)을
+    다음 순서로 벡터화하여 수행합니다.
+      1) 행 바이트 해시 조회로 완전히 동일한 벡터를 즉시 판정
+      2) 분산이 가장 큰 차원을 정렬 키로 사용해 허용오차 격자 범위만 후보로 선택(searchsorted)
+      3) 후보 구간 안에서만 블록 단위 브로드캐스트 비교 (메모리 상한 유지)
+    """
+
+    def __init__(self, vectors, tolerance, chunk_size=256, max_block_elems=1 << 22, workers=1):
+        vectors = np.ascontiguousarray(vectors)
+        if vectors.ndim != 2:
+            raise ValueError(f"2차원 벡터 배열이 필요합니다: shape={vectors.shape}")
+
+        self.tolerance = tolerance
+        self.chunk_size = max(1, int(chunk_size))
+        self.max_block_elems = max(1, int(max_block_elems))
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.size = vectors.shape[0]
+        self.dim = vectors.shape[1]
+
+        if self.size == 0:
+            self.key_dim = 0
+            self.sorted_vectors = vectors
+            self.sorted_keys = np.empty(0, dtype=np.float64)
+            self.radius = 0.0
+            self._row_hashes = set()
+            return
+
+        self.key_dim = self.select_key_dim(vectors)
+
+        keys = vectors[:, self.key_dim].astype(np.float64)
+        order = np.argsort(keys, kind='stable')  # NaN은 맨 뒤로 정렬되어 어떤 구간에도 포함되지 않음
+        self.sorted_vectors = vectors[order]
+        self.sorted_keys = keys[order]
+
+        self.radius = self.key_radius(tolerance, self.max_abs_key(keys), vectors.dtype)
+        self._row_hashes = self._hash_rows(self.sorted_vectors)
+
+    @classmethod
+    def from_sorted(cls, sorted_vectors, key_dim, max_abs, tolerance, chunk_size=256, max_block_elems=1 << 22, workers=1):
+        """
+        이미 key_dim 기준으로 정렬된 벡터로 정렬/해시 계산 없이 인덱스를 구성합니다. (계보별로 저장된 정렬 순서 재사용)
+        완전 일치 행도 후보 구간 비교에서 찾아지므로 행 해시는 만들지 않습니다.
+        """
+        index = cls.__new__(cls)
+        index.sorted_vectors = np.ascontiguousarray(sorted_vectors)
+        index.tolerance = tolerance
+        index.chunk_size = max(1, int(chunk_size))
+        index.max_block_elems = max(1, int(max_block_elems))
+        index.workers = max(1, int(workers or os.cpu_count() or 1))
+        index.size, index.dim = index.sorted_vectors.shape
+        index.key_dim = int(key_dim)
+        index.sorted_keys = index.sorted_vectors[:, index.key_dim].astype(np.float64)
+        index.radius = cls.key_radius(tolerance, max_abs, index.sorted_vectors.dtype)
+        index._row_hashes = set()
+        return index
+
+    @staticmethod
+    def select_key_dim(vectors) -> int:
+        """정렬 키 차원: 유한값 기준 분산이 가장 큰 차원 (후보 구간을 가장 좁게 만듦)"""
+        finite = np.where(np.isfinite(vectors), vectors, np.nan).astype(np.float64)
+        with np.errstate(all='ignore'):
+            spread = np.nan_to_num(np.nanstd(finite, axis=0), nan=0.0)
+        return int(np.argmax(spread))
+
+    @staticmethod
+    def max_abs_key(keys) -> float:
+        finite_keys = keys[np.isfinite(keys)]
+        return float(np.max(np.abs(finite_keys))) if finite_keys.size else 0.0
+
+    @staticmethod
+    def key_radius(tolerance, max_abs, dtype) -> float:
+        """|a - b| <= atol + rtol * |b| 를 만족할 수 있는 키 차원의 최대 반경 (부동소수 오차 여유 포함)"""
+        eps = float(np.finfo(dtype).eps) if np.dtype(dtype).kind == 'f' else 0.0
+        return (tolerance + _RTOL * max_abs) * (1 + 1e-3) + 8 * eps * max_abs
+
+    @staticmethod
+    def _hash_rows(vectors):
+        # NaN이 포함된 행은 자기 자신과도 isclose가 False 이므로 해시 대상에서 제외
+        valid = ~np.isnan(vectors).any(axis=1) if vectors.dtype.kind == 'f' else np.ones(len(vectors), bool)
+        rows = np.ascontiguousarray(vectors[valid])
+        return {row.tobytes() for row in rows}
+
+    def _exact_hits(self, queries):
+        if not self._row_hashes or queries.dtype != self.sorted_vectors.dtype:
+            return np.zeros(queries.shape[0], dtype=bool)
+        queries = np.ascontiguousarray(queries)
+        return np.fromiter((q.tobytes() in self._row_hashes for q in queries), dtype=bool, count=queries.shape[0])
+
+    def _match_block(self, block, lo, hi):
+        """정렬된 쿼리 블록과 base 후보 구간 [lo, hi) 를 블록 단위로 브로드캐스트 비교"""
+        matched = np.zeros(block.shape[0], dtype=bool)
+        if hi <= lo:
+            return matched
+        step = max(1, self.max_block_elems // max(1, block.shape[0] * self.dim))
+        for start in range(lo, hi, step):
+            pending = ~matched
+            if not pending.any():
+                break
+            candidates = self.sorted_vectors[start:min(start + step, hi)]
+            close = np.isclose(block[pending][:, None, :], candidates[None, :, :], atol=self.tolerance)
+            matched[pending] = close.all(axis=2).any(axis=1)
+        return matched
+
+    def match(self, queries, stop_count=None):
+        """
+        각 쿼리 벡터가 base 중 하나와 허용오차 내에서 일치하는지 여부를 반환합니다.
+
+        Args:
+            queries: (N, D) 비교 대상 벡터
+            stop_count: 일치 개수가 이 값에 도달하면 남은 청크 검사를 생략 (None이면 전체 검사)
+
+        Returns:
+            (matched, early_stopped): bool 배열과 조기 종료 여부
+        """
+        queries = np.asarray(queries)
+        n = queries.shape[0]
+        matched = np.zeros(n, dtype=bool)
+        if n == 0 or self.size == 0:
+            return matched, False
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"특징 수가 다릅니다: base={self.dim}, query={queries.shape[1]}")
+
+        matched |= self._exact_hits(queries)
+        if stop_count is not None and matched.sum() >= stop_count:
+            return matched, True
+
+        pending_idx = np.flatnonzero(~matched)
+        q_keys = queries[pending_idx, self.key_dim].astype(np.float64)
+        # NaN 키는 어떤 base와도 일치할 수 없음
+        valid = ~np.isnan(q_keys)
+        pending_idx, q_keys = pending_idx[valid], q_keys[valid]
+        order = np.argsort(q_keys, kind='stable')
+        pending_idx, q_keys = pending_idx[order], q_keys[order]
+
+        los = np.searchsorted(self.sorted_keys, q_keys - self.radius, side='left')
+        his = np.searchsorted(self.sorted_keys, q_keys + self.radius, side='right')
+
+        chunks = [
+            (pending_idx[s:s + self.chunk_size], int(los[s]), int(his[min(s + self.chunk_size, len(q_keys)) - 1]))
+            for s in range(0, len(q_keys), self.chunk_size)
+        ]
+
+        found = int(matched.sum())
+
+        def run(chunk):
+            idx, lo, hi = chunk
+            return idx, self._match_block(queries[idx], lo, hi)
+
+        if self.workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                idx, hits = run(chunk)
+                matched[idx] = hits
+                found += int(hits.sum())
+                if stop_count is not None and found >= stop_count:
+                    return matched, True
+            return matched, False
+
+        # 청크를 worker 수만큼 묶어 병렬 처리 (numpy 연산은 GIL을 해제함), 묶음마다 조기 종료 확인
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for wave_start in range(0, len(chunks), self.workers):
+                for idx, hits in executor.map(run, chunks[wave_start:wave_start + self.workers]):
+                    matched[idx] = hits
+                    found += int(hits.sum())
+                if stop_count is not None and found >= stop_count:
+                    return matched, True
+        return matched, False
+
+    def count(self, queries, stop_count=None):
+        matched, early_stopped = self.match(queries, stop_count=stop_count)
+        return int(matched.sum()), early_stopped
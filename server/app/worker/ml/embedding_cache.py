@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from app.worker.ml.dataset_cache import DatasetCache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    고정(frozen)된 특징 추출기로 계산한 base 데이터셋 임베딩을 디스크에 캐시합니다.
+
+    키는 (기반 Keras 모델 파일 해시, base 특징 행렬 해시, 특징 추출기 구성) 이며,
+    하나라도 바뀌면 임베딩을 다시 계산합니다.
+    """
+
+    def __init__(self, base_model_dir: str, model_code: str, base_keras_model_path: str, extractor_id: str = None):
+        self.base_keras_model_path = base_keras_model_path
+        self.extractor_id = extractor_id  # 같은 기반 모델에서 자르는 위치가 다른 추출기 구분 (None 은 기본 구성)
+        self.embeddings_path = os.path.join(base_model_dir, f"{model_code}_embeddings.npy")
+        self.meta_path = os.path.join(base_model_dir, f"{model_code}_embeddings.json")
+
+    @staticmethod
+    def features_hash(features) -> str:
+        return hashlib.sha256(np.ascontiguousarray(features, dtype=np.float32).tobytes()).hexdigest()
+
+    def _key(self, features):
+        key = {
+            "model_hash": DatasetCache.file_hash(self.base_keras_model_path),
+            "features_hash": self.features_hash(features),
+        }
+        if self.extractor_id is not None:
+            key["extractor"] = self.extractor_id
+        return key
+
+    def _load(self, key):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("key") != key or not os.path.exists(self.embeddings_path):
+            return None
+        return np.load(self.embeddings_path, mmap_mode="r")
+
+    def _save(self, key, embeddings):
+        tmp_path = f"{self.embeddings_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(embeddings, dtype=np.float32))
+        os.replace(tmp_path, self.embeddings_path)
+
+        tmp_meta = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "shape": list(embeddings.shape)}, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    def get_or_compute(self, feature_extractor, features, batch_size: int = 1024):
+        """
+        Args:
+            feature_extractor: 고정된 특징 추출기 (Keras 모델)
+            features: (N, D) float32 base 특징 행렬
+
+        Returns:
+            (N, E) float32 임베딩
+        """
+        key = self._key(features)
+        cached = self._load(key)
+        if cached is not None:
+            logger.info(f"임베딩 캐시 사용: {self.embeddings_path} ({cached.shape[0]}행)")
+            return cached
+
+        logger.info(f"임베딩 캐시 없음, base 임베딩 계산 시작 ({len(features)}행)")
+        embeddings = embed(feature_extractor, features, batch_size=batch_size)
+        self._save(key, embeddings)
+        logger.info(f"임베딩 캐시 저장 완료: {self.embeddings_path}")
+        return embeddings
+
+
+def embed(feature_extractor, features, batch_size: int = 1024):
+    """(N, D) 특징을 (N, D, 1)로 바꿔 특징 추출기에 통과시킨 임베딩을 반환"""
+    features = np.asarray(features, dtype=np.float32)
+    if len(features) == 0:
+        return np.empty((0, feature_extractor.output_shape[-1]), dtype=np.float32)
+    x = features.reshape(-1, features.shape[1], 1)
+    return np.asarray(feature_extractor.predict(x, batch_size=batch_size, verbose=0), dtype=np.float32)
@@ -1,24 +1,37 @@
-import numpy as np
-import pandas as pd
-from app.core import PathConfig
+import json
+import os
+
+from app.worker.ml.dataset import Dataset
+
+
+def save_label_order(path, label_order):
+    """모델 출력 열 순서대로 라벨 목록을 저장 (다음 증분 학습의 헤드 warm start 에서 라벨 이름으로 열을 맞춤)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(list(label_order), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_label_order(path):
+    """저장된 모델 출력 라벨 순서 (없으면 None)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
 
 
 class LabelManager:
-    def __init__(self, basic_data, combine_data):
+    def __init__(self, basic_data: Dataset, combine_data: Dataset):
         self.basic_data = basic_data
         self.combine_data = combine_data
 
-        self.basic_data[: -1] = self.basic_data[: -1].astype(str)
-        self.combine_data[: -1] = self.combine_data[: -1].astype(str)
-
     def get_base_labels(self):
-        y = self.basic_data[:, -1]
-        return list(pd.unique(y)) # np.unique() 변경
+        return self.basic_data.present_labels()
 
     def get_combine_labels(self):
-        y = self.combine_data[:, -1]
         # CSV 등장 순서 보존
-        return list(pd.unique(y)) # np.unique() 변경
+        return self.combine_data.present_labels()
 
     def build_label_map(self):
         base_labels = self.get_base_labels()
@@ -29,4 +42,4 @@ class LabelManager:
 
         final_label_order = base_labels + new_labels
         label_map = {label: i for i, label in enumerate(final_label_order)}
-        return label_map, final_label_order
\ No newline at end of file
+        return label_map, final_label_order
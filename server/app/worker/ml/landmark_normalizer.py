@@ -0,0 +1,68 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_LANDMARKS = 21
+WRIST, MIDDLE_MCP = 0, 9
+
+# 정규화 버전 (데이터셋/계보에 기록되어 같은 계보의 데이터는 항상 같은 방식으로 정규화됨)
+NORMALIZATION_NONE = None
+NORMALIZATION_WRIST_MCP_V1 = "wrist_mcp_v1"
+SUPPORTED_VERSIONS = (NORMALIZATION_WRIST_MCP_V1,)
+
+
+class LandmarkNormalizer:
+    """
+    (N, 64) 특징 행렬(21개 랜드마크 x (x, y, z) + handedness)을 한 번의 NumPy 연산으로 정규화/검증합니다.
+
+    wrist_mcp_v1:
+      - 0번(손목) 기준으로 평행 이동
+      - 0번 -> 9번(중지 MCP) 거리로 크기 정규화, 이 거리가 너무 작으면(가려짐/인식 오류) 손목에서 가장 먼 랜드마크 거리로 대체
+      - NaN/무한대, 크기를 정할 수 없는 행, 정규화 후 좌표가 max_abs 를 넘는 이상치, handedness 가 [0, 1] 밖인 행은 제외
+    """
+
+    def __init__(self, version: str = NORMALIZATION_WRIST_MCP_V1, min_scale: float = 1e-6, max_abs: float = 10.0):
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"지원하지 않는 정규화 버전입니다: {version}")
+        self.version = version
+        self.min_scale = min_scale
+        self.max_abs = max_abs
+
+    def normalize(self, features):
+        """
+        Returns:
+            (normalized, valid): normalized 는 (N, 64) float32 (유효하지 않은 행은 0), valid 는 (N,) bool
+        """
+        x = np.asarray(features, dtype=np.float32)
+        n = x.shape[0]
+        coords = x[:, :NUM_LANDMARKS * 3].reshape(n, NUM_LANDMARKS, 3)
+        handedness = x[:, NUM_LANDMARKS * 3]
+
+        valid = np.isfinite(x).all(axis=1) & (handedness >= 0) & (handedness <= 1)
+
+        # NaN 행이 나머지 계산에 경고를 만들지 않도록 0으로 바꾼 뒤 계산 (valid 에서 이미 제외됨)
+        centered = np.where(valid[:, None, None], coords - coords[:, WRIST:WRIST + 1, :], 0.0)
+        distances = np.linalg.norm(centered, axis=2)                          # (N, 21) 손목과의 거리
+        scale = distances[:, MIDDLE_MCP]
+        degenerate = scale < self.min_scale
+        scale = np.where(degenerate, distances.max(axis=1), scale)
+        valid &= scale >= self.min_scale
+
+        normalized = centered / np.where(valid, scale, 1.0)[:, None, None]
+        valid &= np.abs(normalized).max(axis=(1, 2)) <= self.max_abs
+
+        out = np.zeros_like(x)
+        out[:, :NUM_LANDMARKS * 3] = normalized.reshape(n, -1)
+        out[:, NUM_LANDMARKS * 3] = handedness
+        out[~valid] = 0.0
+
+        if degenerate.any():
+            logger.info(f"손목-중지 MCP 거리가 0에 가까운 {int(degenerate.sum())}행은 손 크기로 대신 정규화")
+        return out, valid
+
+    def normalize_valid(self, features):
+        """유효한 행만 정규화하여 반환 ((M, 64), (N,) bool)"""
+        out, valid = self.normalize(features)
+        return out[valid], valid
@@ -0,0 +1,125 @@
+import logging
+import os
+
+import numpy as np
+
+from app.worker.ml.dataset import Dataset
+from app.worker.ml.duplicate_index import DuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+DUP_INDEX_VERSION = 1
+
+
+class LineageDuplicateIndex:
+    """
+    model_code 의 전체(계보) 데이터셋에 대한 라벨별 중복 검사 인덱스.
+
+    라벨마다 정렬 키 차원(key_dim), 키 최대 절댓값(max_abs), 그리고 전체 데이터셋 행 번호를
+    키 순으로 정렬한 배열(order)만 저장합니다. 특징 값은 저장하지 않고 계보 데이터셋에서 가져오므로
+    모델마다 행당 4바이트만 추가됩니다.
+
+    자식 모델은 부모 인덱스에 자신이 추가한 행만 searchsorted 위치로 끼워 넣어 만들고(extended),
+    작업마다 전체 정렬이나 행 해시 계산 없이 DuplicateIndex 를 구성합니다(label_indexes).
+    """
+
+    def __init__(self, rows, entries, normalization=None):
+        self.rows = int(rows)
+        self.entries = entries            # label -> (key_dim, max_abs, order)
+        self.normalization = normalization
+
+    @staticmethod
+    def _sort_rows(features, row_index, key_dim):
+        keys = features[row_index, key_dim].astype(np.float64)
+        order = np.argsort(keys, kind='stable')  # NaN 은 맨 뒤 (DuplicateIndex 와 동일)
+        return row_index[order], keys[order]
+
+    @classmethod
+    def build(cls, dataset: Dataset, normalization=None):
+        """전체 데이터셋으로 처음부터 구성 (계보 루트 또는 인덱스가 없는 기존 모델에서 한 번만)"""
+        entries = {}
+        for code, label in enumerate(dataset.vocab):
+            row_index = np.flatnonzero(dataset.label_codes == code)
+            if row_index.size == 0:
+                continue
+            key_dim = DuplicateIndex.select_key_dim(dataset.features[row_index])
+            order, keys = cls._sort_rows(dataset.features, row_index, key_dim)
+            entries[label] = (key_dim, DuplicateIndex.max_abs_key(keys), order)
+        return cls(len(dataset), entries, normalization)
+
+    def extended(self, combined: Dataset):
+        """
+        combined = (이 인덱스의 데이터셋).append(incremental) 에 대한 인덱스를 반환합니다.
+        기존 라벨은 새 행만 정렬해 병합 위치에 삽입하고, 새 라벨만 새로 구성합니다.
+        """
+        if len(combined) < self.rows:
+            raise ValueError(f"통합 데이터셋이 기존 인덱스보다 작습니다: {len(combined)} < {self.rows}")
+        entries = dict(self.entries)
+        inc_codes = combined.label_codes[self.rows:]
+        for code in np.unique(inc_codes):
+            label = combined.vocab[code]
+            new_rows = self.rows + np.flatnonzero(inc_codes == code)
+            if label not in entries:
+                key_dim = DuplicateIndex.select_key_dim(combined.features[new_rows])
+                order, keys = self._sort_rows(combined.features, new_rows, key_dim)
+                entries[label] = (key_dim, DuplicateIndex.max_abs_key(keys), order)
+                continue
+            key_dim, max_abs, order = entries[label]
+            new_order, new_keys = self._sort_rows(combined.features, new_rows, key_dim)
+            old_keys = combined.features[order, key_dim].astype(np.float64)
+            positions = np.searchsorted(old_keys, new_keys, side='right')
+            entries[label] = (
+                key_dim,
+                max(max_abs, DuplicateIndex.max_abs_key(new_keys)),
+                np.insert(order, positions, new_order),
+            )
+        return LineageDuplicateIndex(len(combined), entries, self.normalization)
+
+    def label_indexes(self, dataset: Dataset, tolerance, chunk_size=256, workers=1):
+        """라벨(정렬 순) -> DuplicateIndex (DuplicateChecker.check_incremental_vs_all 의 base_grouped 로 사용)"""
+        if len(dataset) != self.rows:
+            raise ValueError(f"인덱스와 데이터셋 행 수가 다릅니다: {self.rows} vs {len(dataset)}")
+        return {
+            label: DuplicateIndex.from_sorted(
+                dataset.features[order], key_dim, max_abs, tolerance, chunk_size=chunk_size, workers=workers
+            )
+            for label, (key_dim, max_abs, order) in sorted(self.entries.items())
+        }
+
+    def save(self, path):
+        """라벨별 배열을 하나의 .npz 로 저장 (임시 파일 후 교체, pickle 미사용)"""
+        labels = list(self.entries)
+        orders = [self.entries[label][2] for label in labels]
+        offsets = np.cumsum([0] + [len(order) for order in orders]).astype(np.int64)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            version=np.int32(DUP_INDEX_VERSION),
+            rows=np.int64(self.rows),
+            normalization=np.str_(self.normalization or ""),
+            labels=np.array(labels, dtype=np.str_),
+            key_dims=np.array([self.entries[label][0] for label in labels], dtype=np.int32),
+            max_abs=np.array([self.entries[label][1] for label in labels], dtype=np.float64),
+            offsets=offsets,
+            order=np.concatenate(orders).astype(np.int32) if orders else np.empty(0, dtype=np.int32),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """저장된 인덱스 (없거나 버전이 다르면 None)"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != DUP_INDEX_VERSION:
+                    return None
+                offsets, order = data["offsets"], data["order"].astype(np.int64)
+                entries = {
+                    str(label): (int(key_dim), float(max_abs), order[offsets[i]:offsets[i + 1]])
+                    for i, (label, key_dim, max_abs) in enumerate(zip(data["labels"], data["key_dims"], data["max_abs"]))
+                }
+                return cls(int(data["rows"]), entries, str(data["normalization"]) or None)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"중복 검사 인덱스를 읽지 못해 다시 구성합니다({path}): {e}")
+            return None
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.worker.ml.data_preprocessor import DataPreprocessor
+from app.worker.ml.dataset import Dataset
+from app.worker.ml.dataset_cache import DatasetCache
+from app.worker.ml.lineage_duplicate_index import LineageDuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+LINEAGE_VERSION = 1
+
+
+class LineageStore:
+    """
+    모델 계보(base_v1 -> A -> B ...) 기반 데이터셋 저장소.
+
+    각 model_code 디렉토리에는 부모 model_code 와 자신이 추가한 행(delta)만 저장합니다.
+    - {code}_lineage.json        : parent, 라벨 어휘, 행 수
+    - {code}_delta_features.npy  : delta 특징 (float32)
+    - {code}_delta_labels.npy    : delta 라벨 코드 (int32, 자신의 어휘 기준)
+    - {code}_dup_index.npz       : 전체 데이터셋의 라벨별 중복 검사 인덱스 (부모 인덱스 + delta, 로컬 전용)
+
+    부모가 없는 루트 모델(예: base_v1)은 기존처럼 {code}.csv (+ DatasetCache) 를 사용합니다.
+    전체 데이터셋은 조상 delta 를 이어붙여 필요할 때 구성하며, 자주 쓰는 계보는 프로세스 메모리에 캐시합니다.
+
+    정규화 버전(normalization)은 계보 단위로 고정됩니다. delta 는 그 버전으로 정규화된 행을 저장하고,
+    루트 CSV(원본)는 불러올 때 같은 버전으로 정규화합니다. 버전이 기록되지 않은 기존 계보는 원본 그대로 사용합니다.
+    """
+
+    _materialized = OrderedDict()  # (model_code, normalization) -> Dataset (model_code 의 데이터는 불변)
+    _lock = threading.Lock()
+    max_cached = int(os.getenv("LINEAGE_CACHE_ENTRIES", "8"))
+
+    def __init__(self, models_dir: str, root_normalization: str = None):
+        self.models_dir = models_dir
+        # 루트 모델에서 새 계보를 시작할 때 적용할 정규화 버전
+        self.root_normalization = root_normalization
+
+    def _model_dir(self, model_code):
+        return os.path.join(self.models_dir, model_code)
+
+    def manifest_path(self, model_code):
+        return os.path.join(self._model_dir(model_code), f"{model_code}_lineage.json")
+
+    def delta_paths(self, model_code):
+        model_dir = self._model_dir(model_code)
+        return (
+            os.path.join(model_dir, f"{model_code}_delta_features.npy"),
+            os.path.join(model_dir, f"{model_code}_delta_labels.npy"),
+        )
+
+    def dup_index_path(self, model_code):
+        return os.path.join(self._model_dir(model_code), f"{model_code}_dup_index.npz")
+
+    def root_csv_path(self, model_code):
+        return os.path.join(self._model_dir(model_code), f"{model_code}.csv")
+
+    def read_manifest(self, model_code):
+        try:
+            with open(self.manifest_path(model_code), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def has_model(self, model_code):
+        return os.path.exists(self.manifest_path(model_code)) or os.path.exists(self.root_csv_path(model_code))
+
+    def normalization_of(self, model_code):
+        """model_code 계보의 정규화 버전 (루트 모델이면 root_normalization)"""
+        manifest = self.read_manifest(model_code)
+        if manifest is None:
+            return self.root_normalization
+        return manifest.get("normalization")
+
+    def lineage(self, model_code):
+        """루트부터 model_code 까지의 model_code 목록"""
+        chain = []
+        code = model_code
+        while code is not None:
+            if code in chain:
+                raise ValueError(f"모델 계보에 순환이 있습니다: {chain + [code]}")
+            chain.append(code)
+            manifest = self.read_manifest(code)
+            code = manifest["parent"] if manifest else None
+        return list(reversed(chain))
+
+    def load_delta(self, model_code) -> Dataset:
+        manifest = self.read_manifest(model_code)
+        features_path, labels_path = self.delta_paths(model_code)
+        features = np.load(features_path, mmap_mode="r")
+        label_codes = np.load(labels_path, mmap_mode="r")
+        return Dataset(features, label_codes, manifest["vocab"])
+
+    def _load_root(self, model_code, normalization) -> Dataset:
+        csv_path = self.root_csv_path(model_code)
+        if not os.path.exists(csv_path):
+            error_msg = f"모델 데이터셋이 존재하지 않습니다: {model_code}"
+            logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+        return DataPreprocessor.normalize_dataset(DataPreprocessor.load_cached(csv_path), normalization)
+
+    def _cache_get(self, key):
+        with self._lock:
+            dataset = self._materialized.get(key)
+            if dataset is not None:
+                self._materialized.move_to_end(key)
+            return dataset
+
+    def _cache_put(self, key, dataset):
+        with self._lock:
+            self._materialized[key] = dataset
+            self._materialized.move_to_end(key)
+            while len(self._materialized) > self.max_cached:
+                self._materialized.popitem(last=False)
+
+    def materialize(self, model_code) -> Dataset:
+        """조상 delta 를 이어붙인 model_code 의 전체 데이터셋 (계보의 정규화 버전 기준)"""
+        normalization = self.normalization_of(model_code)
+        cached = self._cache_get((model_code, normalization))
+        if cached is not None:
+            return cached
+
+        chain = self.lineage(model_code)
+        for code in chain[1:]:
+            if self.read_manifest(code).get("normalization") != normalization:
+                raise ValueError(f"계보 안에서 정규화 버전이 다릅니다: {code} (기대값: {normalization})")
+
+        # 가장 가까운 캐시된 조상부터 이어붙임
+        start, dataset = 0, None
+        for i in range(len(chain) - 1, -1, -1):
+            dataset = self._cache_get((chain[i], normalization))
+            if dataset is not None:
+                start = i + 1
+                break
+        if dataset is None:
+            dataset = self._load_root(chain[0], normalization)
+            start = 1
+
+        deltas = [self.load_delta(code) for code in chain[start:]]
+        for delta in deltas:
+            dataset = dataset.append(delta)
+
+        logger.info(f"계보 데이터셋 구성: {' -> '.join(chain)} ({len(dataset)}행, 정규화: {normalization or '없음'})")
+        self._cache_put((model_code, normalization), dataset)
+        return dataset
+
+    def write_delta(self, model_code, parent_code, delta: Dataset, normalization: str = None):
+        """model_code 디렉토리에 부모 정보와 delta 행(normalization 버전으로 정규화된 값)을 저장 (임시 파일 후 교체)"""
+        os.makedirs(self._model_dir(model_code), exist_ok=True)
+        features_path, labels_path = self.delta_paths(model_code)
+        for path, array in (
+            (features_path, np.ascontiguousarray(delta.features, dtype=np.float32)),
+            (labels_path, np.ascontiguousarray(delta.label_codes, dtype=np.int32)),
+        ):
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+
+        manifest = {
+            "version": LINEAGE_VERSION,
+            "parent": parent_code,
+            "vocab": list(delta.vocab),
+            "rows": len(delta),
+            "num_features": delta.num_features,
+            "features_hash": DatasetCache.file_hash(features_path),
+            "normalization": normalization,
+        }
+        tmp_manifest = f"{self.manifest_path(model_code)}.{os.getpid()}.tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_manifest, self.manifest_path(model_code))
+        logger.info(f"계보 delta 저장 완료: {model_code} (parent={parent_code}, {len(delta)}행)")
+
+    def duplicate_index(self, model_code, dataset: Dataset) -> LineageDuplicateIndex:
+        """
+        model_code 의 중복 검사 인덱스 (dataset 은 materialize(model_code) 결과).
+        저장된 인덱스가 없거나 데이터셋과 맞지 않으면(기존 모델, 정규화 변경) 한 번 구성하여 저장합니다.
+        """
+        normalization = self.normalization_of(model_code)
+        path = self.dup_index_path(model_code)
+        index = LineageDuplicateIndex.load(path)
+        if index is not None and index.rows == len(dataset) and index.normalization == normalization:
+            return index
+
+        logger.info(f"중복 검사 인덱스 구성: {model_code} ({len(dataset)}행)")
+        index = LineageDuplicateIndex.build(dataset, normalization)
+        self.write_duplicate_index(model_code, index)
+        return index
+
+    def write_duplicate_index(self, model_code, index: LineageDuplicateIndex):
+        """인덱스 저장 (실패해도 다음 작업에서 다시 구성하므로 학습은 계속 진행)"""
+        try:
+            os.makedirs(self._model_dir(model_code), exist_ok=True)
+            index.save(self.dup_index_path(model_code))
+        except OSError as e:
+            logger.warning(f"중복 검사 인덱스 저장 실패({model_code}): {e}")
+
+    def register(self, model_code, dataset: Dataset, normalization: str = None):
+        """방금 만든 전체 데이터셋을 메모리 캐시에 등록 (다음 작업에서 다시 구성하지 않도록)"""
+        self._cache_put((model_code, normalization), dataset)
+
+    def artifact_paths(self, model_code):
+        """업로드 대상 파일 (manifest + delta)"""
+        return [self.manifest_path(model_code), *self.delta_paths(model_code)]
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCache:
+    """
+    워커 프로세스 단위 Keras 모델 캐시 (LRU).
+
+    키는 (모델 경로, 파일 mtime, 파일 크기) 이므로 같은 경로에 모델이 다시 저장되면 자동으로 새로 로드됩니다.
+    get()은 가중치를 복제한 새 모델을 반환하므로 작업이 캐시된 원본을 변경하지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = 4, max_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries = OrderedDict()  # path -> (stat_key, model, nbytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _stat_key(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    @staticmethod
+    def _model_nbytes(model):
+        return int(sum(np.asarray(w).nbytes for w in model.get_weights()))
+
+    @staticmethod
+    def _clone(model):
+        cloned = tf.keras.models.clone_model(model)
+        cloned.set_weights(model.get_weights())
+        return cloned
+
+    def _evict(self):
+        total = sum(nbytes for _, _, nbytes in self._entries.values())
+        while self._entries and (
+            len(self._entries) > self.max_entries or (self.max_bytes and total > self.max_bytes)
+        ):
+            path, (_, _, nbytes) = self._entries.popitem(last=False)
+            total -= nbytes
+            logger.info(f"모델 캐시 LRU 제거: {path}")
+
+    def _lookup(self, path):
+        stat_key = self._stat_key(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat_key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+        self.misses += 1
+        logger.info(f"모델 캐시 미스, 디스크에서 로드: {path}")
+        model = load_model(path)
+        self._store(path, stat_key, model)
+        return model
+
+    def _store(self, path, stat_key, model):
+        with self._lock:
+            self._entries[path] = (stat_key, model, self._model_nbytes(model))
+            self._entries.move_to_end(path)
+            self._evict()
+
+    def get(self, path):
+        """작업에서 수정해도 되는 복제 모델 반환"""
+        return self._clone(self._lookup(path))
+
+    def get_shared(self, path):
+        """캐시된 원본 모델 반환 (summary 등 읽기 전용 용도로만 사용)"""
+        return self._lookup(path)
+
+    def put(self, path, model):
+        """방금 저장한 모델을 캐시에 등록하여 이후 작업에서 다시 역직렬화하지 않도록 합니다."""
+        self._store(path, self._stat_key(path), self._clone(model))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+
+def get_model_cache() -> ModelCache:
+    """프로세스 전역 ModelCache (prefork 자식 프로세스마다 따로 생성됨)"""
+    global _model_cache
+    if _model_cache is None:
+        with _model_cache_lock:
+            if _model_cache is None:
+                _model_cache = ModelCache(
+                    max_entries=int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "4")),
+                    max_bytes=int(os.getenv("MODEL_CACHE_MAX_MB", "512")) * 1024 * 1024,
+                )
+    return _model_cache
@@ -1,11 +1,8 @@
-from tensorflow.keras.models import load_model
-
 # 로그 관리 클래스
 class ModelSummaryPrinter:
     @staticmethod
-    def print_summaries(path_configs):
-        m_basic = load_model(path_configs.base_keras_model_path)
-        m_basic.summary()
+    def print_summaries(base_model, combined_model):
+        """디스크에서 다시 로드하지 않고 메모리에 있는 모델의 요약을 출력합니다."""
+        base_model.summary()
 
-        m_combine = load_model(path_configs.combined_keras_model_path)
-        m_combine.summary()
\ No newline at end of file
+        combined_model.summary()
@@ -2,7 +2,13 @@
 import os
 
 from app.core import PathConfig, HparamsConfig
+from app.core.metrics import stage_timer
 from app.worker.ml.update_model_builder import ModelBuilder
+from app.worker.ml.dataset import Dataset
+from app.worker.ml.label_manager import save_label_order
+from app.worker.ml.embedding_cache import EmbeddingCache, embed
+from app.worker.ml.model_cache import get_model_cache
+from app.worker.ml.training_budget import TrainingBudget, resolve_stop_reason
 import numpy as np
 import tensorflow as tf
 import logging
@@ -14,52 +20,57 @@ from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 logger = logging.getLogger(__name__)
 
 class ModelTrainer:
-    def __init__(self, model_builder: ModelBuilder, path_configs: PathConfig, hparams_config: HparamsConfig, label_map: dict, combined_data: np.ndarray):
+    def __init__(self, model_builder: ModelBuilder, path_configs: PathConfig, hparams_config: HparamsConfig, label_map: dict, combined_data: Dataset, base_data: Dataset = None):
         self.model_builder = model_builder
         self.path_configs = path_configs
         self.hparams_config = hparams_config
         self.label_map = label_map
         self.combined_data = combined_data
+        # head_only 모드에서 임베딩 캐시 키로 사용 (combined_data의 앞부분과 동일한 행)
+        self.base_data = base_data
+        self.train_idx = None
+        self.test_idx = None
+        self.training_mode = None
+        self.epochs_run = 0
+        self.stop_reason = None
 
     # 데이터 로드 및 준비
     def _load_and_prepare_data(self):
         data = self.combined_data
 
-        x = data[:, :-1].astype(np.float32)
-        y_str = data[:, -1].astype(str)
+        x = data.features
+        y_numeric = data.encode(self.label_map)
 
-        # 학습/검증 데이터 분할 (기능적 버그 수정)
-        x_train, x_test, y_train_str, y_test_str = train_test_split(
-            x, y_str, test_size=0.2, random_state=42, stratify=y_str
+        # 학습/검증 데이터 분할 (기능적 버그 수정), head_only 모드에서 임베딩에도 같은 분할을 쓰도록 인덱스로 분할
+        self.train_idx, self.test_idx = train_test_split(
+            np.arange(len(data)), test_size=0.2, random_state=42, stratify=y_numeric
         )
-
-        y_train_numeric = np.array([self.label_map[label] for label in y_train_str])
-        y_test_numeric = np.array([self.label_map[label] for label in y_test_str])
+        x_train, x_test = x[self.train_idx], x[self.test_idx]
+        y_train_numeric, y_test_numeric = y_numeric[self.train_idx], y_numeric[self.test_idx]
 
         y_train = to_categorical(y_train_numeric, num_classes=len(self.label_map))
         y_test = to_categorical(y_test_numeric, num_classes=len(self.label_map))
 
         # 모델 입력 형태를 (데이터 수, 특징 수, 1)로 변환 (Conv1D를 위함)
-        x_train = x_train.reshape(-1, x_train.shape[1], 1).astype(np.float32)
-        x_test  = x_test.reshape(-1,  x_test.shape[1],  1).astype(np.float32)
+        x_train = x_train.reshape(-1, x_train.shape[1], 1)
+        x_test  = x_test.reshape(-1,  x_test.shape[1],  1)
 
         return x_train, y_train, x_test, y_test, y_train_numeric
 
-    # 모델 학습 실행
-    def train(self):
-        x_train, y_train, x_test, y_test, y_train_numeric = self._load_and_prepare_data()
-
-        input_shape = (x_train.shape[1], x_train.shape[2])  # 예: (64, 1)
-        num_classes = len(self.label_map)
-
-        model = self.model_builder.build(input_shape, num_classes)
-        model.compile(optimizer=tf.keras.optimizers.Adam(self.hparams_config.INCREMENTAL_LEARNING_RATE), loss='categorical_crossentropy', metrics=['accuracy'])
+    def _use_head_only(self):
+        return (
+            self.hparams_config.TRAINING_MODE == "head_only"
+            and self.base_data is not None
+            and hasattr(self.model_builder, "build_feature_extractor")
+        )
 
+    def _class_weights(self, y_train_numeric, num_classes):
         # 클래스 불균형을 고려하여 클래스 가중치 계산
         all_classes = np.arange(num_classes, dtype=int)
         class_weights = compute_class_weight('balanced', classes=all_classes, y=y_train_numeric.astype(int))
-        class_weights_dict = {int(c): float(w) for c, w in zip(all_classes, class_weights)}
+        return {int(c): float(w) for c, w in zip(all_classes, class_weights)}
 
+    def _callbacks(self):
         early_stopping = EarlyStopping(
             monitor='val_loss',
             patience=5,
@@ -74,55 +85,147 @@ class ModelTrainer:
             min_lr=1e-5,
             verbose=1
         )
-        callbacks = [early_stopping, lr_scheduler]
-
-
-        logger.info("모델 학습 시작")
-        model.fit(
-          x_train, y_train,
-          validation_data=(x_test, y_test),
-          epochs=self.hparams_config.EPOCHS,
-          batch_size=self.hparams_config.BATCH_SIZE,
-          callbacks=callbacks,
-          class_weight=class_weights_dict,
-          verbose=2
+        return [early_stopping, lr_scheduler]
+
+    def _compile(self, model):
+        model.compile(optimizer=tf.keras.optimizers.Adam(self.hparams_config.INCREMENTAL_LEARNING_RATE), loss='categorical_crossentropy', metrics=['accuracy'])
+
+    # 캐시 + 셔플 + 배치 단위(벡터화) 변환 + prefetch 입력 파이프라인
+    def _make_dataset(self, x, y, batch_size, class_weights_dict=None, shuffle=False):
+        dataset = tf.data.Dataset.from_tensor_slices((np.asarray(x, dtype=np.float32), np.asarray(y, dtype=np.float32))).cache()
+        if shuffle:
+            dataset = dataset.shuffle(min(len(x), 10_000), seed=42, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+
+        if class_weights_dict is not None:
+            # 샘플별 map 대신 배치 전체에 한 번 적용: one-hot 라벨 -> 클래스 가중치
+            weights = tf.constant([class_weights_dict[c] for c in range(len(class_weights_dict))], dtype=tf.float32)
+            dataset = dataset.map(
+                lambda xb, yb: (xb, yb, tf.gather(weights, tf.argmax(yb, axis=1))),
+                num_parallel_calls=tf.data.AUTOTUNE,
+            )
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+    # 학습 예산(epoch/batch 크기, 시간/목표 정확도 중단)을 적용하여 학습하고 종료 사유 기록
+    def _fit(self, model, x_train, y_train, x_val, y_val, class_weights_dict):
+        budget = TrainingBudget(self.hparams_config, len(x_train))
+        early_stopping, lr_scheduler = self._callbacks()
+        budget_callback = budget.callback()
+
+        train_ds = self._make_dataset(x_train, y_train, budget.batch_size, class_weights_dict, shuffle=True)
+        val_ds = self._make_dataset(x_val, y_val, budget.batch_size)
+
+        with stage_timer("fit"):
+            history = model.fit(
+              train_ds,
+              validation_data=val_ds,
+              epochs=budget.epochs,
+              callbacks=[early_stopping, lr_scheduler, budget_callback],
+              verbose=2
+            )
+        self.epochs_run = len(history.history["loss"])
+        self.stop_reason = resolve_stop_reason(budget_callback, early_stopping, self.epochs_run, budget.epochs)
+        logger.info(f"모델 학습 완료 ({self.epochs_run} epochs, 종료 사유: {self.stop_reason})")
+
+    # 전체 미세조정: 특징 추출기까지 함께 학습
+    def _train_full(self, x_train, y_train, x_test, y_test, class_weights_dict):
+        input_shape = (x_train.shape[1], x_train.shape[2])  # 예: (64, 1)
+        num_classes = len(self.label_map)
+
+        model = self.model_builder.build(input_shape, num_classes)
+        self._compile(model)
+
+        logger.info("모델 학습 시작 (full fine-tuning)")
+        self._fit(model, x_train, y_train, x_test, y_test, class_weights_dict)
+        return model
+
+    # 헤드 전용 학습: 고정된 특징 추출기의 임베딩(base는 캐시)으로 Dense 헤드만 학습 후 다시 결합
+    def _train_head_only(self, x_train, y_train, x_test, y_test, class_weights_dict):
+        input_shape = (x_train.shape[1], x_train.shape[2])
+        num_classes = len(self.label_map)
+
+        feature_extractor = self.model_builder.build_feature_extractor(trainable=False)
+
+        embedding_cache = EmbeddingCache(
+            self.path_configs.base_model_dir,
+            self.path_configs.model_code,
+            self.path_configs.base_keras_model_path,
+            self.model_builder.extractor_id(),
         )
-        logger.info("모델 학습 완료")
+        base_embeddings = embedding_cache.get_or_compute(feature_extractor, self.base_data.features)
+        new_rows = self.combined_data.view(slice(len(self.base_data), None))
+        logger.info(f"신규 샘플 임베딩 계산 ({len(new_rows)}행)")
+        new_embeddings = embed(feature_extractor, new_rows.features)
+        embeddings = np.concatenate((base_embeddings, new_embeddings), axis=0)
+
+        e_train, e_test = embeddings[self.train_idx], embeddings[self.test_idx]
+
+        head_model = self.model_builder.build_head_model(embeddings.shape[1], num_classes)
+        self._compile(head_model)
+
+        logger.info("모델 학습 시작 (head only)")
+        self._fit(head_model, e_train, y_train, e_test, y_test, class_weights_dict)
+
+        model = self.model_builder.attach_head(feature_extractor, head_model, input_shape)
+        self._compile(model)
+        return model
+
+    # 모델 학습 실행 (convert_tflite=False 이면 TFLite 변환은 호출자가 별도 단계에서 수행)
+    def train(self, convert_tflite: bool = True):
+        x_train, y_train, x_test, y_test, y_train_numeric = self._load_and_prepare_data()
+        class_weights_dict = self._class_weights(y_train_numeric, len(self.label_map))
+
+        if self._use_head_only():
+            self.training_mode = "head_only"
+            model = self._train_head_only(x_train, y_train, x_test, y_test, class_weights_dict)
+        else:
+            self.training_mode = "full"
+            model = self._train_full(x_train, y_train, x_test, y_test, class_weights_dict)
 
         loss, acc = model.evaluate(x_test, y_test, verbose=0)
         logger.info(f"[EVAL] Test accuracy: {acc:.4f}, loss: {loss:.4f}")
 
         model.save(self.path_configs.combined_keras_model_path)
         logger.info(f"Keras 모델 저장 완료: {os.path.basename(self.path_configs.combined_keras_model_path)}")
-        self._convert_to_tflite(model, x_train)
+        save_label_order(self.path_configs.combined_labels_path, sorted(self.label_map, key=self.label_map.get))
+        # 이 모델을 기반으로 하는 다음 작업에서 다시 역직렬화하지 않도록 워커 캐시에 등록
+        get_model_cache().put(self.path_configs.combined_keras_model_path, model)
+        if convert_tflite:
+            with stage_timer("tflite_convert"):
+                self._convert_to_tflite(model, x_train)
+        return model
 
-    # Keras 모델을 TFLite 모델로 변환 (양자화 포함)
     def _convert_to_tflite(self, model, x_train):
-        # 1) 대표데이터 형상/채널 가드 (경고/런타임 오류 예방)
-        assert x_train.ndim == 3 and x_train.shape[2] == 1
-
-        # 표본 수 안전 가드
-        take_n = min(300, len(x_train))
-
-        def representative_data_gen():
-            # 2) float32 캐스팅 + (1, L, 1) 배치
-            dataset = tf.data.Dataset.from_tensor_slices(
-                tf.cast(x_train, tf.float32)
-            ).shuffle(min(len(x_train), 10_000)
-            ).batch(1
-            ).take(take_n
-            ).prefetch(tf.data.AUTOTUNE)
-
-            for batch in dataset: yield [batch]
-
-        converter = tf.lite.TFLiteConverter.from_keras_model(model)
-        converter.optimizations = [tf.lite.Optimize.DEFAULT]
-        converter.representative_dataset = representative_data_gen
-        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
-        converter.inference_input_type = tf.uint8
-        converter.inference_output_type = tf.uint8
-
-        tflite_quant_model = converter.convert()
-
-        with open(self.path_configs.tflite_model_path, "wb") as f: f.write(tflite_quant_model)
-        logger.info(f"TFLite 모델 저장 완료: {os.path.basename(self.path_configs.tflite_model_path)}")
\ No newline at end of file
+        convert_to_tflite(model, x_train, self.path_configs.tflite_model_path)
+
+
+# Keras 모델을 TFLite 모델로 변환 (양자화 포함), x_train: 대표 데이터 (N, 특징 수, 1)
+def convert_to_tflite(model, x_train, tflite_model_path):
+    # 1) 대표데이터 형상/채널 가드 (경고/런타임 오류 예방)
+    assert x_train.ndim == 3 and x_train.shape[2] == 1
+
+    # 표본 수 안전 가드
+    take_n = min(300, len(x_train))
+
+    def representative_data_gen():
+        # 2) float32 캐스팅 + (1, L, 1) 배치
+        dataset = tf.data.Dataset.from_tensor_slices(
+            tf.cast(x_train, tf.float32)
+        ).shuffle(min(len(x_train), 10_000)
+        ).batch(1
+        ).take(take_n
+        ).prefetch(tf.data.AUTOTUNE)
+
+        for batch in dataset: yield [batch]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_data_gen
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+
+    tflite_quant_model = converter.convert()
+
+    with open(tflite_model_path, "wb") as f: f.write(tflite_quant_model)
+    logger.info(f"TFLite 모델 저장 완료: {os.path.basename(tflite_model_path)}")
\ No newline at end of file
@@ -0,0 +1,81 @@
+import logging
+import os
+
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+# 한 호스트에서 여러 prefork 자식 프로세스가 학습할 때 코어를 나누어 쓰도록 하는 설정
+# (비워 두면 사용 가능한 코어 수 / 워커 동시성으로 자동 계산)
+TF_INTRA_OP_THREADS = os.getenv("TF_INTRA_OP_THREADS")
+TF_INTER_OP_THREADS = int(os.getenv("TF_INTER_OP_THREADS", "1"))
+# "auto": 자식 프로세스 번호별로 겹치지 않는 코어 묶음에 고정, "off": 고정하지 않음, 또는 "0-3,8" 같은 코어 목록
+WORKER_CPU_AFFINITY = os.getenv("WORKER_CPU_AFFINITY", "auto")
+
+
+def _parse_cpu_list(spec: str):
+    cpus = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return sorted(set(cpus))
+
+
+def _available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _process_index():
+    """prefork 풀에서 이 자식 프로세스의 번호 (0부터, 알 수 없으면 None)"""
+    try:
+        from billiard.process import current_process
+        return current_process().index
+    except (ImportError, AttributeError):
+        return None
+
+
+def configure_worker_runtime(concurrency: int):
+    """
+    워커 자식 프로세스 시작 시(학습 전에) TensorFlow 스레드 수와 CPU affinity 를 설정합니다.
+    TensorFlow 런타임이 초기화된 뒤에는 스레드 수를 바꿀 수 없으므로 worker_process_init 에서 호출해야 합니다.
+    """
+    cpus = _available_cpus()
+    concurrency = max(1, concurrency)
+    cores_per_worker = max(1, len(cpus) // concurrency)
+    intra_threads = int(TF_INTRA_OP_THREADS) if TF_INTRA_OP_THREADS else cores_per_worker
+
+    affinity = None
+    if WORKER_CPU_AFFINITY == "auto":
+        index = _process_index()
+        if index is not None and len(cpus) >= concurrency:
+            start = (index % concurrency) * cores_per_worker
+            affinity = cpus[start:start + cores_per_worker]
+    elif WORKER_CPU_AFFINITY != "off":
+        affinity = _parse_cpu_list(WORKER_CPU_AFFINITY)
+
+    if affinity and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, affinity)
+        except OSError as e:
+            logger.warning(f"CPU affinity 설정 실패 ({affinity}): {e}")
+            affinity = None
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+    except RuntimeError as e:
+        # 이미 TensorFlow 런타임이 초기화된 경우 (기존 설정 유지)
+        logger.warning(f"TensorFlow 스레드 수 설정 실패: {e}")
+
+    logger.info(
+        f"워커 런타임 설정: pid={os.getpid()}, intra_op={intra_threads}, inter_op={TF_INTER_OP_THREADS}, "
+        f"affinity={affinity if affinity else '없음'} (동시성 {concurrency}, 코어 {len(cpus)}개)"
+    )
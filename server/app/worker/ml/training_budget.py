@@ -0,0 +1,122 @@
+import logging
+import math
+import time
+
+import tensorflow as tf
+
+from app.core import HparamsConfig
+
+logger = logging.getLogger(__name__)
+
+# 학습 종료 사유 (작업 결과의 stop_reason)
+STOP_MAX_EPOCHS = "max_epochs"
+STOP_EARLY_STOPPING = "early_stopping"
+STOP_TARGET_ACCURACY = "target_accuracy"
+STOP_DEADLINE = "deadline"
+
+
+class TrainingBudget:
+    """
+    작업당 학습 시간 상한을 위한 epoch/batch 크기 결정.
+
+    - deadline 모드: 데이터 크기에 맞춰 batch 크기를 키우고(epoch 당 step 수 제한),
+      전체 step 수 상한으로 최대 epoch 를 정한 뒤 wall-clock 예산/목표 정확도에 도달하면 중단합니다.
+    - fixed 모드: 기존과 같이 EPOCHS / BATCH_SIZE 를 그대로 사용합니다.
+    """
+
+    def __init__(self, hparams_config: HparamsConfig, num_train_rows: int):
+        self.hparams_config = hparams_config
+        self.num_train_rows = num_train_rows
+        self.deadline_mode = hparams_config.BUDGET_MODE == "deadline"
+
+        if self.deadline_mode:
+            self.batch_size = self._scaled_batch_size()
+            steps_per_epoch = max(1, math.ceil(num_train_rows / self.batch_size))
+            max_epochs = math.ceil(hparams_config.MAX_TRAIN_STEPS / steps_per_epoch)
+            self.epochs = int(min(hparams_config.EPOCHS, max(hparams_config.MIN_EPOCHS, max_epochs)))
+            self.time_budget_sec = hparams_config.TRAIN_BUDGET_SEC
+            self.target_accuracy = hparams_config.TARGET_ACCURACY
+        else:
+            self.batch_size = hparams_config.BATCH_SIZE
+            self.epochs = hparams_config.EPOCHS
+            self.time_budget_sec = 0
+            self.target_accuracy = 0
+
+        logger.info(
+            f"학습 예산: mode={hparams_config.BUDGET_MODE}, rows={num_train_rows}, batch={self.batch_size}, "
+            f"epochs<={self.epochs}, time<={self.time_budget_sec or '무제한'}s, target_acc={self.target_accuracy or '없음'}"
+        )
+
+    def _scaled_batch_size(self):
+        # epoch 당 step 수가 TARGET_STEPS_PER_EPOCH 근처가 되도록 2의 거듭제곱으로 batch 크기 결정
+        h = self.hparams_config
+        wanted = max(1.0, self.num_train_rows / h.TARGET_STEPS_PER_EPOCH)
+        batch_size = 2 ** round(math.log2(wanted))
+        return int(min(h.MAX_BATCH_SIZE, max(h.BATCH_SIZE, batch_size)))
+
+    def callback(self):
+        return BudgetCallback(self.time_budget_sec, self.target_accuracy)
+
+
+class BudgetCallback(tf.keras.callbacks.Callback):
+    """
+    wall-clock 예산과 목표 검증 정확도로 학습을 중단하는 콜백.
+    예산으로 중단될 때는 그때까지 가장 좋았던(val_loss 최소) 가중치를 복원합니다.
+    """
+
+    def __init__(self, time_budget_sec: float, target_accuracy: float):
+        super().__init__()
+        self.time_budget_sec = time_budget_sec
+        self.target_accuracy = target_accuracy
+        self.stop_reason = None
+        self._start = None
+        self._best_loss = math.inf
+        self._best_weights = None
+
+    def _elapsed(self):
+        return time.monotonic() - self._start
+
+    def on_train_begin(self, logs=None):
+        self._start = time.monotonic()
+        self.stop_reason = None
+
+    def on_train_batch_end(self, batch, logs=None):
+        # epoch 이 긴 경우에도 예산을 넘기지 않도록 step 단위로 확인
+        if self.time_budget_sec and self.stop_reason is None and self._elapsed() >= self.time_budget_sec:
+            self._stop(STOP_DEADLINE)
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        val_loss = logs.get("val_loss")
+        if self.time_budget_sec and val_loss is not None and val_loss < self._best_loss:
+            self._best_loss = val_loss
+            self._best_weights = self.model.get_weights()
+
+        if self.stop_reason is not None:
+            return
+        val_accuracy = logs.get("val_accuracy")
+        if self.target_accuracy and val_accuracy is not None and val_accuracy >= self.target_accuracy:
+            self._stop(STOP_TARGET_ACCURACY)
+            return
+        # 다음 epoch 을 끝까지 돌릴 시간이 없으면 미리 중단
+        if self.time_budget_sec and self._elapsed() * (epoch + 2) / (epoch + 1) > self.time_budget_sec:
+            self._stop(STOP_DEADLINE)
+
+    def on_train_end(self, logs=None):
+        if self.stop_reason == STOP_DEADLINE and self._best_weights is not None:
+            self.model.set_weights(self._best_weights)
+            logger.info(f"예산 초과로 중단하여 최적 가중치 복원 (val_loss={self._best_loss:.4f})")
+
+    def _stop(self, reason):
+        self.stop_reason = reason
+        self.model.stop_training = True
+        logger.info(f"학습 중단: {reason} ({self._elapsed():.1f}s 경과)")
+
+
+def resolve_stop_reason(budget_callback: BudgetCallback, early_stopping, epochs_run: int, max_epochs: int):
+    """학습이 끝난 이유를 하나의 문자열로 정리"""
+    if budget_callback.stop_reason is not None:
+        return budget_callback.stop_reason
+    if early_stopping.stopped_epoch > 0 or epochs_run < max_epochs:
+        return STOP_EARLY_STOPPING
+    return STOP_MAX_EPOCHS
@@ -1,6 +1,11 @@
 import logging
-from tensorflow.keras.models import Sequential, load_model
+import numpy as np
+from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout, Input, Conv1D, MaxPooling1D, Flatten
+
+from app.worker.ml.label_manager import load_label_order
+from app.worker.ml.model_cache import get_model_cache
+
 logger = logging.getLogger(__name__)
 
 # 기존 모델을 기반으로 증분 학습 모델을 구축하는 클래스
@@ -8,35 +13,136 @@ class ModelBuilder:
     def build(self, input_shape, num_classes):
         raise NotImplementedError("서브클래스에서 build()를 구현해야 합니다.")
 
+    def extractor_id(self):
+        """특징 추출기 구성 식별자 (임베딩 캐시 키 구분용, None 은 기본 구성)"""
+        return None
+
 
 class UpdateModelBuilder(ModelBuilder):
-    def __init__(self, base_keras_model_path):
+    def __init__(self, base_keras_model_path, warm_start=False, label_map=None, parent_labels_path=None):
         self.base_keras_model_path = base_keras_model_path
-        logger.info(f"UpdateModelBuilder 객체 초기화 완료 (기반 모델: {self.base_keras_model_path})")
+        # warm_start: 기반 모델의 분류 헤드(dense/output) 가중치로 새 헤드를 초기화
+        # label_map: 새 모델의 라벨 -> 출력 열, parent_labels_path: 기반 모델의 출력 열 순서 라벨 목록(json)
+        self.warm_start = warm_start
+        self.label_map = label_map
+        self.parent_labels_path = parent_labels_path
+        self.warm_started = False
+        self._base_model = None
+        self._parent_head = None
+        self._parent_labels = None
+        logger.info(f"UpdateModelBuilder 객체 초기화 완료 (기반 모델: {self.base_keras_model_path}, warm start: {warm_start})")
+
+    def _load_base_model(self):
+        if self._base_model is None:
+            logger.info(f"기반 모델 로드: {self.base_keras_model_path}")
+            # 워커 캐시에서 가중치가 복제된 모델을 받아 캐시 원본은 변경하지 않음
+            self._base_model = get_model_cache().get(self.base_keras_model_path)
+            logger.info("기반 모델 로드 완료")
+            self._parent_head = self._find_parent_head(self._base_model) if self.warm_start else None
+            self.warm_started = self._parent_head is not None
+        return self._base_model
+
+    # 기반 모델 끝의 Dense -> Dropout -> Dense(출력) 헤드를 찾음 (구조가 맞지 않거나 출력 라벨 순서를 알 수 없으면 None)
+    def _find_parent_head(self, base_model):
+        layers = base_model.layers
+        dense_index = len(layers) - 2
+        while dense_index > 0 and isinstance(layers[dense_index], Dropout):
+            dense_index -= 1
+        output = layers[-1]
+        if dense_index < 1 or not isinstance(layers[dense_index], Dense) or not isinstance(output, Dense):
+            logger.warning("기반 모델 끝이 Dense -> Dropout -> Dense 구조가 아니어서 헤드를 새로 초기화합니다.")
+            return None
+        parent_labels = load_label_order(self.parent_labels_path) if self.parent_labels_path else None
+        if parent_labels is None or self.label_map is None:
+            logger.warning("기반 모델의 출력 라벨 순서 기록이 없어 헤드를 새로 초기화합니다.")
+            return None
+        if output.units != len(parent_labels):
+            logger.warning(
+                f"기반 모델 출력 수({output.units})와 기록된 라벨 수({len(parent_labels)})가 달라 헤드를 새로 초기화합니다."
+            )
+            return None
+        self._parent_labels = parent_labels
+        return dense_index, layers[dense_index], output
+
+    # 특징 추출기 구축 (기반 모델의 마지막 두 레이어 제외, warm start 시에는 기반 헤드 전체 제외)
+    def build_feature_extractor(self, trainable=True):
+        base_model = self._load_base_model()
+        if self.warm_started:
+            # 기반 헤드의 Dense 는 새 헤드가 이어받으므로 추출기에서 빼서 계보마다 레이어가 쌓이지 않게 함
+            extractor_layers = base_model.layers[:self._parent_head[0]]
+        else:
+            extractor_layers = base_model.layers[:-2]
+
+        feature_extractor = Sequential(extractor_layers, name="feature_extractor")
+        feature_extractor.trainable = trainable
+        logger.info(f"특징 추출기 설정 완료 (trainable={trainable})")
+        return feature_extractor
+
+    def extractor_id(self):
+        self._load_base_model()
+        return "without_head" if self.warm_started else None
+
+    # 새로운 분류 헤드 구축 (warm start 시 Dense 크기는 기반 헤드와 동일)
+    def build_head(self, num_classes):
+        dense_units = self._parent_head[1].units if self.warm_started else 128
+        return [
+            Dense(dense_units, activation='relu', name="combine_dense1"),
+            Dropout(0.3),
+            Dense(num_classes, activation='softmax', name="combine_output")
+        ]
+
+    # 기반 헤드 가중치 복사: Dense 는 그대로, 출력층은 같은 라벨의 열을 라벨 이름으로 찾아 복사하고 새 라벨 열은 새로 초기화
+    def _init_head_from_parent(self, head_layers):
+        if not self.warm_started:
+            return
+        _, parent_dense, parent_output = self._parent_head
+        dense, output = head_layers[0], head_layers[-1]
+        dense.set_weights(parent_dense.get_weights())
+
+        parent_kernel, parent_bias = parent_output.get_weights()
+        kernel, bias = output.get_weights()
+        inherited = np.zeros(kernel.shape[1], dtype=bool)
+        for parent_index, label in enumerate(self._parent_labels):
+            index = self.label_map.get(label)
+            if index is None:
+                continue
+            kernel[:, index] = parent_kernel[:, parent_index]
+            bias[index] = parent_bias[parent_index]
+            inherited[index] = True
+        # 새 라벨은 기존 클래스 평균 bias 에서 시작하여 초기 확률이 지나치게 낮지 않도록 함
+        bias[~inherited] = parent_bias.mean()
+        output.set_weights([kernel, bias])
+        logger.info(f"기반 헤드 가중치로 초기화 (기존 클래스 {int(inherited.sum())}개, 새 클래스 {int((~inherited).sum())}개)")
+
+    # 임베딩만 입력으로 받는 헤드 전용 모델 (frozen backbone 학습용)
+    def build_head_model(self, embedding_dim, num_classes):
+        self._load_base_model()
+        head_layers = self.build_head(num_classes)
+        head = Sequential([Input(shape=(embedding_dim,)), *head_layers], name="classifier_head")
+        self._init_head_from_parent(head_layers)
+        logger.info(f"분류 헤드 구축 완료 (임베딩 차원: {embedding_dim}, 클래스 수: {num_classes})")
+        return head
+
+    # 학습된 헤드를 특징 추출기 뒤에 다시 붙여 배포용 모델 구성
+    def attach_head(self, feature_extractor, head_model, input_shape):
+        model = Sequential([feature_extractor, *head_model.layers])
+        model.build(input_shape=(None, *input_shape))
+        logger.info("특징 추출기 + 분류 헤드 결합 완료")
+        return model
 
     # 모델 구축
     def build(self, input_shape, num_classes):
         logger.info(f"증분 학습 모델 구축 시작 (입력 형태: {input_shape}, 클래스 수: {num_classes})")
-        logger.info(f"기반 모델 로드: {self.base_keras_model_path}")
-
-        base_model = load_model(self.base_keras_model_path)
-        logger.info("기반 모델 로드 완료")
 
-        # 특징 추출기 부분만 사용 (마지막 두 레이어 제외)
-        feature_extractor = Sequential(base_model.layers[:-2], name="feature_extractor")
-        feature_extractor.trainable = True
-        logger.info("특징 추출기 설정 완료")
+        feature_extractor = self.build_feature_extractor(trainable=True)
 
         # 새로운 분류 레이어를 추가하여 증분 학습 모델 구축
-        model = Sequential([
-            feature_extractor,
-            Dense(128, activation='relu', name="combine_dense1"),
-            Dropout(0.3),
-            Dense(num_classes, activation='softmax', name="combine_output")
-        ])
+        head_layers = self.build_head(num_classes)
+        model = Sequential([feature_extractor, *head_layers])
 
         model.build(input_shape=(None, *input_shape))
+        self._init_head_from_parent(head_layers)
         logger.info("증분 학습 모델 구축 완료")
         model.summary(print_fn=lambda x: logger.info(x))
 
-        return model
\ No newline at end of file
+        return model
@@ -2,91 +2,294 @@
 import logging
 
 
-from app.core import celery_app, HparamsConfig, PathConfig
+from app.core import celery_app, HparamsConfig, PathConfig, metrics
 from .ml.data_preprocessor import DataPreprocessor
 from .ml.dataset_combiner import DatasetCombiner
 from .ml.duplicate_chacker import DuplicateChecker, DuplicateDataError
 from .ml.label_manager import LabelManager
 from .ml.model_summary_printer import ModelSummaryPrinter
-from .ml.model_trainer import ModelTrainer
-from app.utils.utils import generate_model_id
+from .ml.model_trainer import ModelTrainer, convert_to_tflite
+from .ml.model_cache import get_model_cache
+from .ml.lineage_store import LineageStore
+from .ml.artifact_manager import get_artifact_manager, keras_storage_key, labels_storage_key, dataset_storage_key
+from .ml.tf_runtime import configure_worker_runtime
+from app.utils.utils import generate_model_id, unpack_landmarks
 from .ml.update_model_builder import UpdateModelBuilder
-from ..services import firebase_service
+from ..services import firebase_service, result_cache_service, coalesce_service, progress_service, upload_queue_service, routing_service, job_store_service
+from celery.signals import worker_process_init
+import os
 import time
 import asyncio
+import numpy as np
 
-from ..utils import utils
 
 logger = logging.getLogger(__name__)
 
+TFLITE_SAMPLE_ROWS = 300  # TFLite 양자화 대표 데이터 표본 수
+
+@celery_app.task(bind=True)
+def training_task(self, model_code, landmarks, gesture, job_hash=None):
+        items = [{"gesture": gesture, "landmarks": landmarks}]
+        return _run_with_result_cache(self, model_code, items, [job_hash])
+
+@celery_app.task(bind=True)
+def batch_training_task(self, model_code, items=None, job_hash=None, coalesce_id=None, device_id=None):
+        """
+        같은 base model 에 여러 제스처를 한 번의 학습으로 추가합니다.
+
+        items: [{"gesture": str, "landmarks": list}, ...]
+        coalesce_id: 지정되면 병합 대기열(coalesce_service)에 모인 단일 요청들을 꺼내 학습
+        device_id: coalesce_id 의 요청들을 모은 기기 (병합 대기열은 기기별로 모집)
+        """
+        job_hashes = [job_hash]
+        if coalesce_id is not None:
+            items = coalesce_service.close_and_drain(model_code, coalesce_id, device_id)
+            # 항목을 꺼내지 못했어도(중복 실행 등) 합류한 요청들의 결과 캐시 등록은 해제할 수 있도록 별도 기록을 사용
+            job_hashes = [item.get("job_hash") for item in items] or coalesce_service.batch_job_hashes(coalesce_id)
+        if not items:
+            error = ValueError("학습할 제스처가 없습니다")
+            _fail_job(self, error, job_hashes, time.time())
+            raise error
+        return _run_with_result_cache(self, model_code, items, job_hashes)
+
+def _run_with_result_cache(self, model_code, items, job_hashes):
+        queue_wait = _observe_queue_wait(self)
+        started_at = time.time()
+        job_store_service.mark_started(self.request.id, queue_wait)
+        result_cache_service.refresh_claims(job_hashes)
+        split_finalize = routing_service.split_finalize_stage()
+        try:
+            job = _run_training_pipeline(self, model_code, items)
+            if not split_finalize:
+                result = _finalize(self, job)
+        except Exception as e:
+            _fail_job(self, e, job_hashes, started_at)
+            raise
+
+        if split_finalize:
+            # TFLite 변환/업로드는 단계 대기열에서 실행하고, 같은 task id 로 최종 결과를 이어받음
+            priority = (self.request.delivery_info or {}).get("priority")
+            logger.info(f"학습 완료, TFLite 변환/업로드 단계로 전달: {job['model_code']}")
+            return self.replace(
+                finalize_task.si(job, job_hashes, started_at).set(**routing_service.route_finalize(priority))
+            )
+        _complete_job(self, result, job_hashes, started_at, job["stage_timings"])
+        return result
+
 @celery_app.task(bind=True)
-def training_task(self, model_code, landmarks, gesture):
-        start_time = time.time()
+def finalize_task(self, job, job_hashes, started_at):
+        """학습이 끝난 모델의 TFLite 변환과 업로드 (단계 대기열에서 실행)"""
+        result_cache_service.refresh_claims(job_hashes)
+        try:
+            result = _finalize(self, job)
+        except Exception as e:
+            _fail_job(self, e, job_hashes, started_at)
+            raise
+        _complete_job(self, result, job_hashes, started_at, job["stage_timings"])
+        return result
+
+def _fail_job(self, e, job_hashes, started_at):
+        metrics.JOB_SECONDS.observe(time.time() - started_at, status="failure")
+        # 실패한 요청은 결과 캐시에서 해제하여 재시도 시 다시 학습되도록 함
+        for job_hash in job_hashes:
+            result_cache_service.release_job(job_hash)
+        status, error = progress_service.failure_status(type(e).__name__)
+        metrics.JOBS_TOTAL.inc(status=status.lower())
+        job_store_service.mark_finished(self.request.id, status, error_info=error, duration_sec=time.time() - started_at)
+        progress_service.publish(self.request.id, {
+            "task_id": self.request.id, "status": status, "progress": None, "result": None, "error_info": error
+        })
+
+def _complete_job(self, result, job_hashes, started_at, stage_timings=None):
+        total_time = time.time() - started_at
+        logger.info(f"[TOTAL TIME] 전체 파이프라인 소요 시간: {total_time:.2f}s")
+        metrics.JOB_SECONDS.observe(total_time, status="success")
+        metrics.JOBS_TOTAL.inc(status="success")
+        for job_hash in job_hashes:
+            result_cache_service.record_result(job_hash, self.request.id, result)
+        job_store_service.mark_finished(
+            self.request.id, "SUCCESS", result=result, duration_sec=total_time, stage_timings=stage_timings
+        )
+        progress_service.publish(self.request.id, {
+            "task_id": self.request.id, "status": "SUCCESS", "progress": None, "result": result, "error_info": None
+        })
+
+def _observe_queue_wait(self):
+        """API가 메시지 헤더에 기록한 등록 시각(enqueued_at)으로 대기열 대기 시간 기록"""
+        enqueued_at = getattr(self.request, "enqueued_at", None) or (self.request.headers or {}).get("enqueued_at")
+        if enqueued_at:
+            wait = max(0.0, time.time() - float(enqueued_at))
+            metrics.QUEUE_WAIT_SECONDS.observe(wait)
+            logger.info(f"[QUEUE WAIT] {wait:.3f}s")
+            return wait
+        return None
+
+def _update_progress(self, current_step):
+        """Celery 상태 갱신과 함께 SSE 구독자에게 단계 변화를 전파"""
+        self.update_state(state='PROGRESS', meta={'current_step': current_step})
+        job_store_service.update_stage(self.request.id, current_step)
+        progress_service.publish(self.request.id, {
+            "task_id": self.request.id, "status": "PROGRESS", "progress": {"current_step": current_step}
+        })
+
+def _run_training_pipeline(self, model_code, items):
         new_model_code = generate_model_id()
         hparams_configs = HparamsConfig()
+        timings = {}  # 단계별 소요 시간 (작업 기록에 저장)
+
+        # 용량 정리로 지워진 기반 모델(과 조상 delta)은 저장소에서 다시 받고, 사용 시각을 갱신해 정리 대상에서 제외
+        # (PathConfig 가 기반 모델 디렉토리를 만들기 전에 확인하여 없는 model_code 로 빈 디렉토리를 남기지 않음)
+        artifact_manager = get_artifact_manager()
+        artifact_manager.ensure_local(model_code)
         path_configs = PathConfig(model_code, new_model_code)
+        artifact_manager.touch(new_model_code)
+
+        # 계보의 정규화 버전 (기존 계보는 기록된 버전, 루트에서 시작하면 설정값)
+        lineage_store = LineageStore(path_configs.MODELS_DIR, hparams_configs.NORMALIZATION)
+        normalization = lineage_store.normalization_of(model_code)
 
-        # landmarks -> csv 변환
-        self.update_state(state='PROGRESS', meta={'current_step': '랜드마크 변환중 '})
-        utils.convert_landmarks_to_csv(landmarks, path_configs.incremental_csv_path, gesture)
+        # landmarks -> Dataset 변환 (CSV 왕복 없이 메모리에서 바로 검증/정규화)
+        _update_progress(self, '랜드마크 변환중 ')
+        with metrics.stage_timer("ingest", timings):
+            incremental = None
+            for item in items:
+                gesture_data = DataPreprocessor.landmarks_to_dataset(
+                    unpack_landmarks(item["landmarks"]), item["gesture"], normalization=normalization
+                )
+                incremental = gesture_data if incremental is None else incremental.append(gesture_data)
 
-        # 1. 데이터 준비
-        self.update_state(state='PROGRESS', meta={'current_step': '데이터 준비 중...'})
-        base = DataPreprocessor.csv_to_npy_mem(path_configs.base_csv_path)
-        incremental = DataPreprocessor.csv_to_npy_mem(path_configs.incremental_csv_path)
+        # 1. 데이터 준비 (base 도 같은 버전으로 정규화되어 중복 검사/학습에서 같은 기준으로 비교)
+        _update_progress(self, '데이터 준비 중...')
+        with metrics.stage_timer("load_base", timings):
+            base = lineage_store.materialize(model_code)
+        metrics.DATASET_ROWS.observe(len(base), kind="base")
+        metrics.DATASET_ROWS.observe(len(incremental), kind="incremental")
 
         #2. 중복 검사
-        duplicate_checker = DuplicateChecker()
-        base_grouped = DataPreprocessor.group_by_label(base)
-        incremental_grouped = DataPreprocessor.group_by_label(incremental)
-
-        is_dup = duplicate_checker.check_incremental_vs_all(
-            incremental_grouped,
-            base_grouped,
-            hparams_configs.DUP_THRESHOLD,
-            hparams_configs.TOLERANCE_THRESHOLD
-        )
+        with metrics.stage_timer("duplicate_check", timings):
+            duplicate_checker = DuplicateChecker(hparams_configs.DUP_CHUNK_SIZE, hparams_configs.DUP_WORKERS)
+            # base 는 계보별로 저장된 인덱스 사용 (부모 인덱스에 delta 만 삽입해 만든 것이라 작업마다 정렬하지 않음)
+            base_dup_index = lineage_store.duplicate_index(model_code, base)
+            base_grouped = base_dup_index.label_indexes(
+                base, hparams_configs.TOLERANCE_THRESHOLD, hparams_configs.DUP_CHUNK_SIZE, hparams_configs.DUP_WORKERS
+            )
+            incremental_grouped = DataPreprocessor.group_by_label(incremental)
+
+            is_dup = duplicate_checker.check_incremental_vs_all(
+                incremental_grouped,
+                base_grouped,
+                hparams_configs.DUP_THRESHOLD,
+                hparams_configs.TOLERANCE_THRESHOLD
+            )
 
         if is_dup:
             logger.warning("중복 데이터가 허용치를 초과하여 작업을 건너뜜니다.")
             raise DuplicateDataError("데이터 중복입니다. 랜드마크를 다시 등록하세요")
 
         # 3.데이터 병합 및 저장
-        dataset_combiner = DatasetCombiner(path_configs.combined_csv_path)
-        combined_data = dataset_combiner.combine_and_save_data(base, incremental)
+        with metrics.stage_timer("combine", timings):
+            dataset_combiner = DatasetCombiner(path_configs, normalization)
+            combined_data = dataset_combiner.combine_and_save_data(base, incremental, background=True)
+            lineage_store.write_duplicate_index(new_model_code, base_dup_index.extended(combined_data))
 
-        # 4. combine 데이터 라벨맵 생성
-        label_manager = LabelManager(base, combined_data)  # 메모리 데이터로 전달
-        label_map, final_label_order = label_manager.build_label_map()
-        print(f"[CHECK] 최종 라벨 순서: {final_label_order} / label_map: {label_map}")
+            # 4. combine 데이터 라벨맵 생성
+            label_manager = LabelManager(base, combined_data)  # 메모리 데이터로 전달
+            label_map, final_label_order = label_manager.build_label_map()
+        logger.info(f"[CHECK] 최종 라벨 순서: {final_label_order} / label_map: {label_map}")
 
-        # 5. 모델 학습
-        self.update_state(state='PROGRESS', meta={'current_step': '모델 학습 중...'})
-        model_builder = UpdateModelBuilder(path_configs.base_keras_model_path)
-        trainer = ModelTrainer(model_builder, path_configs, hparams_configs, label_map, combined_data)
-        trainer.train()
+        # 5. 모델 학습 (fit 단계는 ModelTrainer 내부에서 기록, TFLite 변환은 _finalize 에서 수행)
+        _update_progress(self, '모델 학습 중...')
+        model_builder = UpdateModelBuilder(
+            path_configs.base_keras_model_path, hparams_configs.WARM_START_HEAD, label_map, path_configs.base_labels_path
+        )
+        trainer = ModelTrainer(model_builder, path_configs, hparams_configs, label_map, combined_data, base_data=base)
+        with metrics.stage_timer("train", timings):
+            combined_model = trainer.train(convert_tflite=False)
+        metrics.EPOCHS_RUN.observe(
+            trainer.epochs_run, mode=trainer.training_mode, stop_reason=trainer.stop_reason,
+            warm_start=int(model_builder.warm_started),
+        )
 
-        ModelSummaryPrinter.print_summaries(path_configs)
+        ModelSummaryPrinter.print_summaries(
+            get_model_cache().get_shared(path_configs.base_keras_model_path),
+            combined_model
+        )
         logger.info("증분 학습이 성공적으로 완료되었습니다.")
-        self.update_state(state='PROGRESS', meta={'current_step': '모델 배포 중..'})
-        paths = {
-            "tflite_model_path": path_configs.tflite_model_path,
-            "combined_keras_model_path": path_configs.combined_keras_model_path,
-            "combined_csv_path": path_configs.combined_csv_path,
+        # 이 모델을 기반으로 하는 다음 요청의 대기열/우선순위 결정을 위한 크기 정보
+        routing_service.record_model_stats(new_model_code, len(combined_data), len(lineage_store.lineage(model_code)) + 1)
+        # 변환 단계가 계보 전체를 다시 읽지 않도록 양자화 대표 데이터 표본만 저장해 넘김
+        _save_representative_sample(combined_data.features, path_configs.representative_path)
+        dataset_combiner.wait_saved()
+
+        # 변환/업로드 단계에 넘길 작업 정보 (다른 프로세스에서 실행될 수 있으므로 JSON 직렬화 가능한 값만)
+        return {
+            "model_code": new_model_code,
+            "parent_model_code": model_code,
+            "gestures": incremental.present_labels(),
+            "epochs_run": trainer.epochs_run,
+            "stop_reason": trainer.stop_reason,
+            "normalization": normalization,
+            "stage_timings": timings,
+            "paths": {
+                "models_dir": path_configs.MODELS_DIR,
+                "tflite_model_path": path_configs.tflite_model_path,
+                "representative_path": path_configs.representative_path,
+                "combined_keras_model_path": path_configs.combined_keras_model_path,
+                "labels_path": path_configs.combined_labels_path,
+                "dataset_paths": lineage_store.artifact_paths(new_model_code),
+                "new_model_code": new_model_code,
+            },
         }
-        tflite_url = asyncio.run(_upload_tflite_and_background(paths))
 
-        total_time = time.time() - start_time
-        logger.info(f"[TOTAL TIME] 전체 파이프라인 소요 시간: {total_time:.2f}s")
+def _save_representative_sample(features, path):
+        """통합 데이터셋에서 TFLite 양자화 대표 데이터 표본을 무작위로 뽑아 (N, D, 1) float32 로 저장"""
+        sample_index = np.sort(np.random.default_rng().choice(len(features), min(TFLITE_SAMPLE_ROWS, len(features)), replace=False))
+        representative = np.asarray(features[sample_index], dtype=np.float32).reshape(-1, features.shape[1], 1)
+        np.save(path, representative)
+
+def _finalize(self, job):
+        """TFLite 변환 후 업로드하고 최종 결과를 반환"""
+        paths = job["paths"]
+        artifact_manager = get_artifact_manager()
+        artifact_manager.touch(job["model_code"])
+        _update_progress(self, '모델 변환 중...')
+        with metrics.stage_timer("tflite_convert", job["stage_timings"]):
+            model = get_model_cache().get_shared(paths["combined_keras_model_path"])
+            # 양자화 대표 데이터: 학습 단계에서 저장한 통합 데이터셋 표본
+            representative = np.load(paths["representative_path"], allow_pickle=False)
+            convert_to_tflite(model, representative, paths["tflite_model_path"])
+
+        _update_progress(self, '모델 배포 중..')
+        with metrics.stage_timer("upload", job["stage_timings"]):
+            tflite_url = asyncio.run(_upload_tflite_and_background(paths))
+        # 업로드 대기열 등록 완료: 대기열의 업로드가 모두 끝나면 용량 정리 대상이 됨
+        artifact_manager.mark_published(job["model_code"])
+
         return {
             "tflite_url": tflite_url,
-            "model_code": new_model_code
+            "model_code": job["model_code"],
+            "gestures": job["gestures"],
+            "epochs_run": job["epochs_run"],
+            "stop_reason": job["stop_reason"],
+            # 앱은 추론 입력에 같은 정규화를 적용해야 함 (None 이면 원본 그대로)
+            "normalization": job["normalization"],
         }
 
+@worker_process_init.connect
+def _configure_runtime(**kwargs):
+    # 학습 전에 자식 프로세스별 TensorFlow 스레드 수와 CPU 코어를 나누어 과다 구독 방지
+    configure_worker_runtime(celery_app.conf.worker_concurrency)
+
+@worker_process_init.connect
+def _start_upload_manager(**kwargs):
+    # 워커 프로세스 시작 시 업로드 관리자를 띄워 이전에 남은 대기 업로드도 이어서 처리
+    upload_queue_service.get_upload_manager()
+    get_artifact_manager()
+
 async def _upload_tflite_and_background(paths: dict):
     """
     TFLite 모델은 업로드 후 URL을 반환,
-    Keras 모델과 CSV는 백그라운드로 업로드
+    Keras 모델과 데이터셋은 영속 업로드 대기열에 등록하여 별도 스레드 풀이 재시도와 함께 업로드
     """
     # TFLite 업로드 (대기)
     tflite_url = await firebase_service.upload_tflite_and_get_url(
@@ -94,13 +297,12 @@ async def _upload_tflite_and_background(paths: dict):
     )
     logger.info(f"TFLite 모델 업로드 완료 및 URL 수신: {tflite_url}")
 
-    # Keras와 CSV는 백그라운드 업로드
-    asyncio.create_task(firebase_service.upload_keras_model(
-        paths["combined_keras_model_path"]
-    ))
-    asyncio.create_task(firebase_service.upload_csv_data(
-        paths["combined_csv_path"]
-    ))
-    logger.info("Keras 모델 및 CSV 데이터 백그라운드 업로드 시작됨.")
+    # Keras와 데이터셋은 대기열에 등록만 하고 바로 반환 (학습 워커 슬롯을 즉시 반환)
+    keras_path = paths["combined_keras_model_path"]
+    upload_queue_service.enqueue_upload(keras_path, keras_storage_key(paths["new_model_code"]))
+    upload_queue_service.enqueue_upload(paths["labels_path"], labels_storage_key(paths["new_model_code"]))
+    for dataset_path in paths["dataset_paths"]:
+        upload_queue_service.enqueue_upload(dataset_path, dataset_storage_key(paths["new_model_code"], dataset_path))
+    logger.info("Keras 모델 및 데이터셋(delta) 업로드 대기열 등록 완료.")
 
-    return tflite_url
\ No newline at end of file
+    return tflite_url
@@ -1,8 +1,58 @@
 #!/bin/sh
 
-# 1. Uvicorn을 사용하여 FastAPI 서버를 백그라운드에서 실행
-uvicorn app.main:app --host 0.0.0.0 --port 8000 &
+# SERVICE_ROLE 로 컨테이너 역할을 선택합니다.
+#   api      : FastAPI 서버만 실행
+#   worker   : Celery 워커만 실행 (ROUTING_ENABLED=1 이면 대기열별 interactive / bulk / finalize 워커)
+#   all      : 둘 다 실행 (기본값, 단일 컨테이너 개발/소규모 배포용)
+SERVICE_ROLE="${SERVICE_ROLE:-all}"
+ROUTING_ENABLED="${ROUTING_ENABLED:-0}"
 
-# 2. Celery 워커를 포어그라운드에서 실행
-#    (이 프로세스가 컨테이너의 메인 프로세스가 됨)
-celery -A app.core.celery_app worker -l info
+INTERACTIVE_QUEUE="${INTERACTIVE_QUEUE:-train_interactive}"
+BULK_QUEUE="${BULK_QUEUE:-train_bulk}"
+FINALIZE_QUEUE="${FINALIZE_QUEUE:-train_finalize}"
+
+# 대기열별 동시 실행 수 (작은 작업이 큰 작업 뒤에서 기다리지 않도록 워커를 분리)
+INTERACTIVE_CONCURRENCY="${INTERACTIVE_CONCURRENCY:-2}"
+BULK_CONCURRENCY="${BULK_CONCURRENCY:-1}"
+FINALIZE_CONCURRENCY="${FINALIZE_CONCURRENCY:-1}"
+
+start_workers() {
+    if [ "$ROUTING_ENABLED" != "1" ]; then
+        # 대기열 분리를 사용하지 않으면 기본 대기열 하나를 처리하는 워커 하나만 실행
+        celery -A app.core.celery_app worker -l info -Q celery -n "worker@%h" &
+        return
+    fi
+
+    # 한 호스트의 전체 학습 프로세스 수로 TensorFlow 스레드를 나눔 (워커 사이에는 코어 고정 안 함)
+    TOTAL_CONCURRENCY=$((INTERACTIVE_CONCURRENCY + BULK_CONCURRENCY + FINALIZE_CONCURRENCY))
+    CORES=$(nproc)
+    export TF_INTRA_OP_THREADS="${TF_INTRA_OP_THREADS:-$(( CORES / TOTAL_CONCURRENCY > 0 ? CORES / TOTAL_CONCURRENCY : 1 ))}"
+    export WORKER_CPU_AFFINITY="${WORKER_CPU_AFFINITY:-off}"
+
+    # finalize 워커는 Celery 기본 대기열(라우팅을 켜기 전에 쌓인 학습 작업)도 함께 처리
+    WORKER_CONCURRENCY="$FINALIZE_CONCURRENCY" celery -A app.core.celery_app worker -l info \
+        -Q "$FINALIZE_QUEUE,celery" -c "$FINALIZE_CONCURRENCY" -n "finalize@%h" &
+    WORKER_CONCURRENCY="$BULK_CONCURRENCY" celery -A app.core.celery_app worker -l info \
+        -Q "$BULK_QUEUE" -c "$BULK_CONCURRENCY" -n "bulk@%h" &
+    WORKER_CONCURRENCY="$INTERACTIVE_CONCURRENCY" celery -A app.core.celery_app worker -l info \
+        -Q "$INTERACTIVE_QUEUE" -c "$INTERACTIVE_CONCURRENCY" -n "interactive@%h" &
+}
+
+case "$SERVICE_ROLE" in
+    api)
+        exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+        ;;
+    worker)
+        start_workers
+        # 워커 중 하나라도 종료되면 컨테이너를 종료하여 재시작되도록 함
+        wait -n 2>/dev/null || wait
+        exit 1
+        ;;
+    *)
+        # FastAPI 서버를 백그라운드에서, 워커들과 함께 실행
+        uvicorn app.main:app --host 0.0.0.0 --port 8000 &
+        start_workers
+        wait -n 2>/dev/null || wait
+        exit 1
+        ;;
+esac